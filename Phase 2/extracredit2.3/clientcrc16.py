@@ -1,5 +1,8 @@
 from socket import *
-import os, struct, random, time
+import os, sys, struct, random, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from rdtlib.crc16 import crc16, update as crc16_update
 
 #  setup
 serverName = "127.0.0.1"       # the server ip address
@@ -33,15 +36,8 @@ def checksum16(b: bytes) -> int:
     return (~s) & 0xFFFF
 '''
 def compute_crc16(data: bytes, poly=0x8005, init_val=0x0000):
-    crc = init_val
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ poly) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+    # table driven, same result as the old 8-step bit loop
+    return crc16(data, poly, init_val)
 
 # build the 8-byte header
 def _hdr(t, seq, fl, ln, cs):
@@ -52,7 +48,7 @@ def make_data(seq: int, payload: bytes, fin: bool = False) -> bytes:
     fl = FLAG_FIN if fin else 0
     h0 = _hdr(TYPE_DATA, seq, fl, len(payload), 0)
     # cs = checksum16(h0 + payload)
-    cs = compute_crc16(h0 + payload)
+    cs = crc16_update(crc16_update(0, h0), payload)  # no h0 + payload copy
     return _hdr(TYPE_DATA, seq, fl, len(payload), cs) + payload
 
 # it will check the checksum for errors and return the fields
@@ -64,7 +60,7 @@ def parse_pkt(raw: bytes):
     if len(pl) != ln:
         return {"ok": False}
    # ok = checksum16(_hdr(t, seq, fl, ln, 0) + pl) == cs
-    ok = compute_crc16(_hdr(t, seq, fl, ln, 0) + pl) == cs
+    ok = crc16_update(compute_crc16(_hdr(t, seq, fl, ln, 0)), pl) == cs
     return {"ok": ok, "type": t, "seq": seq, "flags": fl, "length": ln, "payload": pl}
 
 # flip exactly one random bit
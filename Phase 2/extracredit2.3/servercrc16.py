@@ -1,5 +1,8 @@
 from socket import *
-import struct, random, time
+import os, sys, struct, random, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from rdtlib.crc16 import crc16, update as crc16_update
 
 #   setup
 serverPort = 12007
@@ -30,15 +33,8 @@ def checksum16(b: bytes) -> int:
     return (~s) & 0xFFFF
 '''
 def compute_crc16(data: bytes, poly=0x8005, init_val=0x0000) -> int:
-    crc = init_val
-    for byte in data:
-        crc ^= (byte << 8)
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ poly) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
-    return crc
+    # table driven, same result as the old 8-step bit loop
+    return crc16(data, poly, init_val)
 
 
 # build the 8-byte header
@@ -62,7 +58,7 @@ def parse_pkt(raw: bytes):
     if len(pl) != ln:
         return {"ok": False}
     #ok = checksum16(_hdr(t, seq, fl, ln, 0) + pl) == cs
-    ok = compute_crc16(_hdr(t, seq, fl, ln, 0) + pl) == cs
+    ok = crc16_update(compute_crc16(_hdr(t, seq, fl, ln, 0)), pl) == cs
     return {"ok": ok, "type": t, "seq": seq, "flags": fl, "length": ln, "payload": pl}
 
 # flip exactly one random bit
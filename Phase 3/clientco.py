@@ -2,6 +2,12 @@ import sys, socket, time, random, argparse
 from socket import SHUT_RDWR, timeout
 from threading import Thread, Event
 import struct
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import Phase3Codec, Packet
+from rdtlib.rto import RTOEstimator
+from rdtlib.pacer import TokenBucket
 
 # RDT constants
 TYPE_DATA = 0x01
@@ -12,24 +18,17 @@ PAYLOAD_SIZE = 1024
 ACK_FLIP_PROB = 0.0
 ACK_LOSS_PROB = 0.0
 
+codec = Phase3Codec(PAYLOAD_SIZE)
+
 def make_pkt(seq, payload):
-    return struct.pack("!BBH", TYPE_DATA, seq, len(payload)) + payload
+    return codec.encode(seq, payload)
 
 def make_ack(seq):
     return struct.pack("!BB", TYPE_ACK, seq)
 
-def parse_pkt(raw):
-    try:
-        t = raw[0]
-        seq = raw[1]
-        if t == TYPE_ACK:
-            return {"ok": True, "type": TYPE_ACK, "seq": seq}
-        elif t == TYPE_DATA:
-            length = struct.unpack("!H", raw[2:4])[0]
-            return {"ok": True, "type": TYPE_DATA, "seq": seq, "len": length, "payload": raw[4:4+length]}
-    except:
-        pass
-    return {"ok": False}
+def parse_pkt(raw, rec=None):
+    # fills rec (a Packet) instead of making a dict per datagram
+    return codec.parse(raw, rec)
 
 def maybe_corrupt(b, prob):
     if random.random() < prob and len(b) > 2:
@@ -48,6 +47,7 @@ _listener_thread = None
 
 def _ack_listener():
     global _ack_for_seq
+    ack = Packet()   # reused for every ACK
     try:
         while not _stop_event.is_set():
             try:
@@ -61,10 +61,10 @@ def _ack_listener():
                 continue
 
             raw = maybe_corrupt(raw, ACK_FLIP_PROB)
-            ack = parse_pkt(raw)
+            parse_pkt(raw, ack)
 
-            if ack.get("ok") and ack.get("type") == TYPE_ACK:
-                _ack_for_seq = ack.get("seq", -1)
+            if ack.ok and ack.type == TYPE_ACK:
+                _ack_for_seq = ack.seq
                 _ack_event.set()
     except:
         pass
@@ -76,8 +76,9 @@ parser.add_argument("--port", type=int, default=12007)
 parser.add_argument("--file", default="udpfile.jpg")
 parser.add_argument("--mode", type=int, default=1)
 parser.add_argument("--rate", type=float, default=0.0)
-parser.add_argument("--rto", type=float, default=0.04)
-parser.add_argument("--delay-data-ms", type=float, default=0.0)
+parser.add_argument("--rto", type=float, default=0.04)       # first RTO, adapts from RTT samples
+parser.add_argument("--fixed-rto", action="store_true")       # keep --rto constant (RTO study)
+parser.add_argument("--delay-data-ms", type=float, default=0.0)  # min spacing of new data packets
 args = parser.parse_args()
 
 # Set impairment
@@ -92,6 +93,10 @@ _listener_thread.start()
 
 seq = 0
 retransmissions = 0
+rto = RTOEstimator(args.rto, adaptive=not args.fixed_rto)
+# one new packet per delay-data-ms at most; the wait for the ACK counts
+# toward the spacing instead of adding to it
+pacer = TokenBucket(1000.0 / args.delay_data_ms if args.delay_data_ms > 0 else 0, 1)
 t0 = time.perf_counter()
 
 with open(args.file, "rb") as f:
@@ -100,26 +105,39 @@ with open(args.file, "rb") as f:
         if not payload:
             break
 
+        pacer.pace()
         pkt = make_pkt(seq, payload)
+        first_try = True
         while True:
+            # cleared before the send, so an ACK quicker than clear() counts
+            _ack_event.clear()
             clientSocket.sendto(pkt, (args.server, args.port))
             send_time = time.perf_counter()
-            _ack_event.clear()
 
             while True:
-                if _ack_event.wait(timeout=args.rto):
+                left = rto.rto - (time.perf_counter() - send_time)
+                if _ack_event.wait(timeout=max(left, 0)):
+                    if _ack_for_seq == seq:
+                        break
+                    _ack_event.clear()  # ACK for the other seq, keep waiting
+                    # the right one may have set() it again just before clear()
                     if _ack_for_seq == seq:
                         break
-                if time.perf_counter() - send_time >= args.rto:
+                if time.perf_counter() - send_time >= rto.rto:
                     retransmissions += 1
+                    rto.backoff()
+                    first_try = False
                     break
 
             if _ack_for_seq == seq:
+                # Karn: a retransmitted packet gives no RTT sample
+                if first_try:
+                    rto.sample(time.perf_counter() - send_time)
+                else:
+                    rto.progress()
                 break
 
         seq ^= 1
-        if args.delay_data_ms > 0:
-            time.sleep(args.delay_data_ms / 1000.0)
 
 #cleanup
 _stop_event.set()
@@ -134,4 +152,5 @@ except: pass
 elapsed = time.perf_counter() - t0
 print(f"TOTAL_TIME_SEC: {elapsed:.6f}")
 print(f"RETRANSMISSIONS: {retransmissions}")
+print(f"RTT: {rto.summary()}")
 sys.stdout.flush()
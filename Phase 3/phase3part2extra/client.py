@@ -1,5 +1,8 @@
 import socket, time, struct, random, argparse, sys, csv, os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from rdtlib.codec import Phase3Codec, Packet
+
 TYPE_DATA = 0x01
 TYPE_ACK  = 0x02
 PAYLOAD_SIZE = 1024
@@ -8,18 +11,12 @@ def make_pkt(seq, payload):
     # make data
     return struct.pack("!BBH", TYPE_DATA, seq, len(payload)) + payload
 
-def parse_pkt(raw):
-    # read pkt
-    try:
-        t = raw[0]; seq = raw[1]
-        if t == TYPE_ACK:
-            return {"ok": True, "type": t, "seq": seq}
-        if t == TYPE_DATA:
-            ln = struct.unpack("!H", raw[2:4])[0]
-            return {"ok": True, "type": t, "seq": seq, "len": ln, "payload": raw[4:4+ln]}
-    except:
-        pass
-    return {"ok": False}
+codec = Phase3Codec(PAYLOAD_SIZE)
+NO_PKT = Packet()   # shared "ok False" result
+
+def parse_pkt(raw, rec=None):
+    # read pkt into a Packet, no dict per datagram
+    return codec.parse(raw, rec)
 
 def drop(p):
     # maybe drop
@@ -66,18 +63,20 @@ def send_with_problems(pkt):
         pkt = corrupt(pkt, DATA_FLIP, skip=4)
     s.sendto(pkt, (A.server, A.port))
 
+ack_rec = Packet()   # reused for every ACK
+
 def recv_ack_with_problems():
     # ack bugs
     try:
         raw, _ = s.recvfrom(2048)
     except socket.timeout:
-        return {"ok": False}
-    if drop(ACK_LOSS): return {"ok": False}
+        return NO_PKT
+    if drop(ACK_LOSS): return NO_PKT
     raw = corrupt(raw, ACK_FLIP)
-    ack = parse_pkt(raw)
-    if ack["ok"] and ack["type"] == TYPE_ACK:
+    ack = parse_pkt(raw, ack_rec)
+    if ack.ok and ack.type == TYPE_ACK:
         return ack
-    return {"ok": False}
+    return NO_PKT
 
 def make_request(seq):
     # ask data
@@ -102,17 +101,17 @@ if A.mode == 6:
         except socket.timeout:
             # ask again
             continue
-        pkt = parse_pkt(raw)
-        if not pkt["ok"] or pkt["type"] != TYPE_DATA:
+        pkt = parse_pkt(raw, ack_rec)
+        if not pkt.ok or pkt.type != TYPE_DATA:
             # ignore bad
             continue
-        if pkt["len"] == 0:
+        if pkt.len == 0:
             # done now
             break
         # count bytes
-        bytes_ok += pkt["len"]
+        bytes_ok += pkt.len
         # say ok
-        ack = make_request(pkt["seq"])
+        ack = make_request(pkt.seq)
         s.sendto(ack,(A.server,A.port))
         # flip bit
         seq ^= 1
@@ -148,9 +147,9 @@ with open(A.file, "rb") as f:
             good = False
             while True:
                 ack = recv_ack_with_problems()
-                if ack["ok"]:
+                if ack.ok:
                     acks_total += 1
-                    if ack["seq"] == seq:
+                    if ack.seq == seq:
                         acks_useful += 1
                         good = True
                         break
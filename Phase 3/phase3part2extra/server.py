@@ -1,20 +1,16 @@
-import socket, time, struct, random, argparse, sys
+import socket, time, struct, random, argparse, sys, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from rdtlib.codec import Phase3Codec, Packet
 
 TYPE_DATA = 0x01
 TYPE_ACK  = 0x02
 
-def parse_pkt(raw):
-    # read packet now
-    try:
-        t = raw[0]; seq = raw[1]
-        if t == TYPE_DATA:
-            ln = struct.unpack("!H", raw[2:4])[0]
-            return {"ok": True, "type": t, "seq": seq, "len": ln, "payload": raw[4:4+ln]}
-        if t == TYPE_ACK:
-            return {"ok": True, "type": t, "seq": seq, "len": 0, "payload": b""}
-    except:
-        pass
-    return {"ok": False, "len": 0}
+codec = Phase3Codec(1024)
+
+def parse_pkt(raw, rec=None):
+    # read packet into a Packet (ACKs get len 0, payload b"")
+    return codec.parse(raw, rec)
 
 def make_ack(seq):
     # build ack packet
@@ -71,6 +67,7 @@ with open(A.file, "rb") as f2:
         data_list.append(c)
 
 index = 0
+rec = Packet()   # reused for every datagram
 
 with open(A.outfile, "wb") as f:
     while True:
@@ -79,9 +76,9 @@ with open(A.outfile, "wb") as f:
 
         if A.mode == 6:
             # receiver driven
-            req = parse_pkt(raw)
-            if not req["ok"]: continue
-            if req["type"] == TYPE_ACK:
+            req = parse_pkt(raw, rec)
+            if not req.ok: continue
+            if req.type == TYPE_ACK:
                 if index >= len(data_list):
                     pkt = make_data(expected, b"")
                     s.sendto(pkt, addr)
@@ -99,11 +96,11 @@ with open(A.outfile, "wb") as f:
                 continue
             raw = corrupt(raw, DATA_FLIP, skip=4)
 
-        pkt = parse_pkt(raw)
-        if pkt["ok"] and pkt["type"] == TYPE_DATA:
-            if pkt["seq"] == expected:
-                if pkt["len"] > 0:
-                    f.write(pkt["payload"]); total_bytes += pkt["len"]
+        pkt = parse_pkt(raw, rec)
+        if pkt.ok and pkt.type == TYPE_DATA:
+            if pkt.seq == expected:
+                if pkt.len > 0:
+                    f.write(pkt.payload); total_bytes += pkt.len
                 ack = make_ack(expected); expected ^= 1
             else:
                 dup_acks += 1; ack = make_ack(expected ^ 1)
@@ -123,7 +120,7 @@ with open(A.outfile, "wb") as f:
         if A.delay_ack_ms > 0:
             time.sleep(A.delay_ack_ms/1000.0)
 
-        if pkt["ok"] and pkt["type"] == TYPE_DATA and pkt["len"] == 0:
+        if pkt.ok and pkt.type == TYPE_DATA and pkt.len == 0:
             break
 
 elapsed = time.perf_counter() - t0
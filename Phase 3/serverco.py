@@ -1,4 +1,7 @@
-import sys, socket, time, struct, random, argparse
+import sys, socket, time, struct, random, argparse, os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import Phase3Codec, Packet
 
 TYPE_DATA = 0x01
 TYPE_ACK  = 0x02
@@ -6,16 +9,14 @@ TYPE_ACK  = 0x02
 DATA_FLIP_PROB = 0.0
 DATA_LOSS_PROB = 0.0
 
-def parse_pkt(raw):
-    try:
-        t = raw[0]; seq = raw[1]
-        if t == TYPE_DATA:
-            length = struct.unpack("!H", raw[2:4])[0]
-            return {"ok": True, "type": TYPE_DATA, "seq": seq, "len": length,
-                    "payload": raw[4:4+length]}
-    except:
-        pass
-    return {"ok": False}
+codec = Phase3Codec(1024)
+
+def parse_pkt(raw, rec=None):
+    # fills rec (a Packet) instead of making a dict per datagram
+    rec = codec.parse(raw, rec)
+    if rec.type != TYPE_DATA:
+        rec.clear()   # only DATA is valid on this side
+    return rec
 
 def make_ack(seq):
     return struct.pack("!BB", TYPE_ACK, seq)
@@ -48,6 +49,7 @@ duplicate_acks = 0
 dropped = 0
 total_bytes = 0
 t0 = time.perf_counter()
+p = Packet()   # reused for every datagram
 
 with open(args.outfile, "wb") as f:
     while True:
@@ -62,12 +64,12 @@ with open(args.outfile, "wb") as f:
                 continue
             raw = maybe_corrupt(raw)
 
-        p = parse_pkt(raw)
-        if p["ok"] and p["type"] == TYPE_DATA:
-            seq = p["seq"]
+        parse_pkt(raw, p)
+        if p.ok and p.type == TYPE_DATA:
+            seq = p.seq
             if seq == expected:
-                f.write(p["payload"])
-                total_bytes += p["len"]
+                f.write(p.payload)
+                total_bytes += p.len
                 ack = make_ack(expected)
                 expected ^= 1
             else:
@@ -75,12 +77,12 @@ with open(args.outfile, "wb") as f:
                 ack = make_ack(expected ^ 1)
             sock.sendto(ack, addr)
 
-        elif p["ok"]:
+        elif p.ok:
             sock.sendto(make_ack(expected ^ 1), addr)
 
         if args.delay_ack_ms > 0:
             time.sleep(args.delay_ack_ms/1000.0)
-        if p["ok"] and p["len"] == 0:
+        if p.ok and p.len == 0:
             break
 
 elapsed = time.perf_counter() - t0
@@ -4,120 +4,234 @@ import time
 import threading
 import random
 import sys
+import os
+import mmap
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.checksum import verify
+from rdtlib.codec import Phase4Codec
+from rdtlib.batchio import BatchSender, BatchReceiver
+from rdtlib.reactor import Reactor
+from rdtlib.rto import RTOEstimator
+from rdtlib import cc as congestion
+from rdtlib.scoreboard import Scoreboard, unwrap
 
 PACKET_SIZE = 1024
-WINDOW_SIZE = 10
-TIMEOUT = 0.2
+WINDOW_SIZE = 10    # window for CC = "fixed"
+CC = "fixed"        # congestion control: fixed, reno or cubic (change with --cc)
+MAX_WINDOW = 1000   # cwnd cap, the receiver has no window of its own
+TIMEOUT = 0.2   # first RTO when ADAPTIVE_RTO is on
+ADAPTIVE_RTO = True  # RFC 6298 RTO from measured RTTs, False keeps TIMEOUT fixed
+DUP_ACKS = 3    # duplicate ACKs that trigger a fast retransmit (0 = off)
+BATCH_IO = True  # sendmmsg/recvmmsg bursts on Linux, per-packet calls elsewhere
+TIMERFD = True  # retransmit deadline on a Linux timerfd, select timeout elsewhere
 
 LOSS_ACK = 0.0
 ERROR_ACK = 0.0
 
-def checksum(data: bytes) -> int:
-    s = 0
-    for i in range(0,len(data),2):
-        if i +1 < len(data):
-            w = (data[i] << 8) + data[i+1]
-        else:
-            w = (data[i] << 8)
-        s = (s+w) & 0xFFFF
-    return (~s) & 0xFFFF
+# hand acked map pages back to the kernel in steps of this many bytes
+RELEASE_STEP = 4 * 1024 * 1024
 
-def make_pkt(seq, payload):
-    header = struct.pack("!IHH", seq, 0, len(payload))
-    checks = checksum(header + payload)
-    header = struct.pack("!IHH", seq, checks, len(payload))
-    return header + payload
+codec = Phase4Codec(PACKET_SIZE)
 
 def parse_ack(data):
     if len(data) < 6:
         return None
-    seq, checks = struct.unpack("!IH", data[:6])
-    fake_head = struct.pack ("!IH", seq, 0)
-    calculate = checksum(fake_head)
-
-    if calculate != checks:
+    # checksum field is bytes 4..5
+    if not verify(data[:6], 4):
         return None
+    seq, checks = struct.unpack("!IH", data[:6])
     return seq
 class GBNSender:
-    def __init__(self, udpfile, ip, port):
+    def __init__(self, udpfile, ip, port, cc=None):
         self.destination = (ip, port)
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.settimeout(0.05)
-
-        with open(udpfile, "rb") as f:
-            file = f.read()
-        self.packets = []
-        idx = 0
-        seq = 0
-        while idx < len(file):
-            chunk = file[idx:idx+PACKET_SIZE]
-            self.packets.append(make_pkt(seq, chunk))
-            seq += 1
-            idx += PACKET_SIZE
+        # window bursts and queued ACKs in one syscall each where possible;
+        # without batching each packet still goes out with sendmsg
+        self.tx = BatchSender(self.socket, enabled=BATCH_IO)
+        self.rx = BatchReceiver(self.socket, enabled=BATCH_IO)
+
+        # map the file instead of reading it; packets are built from
+        # views into the map only when they enter the window
+        self.file = open(udpfile, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size > 0:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.mm = b""   # mmap can't map an empty file
+        self.view = memoryview(self.mm)
+        self.total = (self.size + PACKET_SIZE - 1) // PACKET_SIZE
+        cc = cc or CC
+        max_cwnd = WINDOW_SIZE if cc == "fixed" else MAX_WINDOW
+        # first send times and resent flags (Karn) for the window, and the
+        # header of each packet in it, in rings indexed by seq
+        self.board = Scoreboard(max_cwnd)
+        self.headers = [None] * self.board.size
+        self.released = 0   # map bytes already handed back to the kernel
 
         self.base = 0
         self.nextseq = 0
 
+        # ACKs and the timer wait in one place, woken at the deadline
+        self.reactor = Reactor(timerfd=TIMERFD)
+        self.reactor.add_reader(self.socket, self.on_acks)
         self.timer = None
-        self.timer_start = 0
+        self.rto = RTOEstimator(TIMEOUT, adaptive=ADAPTIVE_RTO)
+        self.resent_below = 0   # nextseq before the last go-back, late ACKs reach this far
+        self.dup_acks = 0       # ACKs in a row for base - 1
+        self.cc = congestion.make(cc, max_cwnd=max_cwnd)
+        self.recover = 0        # one window cut per loss episode: not again below this
+
+    def payload(self, seq):
+        off = seq * PACKET_SIZE
+        return self.view[off:off + PACKET_SIZE]
+
+    def send_pkt(self, seq):
+        payload = self.payload(seq)
+        i = self.board.slot(seq)
+        header = self.headers[i]
+        if header is None:
+            header = codec.header(seq, payload)
+            self.headers[i] = header
+        # header and payload go out as one datagram
+        self.tx.add_parts([header, payload], self.destination)
+        self.board.sent(seq, time.monotonic())
+
+    def slide(self, new_base):
+        ack = new_base - 1
+        self.rto.progress()
+        sent = self.board.sample(ack)
+        if sent is not None:
+            self.rto.sample(time.monotonic() - sent)
+        for s in range(self.base, new_base):
+            self.headers[self.board.slot(s)] = None
+        self.board.release(self.base, new_base)
+        self.cc.on_ack(new_base - self.base)
+        self.base = new_base
+        self.nextseq = max(self.nextseq, new_base)
+        self.release()
+
+    def release(self):
+        # drop pages that are fully acked so RSS stays flat on big files
+        if not hasattr(self.mm, "madvise"):
+            return
+        done = (self.base * PACKET_SIZE) // mmap.PAGESIZE * mmap.PAGESIZE
+        if done - self.released >= RELEASE_STEP:
+            self.mm.madvise(mmap.MADV_DONTNEED, self.released, done - self.released)
+            self.released = done
+
+    def close(self):
+        self.view.release()
+        if self.size > 0:
+            self.mm.close()
+        self.file.close()
+        self.reactor.close()
+        self.socket.close()
 
     def start_timer(self):
-        self.timer_start = time.time()
-
-    def timer_expired(self):
-        return(time.time() - self.timer_start) > TIMEOUT
+        self.stop_timer()
+        self.timer = self.reactor.call_later(self.rto.rto, self.timeout)
+
+    def stop_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def timeout(self):
+        self.rto.backoff()
+        self.cc.on_timeout()
+        self.recover = self.nextseq
+        print("[TIMEOUT] Resending window")
+        self.resend_window()
+
+    def resend_window(self):
+        # go back to base, but only as far as the (now smaller) cwnd;
+        # the rest is sent again as the window opens
+        self.resent_below = max(self.resent_below, self.nextseq)
+        self.nextseq = min(self.nextseq, self.base + self.cc.window())
+        for i in range(self.base, self.nextseq):
+            print(f"[RESEND] Packet {i}")
+            self.send_pkt(i)
+        self.tx.flush()
+        self.start_timer()
 
     def send(self):
-        print(f"Total packets: {len(self.packets)}")
-        while self.base < len(self.packets):
-            while self.nextseq < min(self.base + WINDOW_SIZE, len(self.packets)):
+        print(f"Total packets: {self.total}")
+        while self.base < self.total:
+            while self.nextseq < min(self.base + self.cc.window(), self.total):
               print(f"[SEND] PACKET {self.nextseq}")
-              self.socket.sendto(self.packets[self.nextseq], self.destination)
+              self.send_pkt(self.nextseq)
 
               if self.base == self.nextseq:
                   self.start_timer()
               self.nextseq += 1
+            self.tx.flush()
 
-            try:
-                data, _= self.socket.recvfrom(PACKET_SIZE)
-                if random.random() < LOSS_ACK:
-                    print("[SIM] Dropped ACK")
-                    continue
-                if random.random() <ERROR_ACK:
-                    data = bytearray(data)
-                    data[3] ^= 0xFF
-                    data = bytes(data)
-
-                ack = parse_ack(data)
-                if ack is not None:
-                    print(f"[ACK] Received ACK {ack}")
-                    self.base = ack + 1
-
-                    if self.base == self.nextseq:
-                        pass
-                    else:
-                        self.start_timer()
-            except socket.timeout:
-                pass
-            if self.base != self.nextseq and self.timer_expired():
-                print("[TIMEOUT] Resending window")
-                for i in range(self.base, self.nextseq):
-                    print(f"[RESEND] Packet {i}")
-                    self.socket.sendto(self.packets[i], self.destination)
-                self.start_timer()
+            # sleep until ACKs come in or the timer is due, then handle all of it
+            self.reactor.run_once()
         print("File transfer complete.")
+        print(self.rto.summary())
+        print(self.cc.summary())
+        print(self.reactor.summary())
+
+    def on_acks(self):
+        # every ACK already queued
+        for data, _ in self.rx.recv():
+            if random.random() < LOSS_ACK:
+                print("[SIM] Dropped ACK")
+                continue
+            if random.random() <ERROR_ACK:
+                data = bytearray(data)
+                data[3] ^= 0xFF
+                data = bytes(data)
+
+            ack = parse_ack(data)
+            if ack is not None:
+                ack = unwrap(ack, self.base)
+            # a late ACK may cover packets past a rewound nextseq
+            if ack is not None and self.base < ack + 1 <= max(self.nextseq, self.resent_below):
+                print(f"[ACK] Received ACK {ack}")
+                self.slide(ack + 1)
+                self.dup_acks = 0
+
+                if self.base == self.nextseq:
+                    self.stop_timer()
+                else:
+                    self.start_timer()
+            elif ack is not None and ack + 1 == self.base and self.base != self.nextseq:
+                # receiver re-ACKs base - 1 for every packet after a hole
+                self.dup_acks += 1
+                if self.dup_acks == DUP_ACKS:
+                    print(f"[FAST RETRANSMIT] {self.dup_acks} duplicate ACKs")
+                    if self.base >= self.recover:
+                        self.cc.on_loss()
+                        self.recover = self.nextseq
+                    self.resend_window()
 
 if __name__ == "__main__":
+    # congestion control and where to save its cwnd over time
+    cc = None
+    trace = None
+    if "--cc" in sys.argv:
+        i = sys.argv.index("--cc")
+        cc = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+    if "--cwnd-trace" in sys.argv:
+        i = sys.argv.index("--cwnd-trace")
+        trace = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
     if len(sys.argv) != 4:
-        print("Usage: python client.py <file> <server_ip> <server_port>")
+        print("Usage: python client.py <file> <server_ip> <server_port> [--cc fixed|reno|cubic] [--cwnd-trace FILE]")
         exit()
 
-    sender = GBNSender(sys.argv[1], sys.argv[2], int(sys.argv[3]))
-    sender.send()
     start = time.time()
+    sender = GBNSender(sys.argv[1], sys.argv[2], int(sys.argv[3]), cc)
     sender.send()
     end = time.time()
+    sender.close()
     print("Completion time:", end - start)
+    if trace:
+        sender.cc.save_trace(trace)
 
 
 
@@ -1,71 +1,99 @@
 import socket
 import struct
 import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.checksum import inet_checksum
+from rdtlib.codec import Phase4Codec
+from rdtlib.rxpool import RecvPool
+from rdtlib.diskwriter import CoalescingWriter
+from rdtlib.ackpolicy import AckPolicy
+from rdtlib.scoreboard import wire
 
 LOSS_DATA = 0.0
 ERROR_DATA = 0.0
+FLUSH_SIZE = 1024 * 1024  # write to disk in blocks this big
+FLUSH_INTERVAL = 0.05     # or after this many seconds idle
+ACK_EVERY = 0     # in-order packets per ACK (1 = every packet, 0 = no limit)
+ACK_DELAY = 0.0   # seconds an ACK may wait for more (0 = until the socket is drained)
 
-def checksum(data: bytes) -> int:
-    s = 0
-    for i in range(0, len(data), 2):
-        if i + 1 < len(data):
-            w = (data[i] << 8) + data[i+1]
-        else:
-            w = (data[i] << 8)
-            s = (s+w) & 0xFFFF
-    return (~s) & 0xFFFF
+codec = Phase4Codec(1024)
 
 def parse_packet(packet):
-    if len(packet) < 8:
-        return None, None, None
-    seq, checks, length = struct.unpack("!IHH", packet[:8])
-    payload = packet[8:]
-
-    if len(payload) != length:
+    # payload comes back as a view into packet, no slice copy
+    p = codec.decode(packet)
+    if p is None:
         return None, None, None
-    cmp_header = struct.pack("!IHH", seq, 0, length)
-
-    if checksum(cmp_header +payload) != checks:
-        return None, None, None
-    return seq, length, payload
+    return p
 def ack_packet(seq):
+    seq = wire(seq)     # 32 bits on the wire
     header = struct.pack("!IH", seq, 0)
-    checks = checksum(header)
-    return struct.pack("IH", seq, checks)
+    checks = inet_checksum(header)
+    return struct.pack("!IH", seq, checks)
 
 class GBNReceiver:
     def __init__(self, port, outfile):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.bind(("0.0.0.0", port))
         self.expected = 0
-        self.out = (outfile, "wb")
+        # background writer: the ACK goes out without waiting on the disk,
+        # and idle data still reaches the file after FLUSH_INTERVAL
+        self.out = CoalescingWriter(outfile, FLUSH_SIZE, FLUSH_INTERVAL)
+        # every datagram lands in the same preallocated buffer
+        self.rx = RecvPool(self.socket, 1500)
+        # one cumulative ACK per drained socket (or per ACK_EVERY packets)
+        self.acks = AckPolicy(ACK_EVERY, ACK_DELAY)
+        self.addr = None
 
     def run(self):
         print("Receiver started")
 
         while True:
-            packet, addr = self.socket.recvform(1500)
-            if random.random() < LOSS_DATA:
-                print("Dropped Data Packet")
-                continue
-            if random.random() < ERROR_DATA:
-                print("Bit FLipped in Data")
-                packet = bytearray(packet)
-                packet[5] ^= 0xFF
-                packet = bytes(packet)
-            seq, length, payload = parse_packet(packet)
-
-            if seq is None:
-                print("Error: Bad Checksum")
+            # block, but only until a delayed ACK is due
+            if not self.rx.poll(self.acks.wait()):
+                self.send_ack()
                 continue
-
-            print("Received Packet %d" % seq)
-            if seq == self.expected:
-                self.out.write(payload)
-                self.expected += 1
-            ack = ack_packet(self.expected - 1)
-            print(" Sending ACK {self.expected-1}")
-            self.socket.sendto(ack, addr)
+            item = self.rx.recv()
+            while item is not None:
+                self.handle(*item)
+                item = self.rx.try_recv()
+            # nothing more queued
+            if self.acks.drained():
+                self.send_ack()
+
+    def handle(self, packet, addr):
+        if random.random() < LOSS_DATA:
+            print("Dropped Data Packet")
+            return
+        if random.random() < ERROR_DATA:
+            print("Bit FLipped in Data")
+            # the receive buffer is writable, flip in place
+            packet[5] ^= 0xFF
+        seq, length, payload = parse_packet(packet)
+
+        if seq is None:
+            print("Error: Bad Checksum")
+            return
+
+        self.addr = addr
+        print("Received Packet %d" % seq)
+        in_order = seq == wire(self.expected)
+        if in_order:
+            self.out.write(payload)
+            self.expected += 1
+        # out of order goes out at once, the sender counts duplicates
+        if self.acks.data(in_order):
+            self.send_ack()
+
+    def send_ack(self):
+        if self.expected == 0:
+            return      # nothing in order yet, no ACK to repeat
+        ack = ack_packet(self.expected - 1)
+        print(f" Sending ACK {self.expected-1}")
+        self.socket.sendto(ack, self.addr)
+        self.acks.sent()
 
 if __name__ == "__main__":
     import sys
@@ -74,7 +102,12 @@ if __name__ == "__main__":
         exit()
 
     r = GBNReceiver(int(sys.argv[1]), sys.argv[2])
-    r.run()
+    try:
+        r.run()
+    except KeyboardInterrupt:
+        # Ctrl+C ends the receiver
+        r.out.close()
+        print(r.acks.summary())
 
 
 
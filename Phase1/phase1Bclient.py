@@ -3,11 +3,15 @@
 # and sends them to the server over UDP.
 
 import os
+import sys
 import math
-import time
+import random
 import socket
 import struct
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.pacer import TokenBucket
+
 # server details 
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 5051
@@ -15,14 +19,18 @@ SERVER_PORT = 5051
 # size of each chunk of data to send
 MAX_PAYLOAD = 1024
 
-# META: type (1B), file_size (4B), total_pkts (4B), name_len (2B)
-META_HDR_FMT = ">B I I H"
-# DATA: type (1B), index (4B), payload_len (2B)
-DATA_HDR_FMT = ">B I H"
+# pacing: DATA packets go out at this many bytes/s (0 = as fast as possible)
+SEND_RATE = 50 * 1000 * 1000
+SEND_BURST = 64 * 1024   # bytes that may go back to back
+
+# META: type (1B), transfer_id (4B), file_size (4B), total_pkts (4B), name_len (2B)
+META_HDR_FMT = ">B I I I H"
+# DATA: type (1B), transfer_id (4B), index (4B), payload_len (2B)
+DATA_HDR_FMT = ">B I I H"
 
-# packet types
-TYPE_META = 0
-TYPE_DATA = 1
+# packet types (0 and 1 are the old formats without a transfer id)
+TYPE_META = 2
+TYPE_DATA = 3
 
 
 def make_pkt(ptype, **kw):
@@ -30,15 +38,17 @@ def make_pkt(ptype, **kw):
     Build a packet of the given type.
     TYPE_META includes file info and name.
     TYPE_DATA includes index and payload bytes.
+    Both carry the transfer id so the server can keep files apart.
     """
+    tid = kw["tid"]
     if ptype == TYPE_META:
         file_size, total_pkts = kw["file_size"], kw["total_pkts"]
         name_bytes = kw["file_name"].encode("utf-8")
-        hdr = struct.pack(META_HDR_FMT, TYPE_META, file_size, total_pkts, len(name_bytes))
+        hdr = struct.pack(META_HDR_FMT, TYPE_META, tid, file_size, total_pkts, len(name_bytes))
         return hdr + name_bytes
     elif ptype == TYPE_DATA:
         index, payload = kw["index"], kw["payload"]
-        hdr = struct.pack(DATA_HDR_FMT, TYPE_DATA, index, len(payload))
+        hdr = struct.pack(DATA_HDR_FMT, TYPE_DATA, tid, index, len(payload))
         return hdr + payload
     else:
         raise ValueError("Invalid packet type")
@@ -58,33 +68,34 @@ def rdt_send(sock, addr, file_path):
       2) Read file in 1024-byte chunks.
       3) Send each chunk as a DATA packet with an index.
       4) Print progress every 100 packets.
-      5) Sleep slightly every 200 packets to avoid flooding.
+      5) Pace the packets to SEND_RATE so the server's buffer keeps up.
     """
     file_name = os.path.basename(file_path)
     file_size = os.path.getsize(file_path)
     total_pkts = math.ceil(file_size / MAX_PAYLOAD)
+    # new id per file, so a second file from this socket is a new transfer
+    tid = random.getrandbits(32)
 
     # send META first so server can prepare
-    meta = make_pkt(TYPE_META, file_name=file_name, file_size=file_size, total_pkts=total_pkts)
+    meta = make_pkt(TYPE_META, tid=tid, file_name=file_name, file_size=file_size, total_pkts=total_pkts)
     udt_send(sock, addr, meta)
     print(f"[CLIENT] META sent: {file_name}, {file_size} bytes, {total_pkts} packets")
 
     sent = 0
+    pacer = TokenBucket(SEND_RATE, SEND_BURST)
     with open(file_path, "rb") as f:
         for index in range(total_pkts):
             # read next chunk of file
             payload = f.read(MAX_PAYLOAD)
-            pkt = make_pkt(TYPE_DATA, index=index, payload=payload)
+            pkt = make_pkt(TYPE_DATA, tid=tid, index=index, payload=payload)
+            pacer.pace(len(pkt))
             udt_send(sock, addr, pkt)
             sent += 1
 
             # show progress every 100 packets
             if sent % 100 == 0 or sent == total_pkts:
                 print(f"[CLIENT] Sent {sent}/{total_pkts}")
-
-            # pacing: small delay every 200 packets
-            if (index + 1) % 200 == 0:
-                time.sleep(0.003)
+    print(f"[CLIENT] {pacer.summary()}")
 
 
 def main():
@@ -1,11 +1,18 @@
 # Phase 1B: UDP file receiver
 # This server listens on a UDP port, receives META and DATA packets,
 # and reassembles the original file from the received chunks.
+# Several clients can send at once: every transfer is kept apart by
+# (client address, transfer id).
 
 import os
+import sys
+import time
 import socket
 import struct
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.rxpool import RecvPool
+
 # listen on all interfaces on port 5051
 SERVER_HOST = "0.0.0.0"
 SERVER_PORT = 5051
@@ -20,17 +27,30 @@ META_HDR_FMT  = ">B I I H"
 META_HDR_SIZE = struct.calcsize(META_HDR_FMT)
 DATA_HDR_FMT  = ">B I H"
 DATA_HDR_SIZE = struct.calcsize(DATA_HDR_FMT)
+# same packets with a transfer id after the type byte
+META_ID_FMT  = ">B I I I H"
+META_ID_SIZE = struct.calcsize(META_ID_FMT)
+DATA_ID_FMT  = ">B I I H"
+DATA_ID_SIZE = struct.calcsize(DATA_ID_FMT)
 
 TYPE_META = 0
 TYPE_DATA = 1
+TYPE_META_ID = 2
+TYPE_DATA_ID = 3
+
+# limits for many transfers at once
+IDLE_TIMEOUT = 10.0                   # drop a transfer after this many idle seconds
+MAX_FILE_SIZE = 256 * 1024 * 1024     # largest single file buffer
+MAX_TOTAL_BUFFER = 1024 * 1024 * 1024 # all buffers together
+SWEEP_INTERVAL = 1.0                  # how often idle transfers are checked
 
 
-def rdt_rcv(sock):
+def rdt_rcv(rx):
     """
-    Receive a UDP packet from the socket.
-    Returns (packet_bytes, sender_address).
+    Receive a UDP packet through the socket's RecvPool.
+    Returns (packet_view, sender_address); the view is reused by the next call.
     """
-    return sock.recvfrom(BUF_SIZE)
+    return rx.recv()
 
 
 def extract(pkt):
@@ -38,64 +58,112 @@ def extract(pkt):
     Decode a packet into a dict.
     META packets carry file info.
     DATA packets carry chunk index and payload.
+    Packets without a transfer id (old clients) get tid 0.
     """
     ptype = pkt[0]
     if ptype == TYPE_META:
-        _, fsize, tpkts, nlen = struct.unpack(META_HDR_FMT, pkt[:META_HDR_SIZE])
-        fname = pkt[META_HDR_SIZE:META_HDR_SIZE+nlen].decode("utf-8", errors="ignore")
-        return {"type": TYPE_META, "file_size": fsize, "total_pkts": tpkts, "file_name": fname}
+        _, fsize, tpkts, nlen = struct.unpack_from(META_HDR_FMT, pkt)
+        fname = bytes(pkt[META_HDR_SIZE:META_HDR_SIZE+nlen]).decode("utf-8", errors="ignore")
+        return {"type": TYPE_META, "tid": 0, "file_size": fsize, "total_pkts": tpkts, "file_name": fname}
+    elif ptype == TYPE_META_ID:
+        _, tid, fsize, tpkts, nlen = struct.unpack_from(META_ID_FMT, pkt)
+        fname = bytes(pkt[META_ID_SIZE:META_ID_SIZE+nlen]).decode("utf-8", errors="ignore")
+        return {"type": TYPE_META, "tid": tid, "file_size": fsize, "total_pkts": tpkts, "file_name": fname}
     elif ptype == TYPE_DATA:
-        _, index, plen = struct.unpack(DATA_HDR_FMT, pkt[:DATA_HDR_SIZE])
+        _, index, plen = struct.unpack_from(DATA_HDR_FMT, pkt)
+        # view into the receive buffer, copied once into the file buffer
         payload = pkt[DATA_HDR_SIZE:DATA_HDR_SIZE+plen]
-        return {"type": TYPE_DATA, "index": index, "payload": payload}
+        return {"type": TYPE_DATA, "tid": 0, "index": index, "payload": payload}
+    elif ptype == TYPE_DATA_ID:
+        _, tid, index, plen = struct.unpack_from(DATA_ID_FMT, pkt)
+        payload = pkt[DATA_ID_SIZE:DATA_ID_SIZE+plen]
+        return {"type": TYPE_DATA, "tid": tid, "index": index, "payload": payload}
     else:
         raise ValueError("Unknown packet type")
 
 
-def deliver_data(state, part):
+def deliver_data(transfers, key, part, now):
     """
-    Handle a decoded packet.
-    META: allocate buffer and reset counters.
+    Handle a decoded packet for the transfer key = (client address, tid).
+    META: allocate a buffer for that transfer (a repeated META from the
+    same key restarts only that transfer, never someone else's).
     DATA: place payload at the correct offset and track progress.
-    When all packets received, write file to disk.
+    When all packets received, write file to disk and forget the transfer.
     """
     if part["type"] == TYPE_META:
-        # prepare state for new incoming file
-        state["file_name"]  = part["file_name"]
-        state["file_size"]  = part["file_size"]
-        state["total_pkts"] = part["total_pkts"]
-        state["buffer"]     = bytearray(state["file_size"])
-        state["received"]   = 0
-        state["seen"]       = set()
-        print(f"[SERVER] Incoming file: {state['file_name']} "
-              f"({state['file_size']} bytes) in {state['total_pkts']} packets")
+        old = transfers.pop(key, None)
+        in_use = sum(len(st["buffer"]) for st in transfers.values())
+        fsize = part["file_size"]
+        # refuse what would blow the buffer caps
+        if fsize > MAX_FILE_SIZE or in_use + fsize > MAX_TOTAL_BUFFER:
+            print(f"[SERVER] {key}: refused {part['file_name']} ({fsize} bytes), buffer cap")
+            return
+        # the packet count sizes "seen", it must match the file size
+        if part["total_pkts"] != -(-fsize // MAX_PAYLOAD):
+            print(f"[SERVER] {key}: refused {part['file_name']}, "
+                  f"{part['total_pkts']} packets for {fsize} bytes")
+            return
+        if old is not None:
+            print(f"[SERVER] {key}: restarted by new META")
+        transfers[key] = {
+            "file_name": part["file_name"],
+            "file_size": fsize,
+            "total_pkts": part["total_pkts"],
+            "buffer": bytearray(fsize),
+            "received": 0,
+            "seen": bytearray(part["total_pkts"]),  # one byte per packet
+            "last": now,
+        }
+        print(f"[SERVER] {key}: incoming file: {part['file_name']} "
+              f"({fsize} bytes) in {part['total_pkts']} packets")
+        _check_done(transfers, key)
         return
 
     if part["type"] == TYPE_DATA:
+        state = transfers.get(key)
+        if state is None:
+            return          # META lost, transfer evicted or refused
+        state["last"] = now
         idx, payload = part["index"], part["payload"]
 
-        # accept new packets only
-        if idx not in state["seen"]:
-            state["seen"].add(idx)
-
-            # calculate offset for the chunk
-            offset = idx * MAX_PAYLOAD
+        # accept new packets only, and only inside the announced file
+        offset = idx * MAX_PAYLOAD
+        if idx < state["total_pkts"] and not state["seen"][idx] \
+                and offset + len(payload) <= state["file_size"]:
+            state["seen"][idx] = 1
             state["buffer"][offset:offset+len(payload)] = payload
 
             state["received"] += 1
 
             # print progress every 100 packets
             if state["received"] % 100 == 0 or state["received"] == state["total_pkts"]:
-                print(f"[SERVER] Received {state['received']}/{state['total_pkts']}")
+                print(f"[SERVER] {key}: received {state['received']}/{state['total_pkts']}")
 
-        # file is complete, write to disk and reset
-        #to prepare for the next file
-        if state["received"] == state["total_pkts"]:
-            out_name = _unique_name(state["file_name"])
-            with open(out_name, "wb") as f:
-                f.write(state["buffer"])
-            print(f"[SERVER] Saved: {out_name}")
-            _reset_state(state)
+        _check_done(transfers, key)
+
+
+def _check_done(transfers, key):
+    """
+    If the transfer has every packet, write it to disk and drop its state.
+    """
+    state = transfers[key]
+    if state["received"] == state["total_pkts"]:
+        out_name = _unique_name(state["file_name"])
+        with open(out_name, "wb") as f:
+            f.write(state["buffer"])
+        print(f"[SERVER] {key}: saved: {out_name}")
+        del transfers[key]
+
+
+def _evict_idle(transfers, now):
+    """
+    Drop transfers that have not seen a packet for IDLE_TIMEOUT seconds,
+    so a client that died mid-file doesn't hold its buffer forever.
+    """
+    for key in [k for k, st in transfers.items() if now - st["last"] > IDLE_TIMEOUT]:
+        st = transfers.pop(key)
+        print(f"[SERVER] {key}: evicted {st['file_name']} after "
+              f"{st['received']}/{st['total_pkts']} packets")
 
 
 def _unique_name(name: str) -> str:
@@ -104,6 +172,8 @@ def _unique_name(name: str) -> str:
     This avoids overwriting existing files.
     Example: file.bmp, file(1).bmp, file(2).bmp, ...
     """
+    # only the base name, a client must not pick the directory
+    name = os.path.basename(name) or "received.bin"
     base, ext = os.path.splitext(name)
     candidate = name
     i = 1
@@ -113,21 +183,6 @@ def _unique_name(name: str) -> str:
     return candidate
 
 
-def _reset_state(state):
-    """
-    Clear the state so the server is ready for the next file transfer.
-    This resets all relevant fields in the state dictionary.
-    """
-    state.update({
-        "file_name": None,
-        "file_size": None,
-        "total_pkts": None,
-        "buffer": None,
-        "received": 0,
-        "seen": set()
-    })
-
-
 def main():
     """
     Sets up a UDP socket, enlarges buffer, and receives packets forever.
@@ -135,22 +190,31 @@ def main():
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
     sock.bind((SERVER_HOST, SERVER_PORT))
+    # wake up now and then even when idle, to evict dead transfers
+    sock.settimeout(SWEEP_INTERVAL)
+    rx = RecvPool(sock, BUF_SIZE)
     print(f"[SERVER] UDP listening on {SERVER_HOST}:{SERVER_PORT}")
 
-    # state keeps track ofcurrent file being received
-    state = {"file_name": None, "file_size": None, "total_pkts": None,
-             "buffer": None, "received": 0, "seen": set()}
+    # one state per (client address, transfer id)
+    transfers = {}
+    last_sweep = time.monotonic()
 
     # loops forever to process packets
     while True:
         try:
-            pkt, _ = rdt_rcv(sock)
-            part   = extract(pkt)
-            deliver_data(state, part)
+            pkt, addr = rdt_rcv(rx)
+            part = extract(pkt)
+            deliver_data(transfers, (addr, part["tid"]), part, time.monotonic())
+        except socket.timeout:
+            pass
         except Exception as e:
             print(f"[SERVER] Packet error: {e}")
 
+        now = time.monotonic()
+        if now - last_sweep >= SWEEP_INTERVAL:
+            _evict_idle(transfers, now)
+            last_sweep = now
+
 
 if __name__ == "__main__":
     main()
-
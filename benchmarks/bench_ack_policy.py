@@ -0,0 +1,125 @@
+# Receiver ACK policies for the GBN receivers (rdtlib/ackpolicy.py).
+# Runs phase4extracredit1/GbackN.py, phase4extracredit2/GbackN_mt.py and
+# the Phase 4 serverco/clientco pair with the server's ACK_EVERY/ACK_DELAY
+# set to
+#
+#   every    one ACK per data packet (what the receivers used to do)
+#   drain    drain the socket, then one cumulative ACK
+#   delayed  ACK every --every packets or after --delay-us, whichever first
+#
+# and prints the completion time the client reports and how many ACKs the
+# server sent.  --loss puts a relay in between that drops data packets.
+#
+#   py -3 benchmarks/bench_ack_policy.py
+#   py -3 benchmarks/bench_ack_policy.py --loss 2 --runs 3 --every 4 --delay-us 500
+
+import os
+import re
+import sys
+import time
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+
+from lossrelay import relay
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+EC1 = os.path.join(ROOT, "phase4extracredit1")
+EC2 = os.path.join(ROOT, "phase4extracredit2")
+P4 = os.path.join(ROOT, "Phase 4")
+
+# name: (server -c code, client argv, file the server writes)
+TARGETS = {
+    "GbackN": (
+        "import sys; sys.path.insert(0, {d!r}); import GbackN as s; "
+        "s.ACK_EVERY = {every}; s.ACK_DELAY = {delay}; s.server_gbn({port})",
+        [os.path.join(EC1, "GbackN.py"), "client", "127.0.0.1", "{port}", "{src}"],
+        "udpfile_received.jpg", EC1),
+    "GbackN_mt": (
+        "import sys; sys.path.insert(0, {d!r}); import GbackN_mt as s; "
+        "s.ACK_EVERY = {every}; s.ACK_DELAY = {delay}; s.server_gbn({port})",
+        [os.path.join(EC2, "GbackN_mt.py"), "client", "127.0.0.1", "{port}", "{src}"],
+        "udpfile_received_mt.jpg", EC2),
+    "Phase 4": (
+        "import sys; sys.path.insert(0, {d!r}); import serverco as s; "
+        "s.ACK_EVERY = {every}; s.ACK_DELAY = {delay}; r = s.GBNReceiver({port}, 'out.bin')\n"
+        "try:\n    r.run()\nexcept KeyboardInterrupt:\n    r.out.close(); print(r.acks.summary())",
+        [os.path.join(P4, "clientco.py"), "{src}", "127.0.0.1", "{port}"],
+        "out.bin", P4),
+}
+
+
+def run(target, src, every, delay, loss, port):
+    server, client, out_name, d = TARGETS[target]
+    srv_port = port + 1 if loss else port
+    with tempfile.TemporaryDirectory() as cwd, tempfile.TemporaryFile("w+") as log:
+        srv = subprocess.Popen([sys.executable, "-c", server.format(d=d, every=every, delay=delay, port=srv_port)],
+                               cwd=cwd, stdout=log)
+        stop = threading.Event()
+        if loss:
+            t = threading.Thread(target=relay, args=(port, srv_port, loss, stop), daemon=True)
+            t.start()
+        time.sleep(0.3)
+        try:
+            cli = subprocess.run([sys.executable] + [a.format(port=port, src=src) for a in client],
+                                 cwd=cwd, capture_output=True, text=True, timeout=120)
+            if target == "Phase 4":
+                # this receiver never ends on its own
+                time.sleep(0.2)
+                srv.send_signal(signal.SIGINT)
+            srv.wait(timeout=10)
+        finally:
+            # a server still up (END lost, client failed) would hold the port
+            if srv.poll() is None:
+                srv.kill()
+                srv.wait()
+            stop.set()
+            if loss:
+                t.join()
+        log.seek(0)
+        out = log.read()
+        elapsed = float(re.search(r"(?:Time = |Completion time: )([\d.]+)", cli.stdout).group(1))
+        acks = int(re.search(r"(\d+) ACKs for", out).group(1))
+        with open(src, "rb") as a, open(os.path.join(cwd, out_name), "rb") as b:
+            ok = a.read() == b.read()
+        return elapsed, acks, ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    ap.add_argument("--every", type=int, default=8, help="delayed mode: packets per ACK")
+    ap.add_argument("--delay-us", type=float, default=200, help="delayed mode: max ACK delay")
+    ap.add_argument("--loss", type=float, default=0.0, help="data loss, percent")
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--size-kb", type=int, default=2048)
+    ap.add_argument("--port", type=int, default=9731)
+    args = ap.parse_args()
+
+    modes = [("every", 1, 0.0), ("drain", 0, 0.0), ("delayed", args.every, args.delay_us / 1e6)]
+    fd, src = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(args.size_kb * 1024))
+    try:
+        print(f"{args.size_kb} KB, data loss {args.loss}%, {args.runs} runs, "
+              f"delayed = every {args.every} or {args.delay_us:.0f} us")
+        print(f"{'receiver':<11}{'mode':<9}{'time s':>9}{'acks':>9}{'ok':>6}")
+        for target in args.targets:
+            for name, every, delay in modes:
+                t = a = 0
+                ok = True
+                for _ in range(args.runs):
+                    e, n, good = run(target, src, every, delay, args.loss / 100, args.port)
+                    t += e / args.runs
+                    a += n / args.runs
+                    ok &= good
+                print(f"{target:<11}{name:<9}{t:>9.3f}{a:>9.0f}{str(ok):>6}", flush=True)
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Aggregate throughput of rdtlib.aio against the number of concurrent
+# transfers.  Every transfer gets its own receiver and sender endpoint in
+# one process and one event loop, all over loopback; outputs are compared
+# with the input at the end.
+#
+#   py -3 benchmarks/bench_aio_concurrency.py
+#   py -3 benchmarks/bench_aio_concurrency.py --protos sr --levels 1 50 500 --size-kb 128
+
+import os
+import sys
+import time
+import asyncio
+import filecmp
+import argparse
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib import aio
+
+
+def raise_fd_limit():
+    # 4 descriptors per transfer (2 sockets, 2 files)
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+async def one(src, dst, proto, window):
+    rx = await aio.open_receiver(dst, ("127.0.0.1", 0), proto, window)
+    tx = await aio.send_file(src, rx.addr, proto, window)
+    await rx.wait()
+    return tx["retransmissions"]
+
+
+async def run(src, d, proto, level, window):
+    dsts = [os.path.join(d, f"{proto}_{level}_{i}.bin") for i in range(level)]
+    t0 = time.perf_counter()
+    rtx = await asyncio.gather(*[one(src, dst, proto, window) for dst in dsts])
+    elapsed = time.perf_counter() - t0
+    ok = all(filecmp.cmp(src, dst, shallow=False) for dst in dsts)
+    for dst in dsts:
+        os.remove(dst)
+    return elapsed, sum(rtx), ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--protos", nargs="+", default=["sw", "gbn", "sr"])
+    ap.add_argument("--levels", type=int, nargs="+", default=[1, 10, 100, 300])
+    ap.add_argument("--size-kb", type=int, default=256)
+    ap.add_argument("--window", type=int, default=10)
+    args = ap.parse_args()
+    raise_fd_limit()
+
+    with tempfile.TemporaryDirectory() as d:
+        src = os.path.join(d, "in.bin")
+        with open(src, "wb") as f:
+            f.write(os.urandom(args.size_kb * 1024))
+        print(f"{args.size_kb} KB per transfer, window {args.window}")
+        print(f"{'proto':<6}{'transfers':>10}{'wall s':>9}{'agg MB/s':>10}{'retx':>7}{'ok':>5}")
+        for proto in args.protos:
+            for level in args.levels:
+                elapsed, rtx, ok = asyncio.run(run(src, d, proto, level, args.window))
+                mb = level * args.size_kb / 1024
+                print(f"{proto:<6}{level:>10}{elapsed:>9.2f}{mb / elapsed:>10.1f}{rtx:>7}{str(ok):>5}")
+
+
+if __name__ == "__main__":
+    main()
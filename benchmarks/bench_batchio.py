@@ -0,0 +1,81 @@
+# Batched vs per-packet UDP I/O on loopback
+# Sends window-sized bursts of GBN data packets with rdtlib.batchio
+# (sendmmsg/recvmmsg) and with plain sendto/recvfrom, then drains them
+# on the receive side.  Reports packets/s and syscalls per packet.
+#
+#   py -3 benchmarks/bench_batchio.py
+#   py -3 benchmarks/bench_batchio.py --windows 10 100 1000 --packets 200000
+
+import os
+import sys
+import time
+import socket
+import argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib import batchio
+from rdtlib.codec import GBNCodec
+
+MSS = 1000
+
+
+def run(window, total, batched):
+    rx_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    rx_sock.bind(("127.0.0.1", 0))
+    rx_sock.settimeout(0.5)
+    tx_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    dest = rx_sock.getsockname()
+
+    tx = batchio.BatchSender(tx_sock, enabled=batched)
+    rx = batchio.BatchReceiver(rx_sock, enabled=batched)
+    codec = GBNCodec(MSS)
+    payload = os.urandom(MSS)
+
+    got = 0
+    seq = 0
+    t0 = time.perf_counter()
+    while seq < total:
+        burst = min(window, total - seq)
+        for _ in range(burst):
+            tx.add(codec.encode(seq, payload), dest)
+            seq += 1
+        tx.flush()
+        # drain the burst before the next one, like a sender waiting on ACKs
+        want = got + burst
+        try:
+            while got < want:
+                got += len(rx.recv())
+        except socket.timeout:
+            got = want     # loopback drop, don't stall the run
+    elapsed = time.perf_counter() - t0
+
+    tx_sock.close()
+    rx_sock.close()
+    return total / elapsed, (tx.syscalls + rx.syscalls) / total
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--packets", type=int, default=100000)
+    args = ap.parse_args()
+
+    if not batchio.available():
+        print("sendmmsg/recvmmsg not available here, only the per-packet path runs")
+
+    print(f"{'window':>7}{'mode':>10}{'pkts/s':>12}{'syscalls/pkt':>14}")
+    for w in args.windows:
+        base = None
+        for batched in (False, True):
+            pps, calls = run(w, args.packets, batched)
+            mode = "batched" if batched else "single"
+            extra = f"  x{pps / base:.2f}" if base else ""
+            base = base or pps
+            print(f"{w:>7}{mode:>10}{pps:>12.0f}{calls:>14.3f}{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Congestion control comparison (rdtlib/cc.py): completion time of the
+# GBN / SR senders with a fixed window, Reno and CUBIC over a lossy relay
+# (data packets dropped with the given probability, END always goes
+# through).  The cwnd trace of the last run of every cell is kept in
+# --traces for phase4extracredit1/cwnd_plot.py.
+#
+#   py -3 benchmarks/bench_cc.py
+#   py -3 benchmarks/bench_cc.py --sender sr --win 500 --rates 0 1 5 --runs 3
+#   py -3 phase4extracredit1/cwnd_plot.py cc_traces/sr_*_5.csv
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+from lossrelay import relay
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+EC1 = os.path.join(ROOT, "phase4extracredit1")
+P4 = os.path.join(ROOT, "Phase 4")
+
+SENDERS = {
+    # server argv, client argv, output file name, completion time pattern
+    "gbackn": ([os.path.join(EC1, "GbackN.py"), "server", "{port}"],
+               [os.path.join(EC1, "GbackN.py"), "client", "127.0.0.1", "{port}", "{src}"],
+               "udpfile_received.jpg", r"Time = ([\d.]+)"),
+    "sr": ([os.path.join(EC1, "SelectiveRe.py"), "server", "{port}", "--win", "{win}"],
+           [os.path.join(EC1, "SelectiveRe.py"), "client", "127.0.0.1", "{port}", "{src}",
+            "--win", "{win}"],
+           "udpfile_received.jpg", r"Time = ([\d.]+)"),
+    "phase4": ([os.path.join(P4, "serverco.py"), "{port}", "out.bin"],
+               [os.path.join(P4, "clientco.py"), "{src}", "127.0.0.1", "{port}"],
+               "out.bin", r"Completion time: ([\d.]+)"),
+}
+ALGORITHMS = ["fixed", "reno", "cubic"]
+
+
+def run(args, cc, loss, trace):
+    server, client, out, pattern = SENDERS[args.sender]
+    fmt = dict(port=args.port + 1, win=args.win, src=args.file)
+    with tempfile.TemporaryDirectory() as cwd:
+        srv = subprocess.Popen([sys.executable] + [a.format(**fmt) for a in server],
+                               cwd=cwd, stdout=subprocess.DEVNULL)
+        stop = threading.Event()
+        t = threading.Thread(target=relay, args=(args.port, args.port + 1, loss, stop), daemon=True)
+        t.start()
+        time.sleep(0.3)
+        fmt["port"] = args.port
+        cli = subprocess.run([sys.executable] + [a.format(**fmt) for a in client]
+                             + ["--cc", cc, "--cwnd-trace", trace],
+                             cwd=cwd, capture_output=True, text=True)
+        time.sleep(0.3)     # let the server's writer flush
+        srv.kill()
+        srv.wait()
+        stop.set()
+        t.join()
+        m = re.search(pattern, cli.stdout)
+        with open(args.file, "rb") as a, open(os.path.join(cwd, out), "rb") as b:
+            ok = a.read() == b.read()
+        return float(m.group(1)), ok
+
+
+def sweep(args):
+    os.makedirs(args.traces, exist_ok=True)
+    win = f", --win {args.win}" if args.sender == "sr" else ""
+    print(f"{args.sender}{win}, {os.path.getsize(args.file)} bytes, data loss only")
+    print(f"{'loss %':>7}" + "".join(f"{cc + ' s':>10}" for cc in ALGORITHMS) + f"{'ok':>6}")
+    for rate in args.rates:
+        row, ok = [], True
+        for cc in ALGORITHMS:
+            trace = os.path.abspath(os.path.join(args.traces, f"{args.sender}_{cc}_{rate}.csv"))
+            times = []
+            for _ in range(args.runs):
+                t, good = run(args, cc, rate / 100, trace)
+                times.append(t)
+                ok &= good
+            row.append(sum(times) / len(times))
+        print(f"{rate:>7}" + "".join(f"{t:>10.3f}" for t in row) + f"{str(ok):>6}", flush=True)
+    print(f"cwnd traces in {args.traces}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sender", choices=sorted(SENDERS), default="gbackn")
+    ap.add_argument("--rates", type=int, nargs="+", default=[0, 1, 5, 10, 20])
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--win", type=int, default=500, help="SR window, the cwnd cap (both ends)")
+    ap.add_argument("--file", help="file to send (default: --size-kb of random bytes)")
+    ap.add_argument("--size-kb", type=int, default=2048)
+    ap.add_argument("--traces", default="cc_traces")
+    ap.add_argument("--port", type=int, default=9711)
+    args = ap.parse_args()
+
+    tmp = None
+    if args.file is None:
+        fd, tmp = tempfile.mkstemp(suffix=".bin")
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(args.size_kb * 1024))
+        args.file = tmp
+    try:
+        sweep(args)
+    finally:
+        if tmp:
+            os.remove(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Packet codec benchmark: old make_pkt/parse_pkt vs rdtlib.codec
+# Reports packets/sec for build and parse, and how many bytes each
+# packet leaves allocated while it is being built (tracemalloc peak).
+#
+#   py -3 benchmarks/bench_codec.py
+#   py -3 benchmarks/bench_codec.py --mss 1000 --count 20000
+
+import os
+import sys
+import time
+import struct
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import GBNCodec, Phase3Codec
+
+HDR_FMT = "!I H H"
+HDR_SIZE = struct.calcsize(HDR_FMT)
+
+
+# old per-phase code (phase4extracredit1/GbackN.py)
+def old_checksum(b: bytes) -> int:
+    return sum(b) & 0xFFFF
+
+
+def old_make_pkt(seq: int, data: bytes) -> bytes:
+    length = len(data)
+    header = struct.pack(HDR_FMT, seq, length, 0)
+    cs = old_checksum(header + data)
+    header = struct.pack(HDR_FMT, seq, length, cs)
+    return header + data
+
+
+def old_parse_pkt(pkt: bytes):
+    if len(pkt) < HDR_SIZE:
+        return None
+    header = pkt[:HDR_SIZE]
+    seq, length, cs = struct.unpack(HDR_FMT, header)
+    data = pkt[HDR_SIZE:HDR_SIZE + length]
+    header0 = struct.pack(HDR_FMT, seq, length, 0)
+    if old_checksum(header0 + data) != cs:
+        return None
+    return seq, data
+
+
+# old Phase 3 clientco.py make_pkt
+def old_p3_make_pkt(seq, payload):
+    return struct.pack("!BBH", 0x01, seq, len(payload)) + payload
+
+
+def pps(fn, count):
+    t0 = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return count / (time.perf_counter() - t0)
+
+
+def peak_per_pkt(fn, count):
+    # bytes still held at the worst moment, spread over count packets
+    tracemalloc.start()
+    fn(0)
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        fn(i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mss", type=int, default=1000)
+    ap.add_argument("--count", type=int, default=20000)
+    args = ap.parse_args()
+
+    payload = os.urandom(args.mss)
+    gbn = GBNCodec(args.mss)
+    p3 = Phase3Codec(args.mss)
+
+    # same bytes on the wire, same decode result
+    wire = old_make_pkt(7, payload)
+    assert bytes(gbn.encode(7, payload)) == wire
+    seq, data = gbn.decode(wire)
+    assert (seq, bytes(data)) == old_parse_pkt(wire)
+    assert bytes(p3.encode(1, payload)) == old_p3_make_pkt(1, payload)
+
+    tests = [
+        ("GBN build", lambda i: old_make_pkt(i, payload), lambda i: gbn.encode(i, payload)),
+        ("GBN parse", lambda i: old_parse_pkt(wire), lambda i: gbn.decode(wire)),
+        ("Phase3 build", lambda i: old_p3_make_pkt(i & 1, payload), lambda i: p3.encode(i & 1, payload)),
+    ]
+
+    print(f"payload {args.mss} bytes, {args.count} packets")
+    print(f"{'test':<14}{'old pkt/s':>12}{'new pkt/s':>12}{'speedup':>9}{'old peak B':>12}{'new peak B':>12}")
+    for name, old, new in tests:
+        o = pps(old, args.count)
+        n = pps(new, args.count)
+        om = peak_per_pkt(old, 1000)
+        nm = peak_per_pkt(new, 1000)
+        print(f"{name:<14}{o:>12.0f}{n:>12.0f}{n / o:>8.2f}x{om:>12}{nm:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# GBN receiver disk path: inline f.write() vs rdtlib.diskwriter.CoalescingWriter
+# A receiver process ACKs in-order packets the way server_gbn does; the
+# disk is made slow on purpose (fixed latency per write call plus a
+# bandwidth limit).  The sending side keeps a window of packets in flight
+# and reports ACK latency (send -> covering ACK) and goodput.
+#
+#   py -3 benchmarks/bench_disk_writer.py
+#   py -3 benchmarks/bench_disk_writer.py --latency-ms 0.5 --mbps 50 --size-mb 20
+
+import io
+import os
+import sys
+import json
+import time
+import struct
+import socket
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib import diskwriter
+from rdtlib.codec import GBNCodec
+
+MSS = 1000
+
+
+def slow(latency, mbps):
+    # seconds a write of n bytes takes on the simulated disk
+    return lambda n: latency + n / (mbps * 1e6)
+
+
+class SlowRaw(io.RawIOBase):
+    # inline path: under the usual buffered file object, every write that
+    # reaches the "disk" pays the cost, like open(..., "wb") on a slow mount
+    def __init__(self, path, cost):
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.cost = cost
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        c = self.cost(len(data))
+        if c > 1e-6:
+            time.sleep(c)
+        return os.write(self.fd, data)
+
+    def close(self):
+        if not self.closed:
+            os.close(self.fd)
+        super().close()
+
+
+def receiver(mode, port, path, latency, mbps):
+    cost = slow(latency, mbps)
+    if mode == "inline":
+        out = io.BufferedWriter(SlowRaw(path, cost))
+    else:
+        real = diskwriter._writev
+
+        def slow_writev(fd, views):
+            c = cost(sum(len(v) for v in views))
+            if c > 1e-6:
+                time.sleep(c)
+            return real(fd, views)
+        diskwriter._writev = slow_writev
+        out = diskwriter.CoalescingWriter(path)
+
+    codec = GBNCodec(MSS)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.bind(("127.0.0.1", port))
+    buf = bytearray(4096)
+    view = memoryview(buf)
+    expected = 0
+    while True:
+        n, addr = sock.recvfrom_into(buf)
+        pkt = view[:n]
+        if pkt == b"END":
+            break
+        p = codec.decode(pkt)
+        if p is None:
+            continue
+        seq, data = p
+        if seq == expected:
+            out.write(data)
+            expected += 1
+        sock.sendto(struct.pack("!I", expected - 1), addr)
+    t0 = time.perf_counter()
+    out.close()
+    print(json.dumps({"close_s": time.perf_counter() - t0}))
+
+
+def sender(port, total, window):
+    codec = GBNCodec(MSS)
+    payload = os.urandom(MSS)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(5.0)
+    dest = ("127.0.0.1", port)
+    sent_at = [0.0] * total
+    lat = []
+    base = 0
+    nxt = 0
+    t0 = time.perf_counter()
+    while base < total:
+        while nxt < base + window and nxt < total:
+            sent_at[nxt] = time.perf_counter()
+            sock.sendto(codec.encode(nxt, payload), dest)
+            nxt += 1
+        (ack,) = struct.unpack("!I", sock.recv(16))
+        now = time.perf_counter()
+        while base <= ack:
+            lat.append(now - sent_at[base])
+            base += 1
+    elapsed = time.perf_counter() - t0
+    sock.sendto(b"END", dest)
+    sock.close()
+    lat.sort()
+    return elapsed, lat[len(lat) // 2], lat[int(len(lat) * 0.99)]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=10)
+    ap.add_argument("--window", type=int, default=10)
+    ap.add_argument("--latency-ms", type=float, default=0.2)
+    ap.add_argument("--mbps", type=float, default=100.0)
+    ap.add_argument("--port", type=int, default=9321)
+    ap.add_argument("--child", default="")
+    ap.add_argument("--path", default="")
+    args = ap.parse_args()
+    latency = args.latency_ms / 1000
+
+    if args.child:
+        receiver(args.child, args.port, args.path, latency, args.mbps)
+        return
+
+    total = args.size_mb * 1024 * 1024 // MSS
+    print(f"{args.size_mb} MB, window {args.window}, disk {args.latency_ms} ms/write + {args.mbps} MB/s")
+    print(f"{'mode':<11}{'MB/s':>7}{'ack p50 ms':>12}{'ack p99 ms':>12}{'close s':>9}")
+    with tempfile.TemporaryDirectory() as d:
+        for mode in ("inline", "coalesced"):
+            path = os.path.join(d, mode + ".bin")
+            child = subprocess.Popen([sys.executable, __file__, "--child", mode, "--port", str(args.port),
+                                      "--path", path, "--latency-ms", str(args.latency_ms),
+                                      "--mbps", str(args.mbps)], stdout=subprocess.PIPE, text=True)
+            time.sleep(0.5)
+            elapsed, p50, p99 = sender(args.port, total, args.window)
+            out = json.loads(child.communicate(timeout=120)[0].strip().splitlines()[-1])
+            assert os.path.getsize(path) == total * MSS
+            print(f"{mode:<11}{args.size_mb / elapsed:>7.1f}{p50 * 1000:>12.3f}{p99 * 1000:>12.3f}"
+                  f"{out['close_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
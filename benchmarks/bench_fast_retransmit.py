@@ -0,0 +1,122 @@
+# Loss sweep for the GBN fast retransmit (DUP_ACKS in GbackN.py and
+# Phase 4/clientco.py).  Each run puts a lossy relay between client and
+# server that drops data packets with the given probability (END always
+# goes through), and times the transfer with fast retransmit off
+# (DUP_ACKS = 0) and on.  The Go-Back-N column of
+# phase4extracredit1/phase4extra1.csv is printed next to it for reference;
+# it was measured with the old fixed 0.2 s timeout and its own loss
+# model, so only the off/on columns compare like for like.  High loss
+# rates are slow (exponential backoff), so the default file is small.
+#
+#   py -3 benchmarks/bench_fast_retransmit.py
+#   py -3 benchmarks/bench_fast_retransmit.py --sender phase4 --rates 0 10 30 --runs 3
+#   py -3 benchmarks/bench_fast_retransmit.py --file phase4extracredit1/udpfile.jpg --rates 0 5 10
+
+import os
+import re
+import csv
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+from lossrelay import relay
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+EC1 = os.path.join(ROOT, "phase4extracredit1")
+P4 = os.path.join(ROOT, "Phase 4")
+
+SENDERS = {
+    # server command, client code, output file name, completion time pattern
+    "gbackn": ([os.path.join(EC1, "GbackN.py"), "server", "{port}"],
+               "import sys; sys.path.insert(0, {d!r}); import GbackN as g; g.DUP_ACKS = {k}; "
+               "g.client_gbn('127.0.0.1', {port}, {src!r})",
+               "udpfile_received.jpg", r"Time = ([\d.]+)"),
+    "phase4": ([os.path.join(P4, "serverco.py"), "{port}", "out.bin"],
+               "import sys, time; sys.path.insert(0, {d!r}); import clientco as c; c.DUP_ACKS = {k}; "
+               "s = c.GBNSender({src!r}, '127.0.0.1', {port}); t = time.time(); s.send(); "
+               "print('Completion time:', time.time() - t); s.close()",
+               "out.bin", r"Completion time: ([\d.]+)"),
+}
+
+
+def run(sender, src, loss, k, port):
+    server, client, out, pattern = SENDERS[sender]
+    d = EC1 if sender == "gbackn" else P4
+    with tempfile.TemporaryDirectory() as cwd:
+        srv = subprocess.Popen([sys.executable] + [a.format(port=port + 1) for a in server],
+                               cwd=cwd, stdout=subprocess.DEVNULL)
+        stop = threading.Event()
+        t = threading.Thread(target=relay, args=(port, port + 1, loss, stop), daemon=True)
+        t.start()
+        time.sleep(0.3)
+        cli = subprocess.run([sys.executable, "-c", client.format(d=d, k=k, port=port, src=src)],
+                             cwd=cwd, capture_output=True, text=True)
+        time.sleep(0.3)     # let the server's writer flush
+        srv.kill()
+        srv.wait()
+        stop.set()
+        t.join()
+        m = re.search(pattern, cli.stdout)
+        with open(src, "rb") as a, open(os.path.join(cwd, out), "rb") as b:
+            ok = a.read() == b.read()
+        return float(m.group(1)), ok
+
+
+def reference():
+    ref = {}
+    with open(os.path.join(EC1, "phase4extra1.csv"), encoding="utf-8-sig") as f:
+        rows = csv.reader(f)
+        next(rows)
+        for row in rows:
+            ref[int(row[0])] = float(row[2])
+    return ref
+
+
+def sweep(args, ref):
+    print(f"{args.sender}, {os.path.getsize(args.file)} bytes, data loss only")
+    print(f"{'loss %':>7}{'csv s':>8}{'dupack off s':>14}{'dupack ' + str(args.dup_acks) + ' s':>12}{'gain':>7}{'ok':>5}")
+    for rate in args.rates:
+        off, on, ok = [], [], True
+        for _ in range(args.runs):
+            t, good = run(args.sender, args.file, rate / 100, 0, args.port)
+            off.append(t)
+            ok &= good
+            t, good = run(args.sender, args.file, rate / 100, args.dup_acks, args.port)
+            on.append(t)
+            ok &= good
+        a, b = sum(off) / len(off), sum(on) / len(on)
+        csv_t = f"{ref[rate]:.2f}" if rate in ref else "-"
+        print(f"{rate:>7}{csv_t:>8}{a:>14.2f}{b:>12.2f}{a / b:>6.1f}x{str(ok):>5}", flush=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sender", choices=sorted(SENDERS), default="gbackn")
+    ap.add_argument("--rates", type=int, nargs="+", default=list(range(0, 65, 5)))
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--dup-acks", type=int, default=3)
+    ap.add_argument("--file", help="file to send (default: --size-kb of random bytes)")
+    ap.add_argument("--size-kb", type=int, default=100)
+    ap.add_argument("--port", type=int, default=9701)
+    args = ap.parse_args()
+
+    ref = reference()
+    tmp = None
+    if args.file is None:
+        fd, tmp = tempfile.mkstemp(suffix=".bin")
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(args.size_kb * 1024))
+        args.file = tmp
+    try:
+        sweep(args, ref)
+    finally:
+        if tmp:
+            os.remove(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Multithreaded GBN client: the polling version against the one built on
+# condition variables (phase4extracredit2/GbackN_mt.py).
+#
+# The old client is taken from git (--old, the last commit that has it)
+# into a temp dir; both run against the current GbackN_mt server through a
+# relay that drops data packets with the given probability.  Prints the
+# median completion time the client reports and the median CPU time (user
+# + system) the client process used, from os.wait4, so POSIX only.  At
+# high loss the time swings a lot run to run with the RTO backoff, use a
+# few --runs.
+#
+#   python3 benchmarks/bench_gbn_mt.py
+#   python3 benchmarks/bench_gbn_mt.py --loss 0 5 10 --size-kb 1024 --runs 3
+
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+import tempfile
+import threading
+import subprocess
+
+from lossrelay import relay
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+SCRIPT = "phase4extracredit2/GbackN_mt.py"
+
+SERVER = ("import sys; sys.path.insert(0, {d!r}); import GbackN_mt as s; s.server_gbn({port})")
+
+
+def run(client, src, loss, port):
+    srv_port = port + 1
+    with tempfile.TemporaryDirectory() as cwd, tempfile.TemporaryFile("w+") as out:
+        srv = subprocess.Popen([sys.executable, "-c", SERVER.format(d=os.path.join(ROOT, "phase4extracredit2"),
+                                                                     port=srv_port)],
+                               cwd=cwd, stdout=subprocess.DEVNULL)
+        stop = threading.Event()
+        t = threading.Thread(target=relay, args=(port, srv_port, loss, stop), daemon=True)
+        t.start()
+        time.sleep(0.3)
+        # the old copy lives outside the tree, find rdtlib through PYTHONPATH
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        cli = subprocess.Popen([sys.executable, client, "client", "127.0.0.1", str(port), src],
+                               cwd=cwd, stdout=out, env=env)
+        try:
+            _, status, usage = os.wait4(cli.pid, 0)
+            # reaped here, Popen must not wait for it again
+            cli.returncode = os.waitstatus_to_exitcode(status)
+            srv.wait(timeout=10)
+        finally:
+            for p in (cli, srv):
+                if p.poll() is None:
+                    p.kill()
+                    p.wait()
+            stop.set()
+            t.join()
+        out.seek(0)
+        elapsed = float(re.search(r"Time = ([\d.]+)", out.read()).group(1))
+        with open(src, "rb") as a, open(os.path.join(cwd, "udpfile_received_mt.jpg"), "rb") as b:
+            ok = a.read() == b.read()
+        return elapsed, usage.ru_utime + usage.ru_stime, ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--loss", type=float, nargs="+", default=[0, 10, 20, 30, 40, 50], help="percent")
+    ap.add_argument("--old", default="af7fd2e", help="git revision with the polling client")
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--size-kb", type=int, default=100)
+    ap.add_argument("--port", type=int, default=9741)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    old = os.path.join(tmp, "GbackN_mt_old.py")
+    with open(old, "wb") as f:
+        f.write(subprocess.check_output(["git", "show", f"{args.old}:{SCRIPT}"], cwd=ROOT))
+    src = os.path.join(tmp, "src.bin")
+    with open(src, "wb") as f:
+        f.write(os.urandom(args.size_kb * 1024))
+    clients = [("polling", old), ("condvar", os.path.join(ROOT, SCRIPT))]
+    try:
+        print(f"{args.size_kb} KB, {args.runs} runs, old client from {args.old}")
+        print(f"{'loss %':>7}" + "".join(f"{name + ' s':>11}{name + ' cpu':>13}" for name, _ in clients) + f"{'ok':>6}")
+        for loss in args.loss:
+            row = f"{loss:>7.0f}"
+            ok = True
+            for _, path in clients:
+                times = []
+                cpus = []
+                for _ in range(args.runs):
+                    e, c, good = run(path, src, loss / 100, args.port)
+                    times.append(e)
+                    cpus.append(c)
+                    ok &= good
+                row += f"{statistics.median(times):>11.3f}{statistics.median(cpus):>13.3f}"
+            print(row + f"{str(ok):>6}", flush=True)
+    finally:
+        os.remove(old)
+        os.remove(src)
+        os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    main()
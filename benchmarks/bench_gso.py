@@ -0,0 +1,134 @@
+# UDP GSO/GRO vs the plain GbackN.py path on loopback
+# 1) raw: window-sized bursts of GBN packets, plain sendto/recvfrom vs
+#    UDP_SEGMENT send + UDP_GRO receive (packets/s, syscalls/packet)
+# 2) end to end: GbackN.py server + client as separate processes,
+#    with and without --gso, same file, output checked with a compare
+#
+#   py -3 benchmarks/bench_gso.py
+#   py -3 benchmarks/bench_gso.py --size-mb 50 --windows 10 64
+
+import os
+import sys
+import time
+import socket
+import filecmp
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib import gso
+from rdtlib.codec import GBNCodec
+
+MSS = 1000
+SCRIPT = os.path.join(HERE, "..", "phase4extracredit1", "GbackN.py")
+
+
+def raw(window, total, offload):
+    rs = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rs.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    rs.bind(("127.0.0.1", 0))
+    rs.settimeout(0.5)
+    ts = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    dest = rs.getsockname()
+    codec = GBNCodec(MSS)
+    payload = os.urandom(MSS)
+    if offload:
+        tx = gso.GSOSender(ts)
+        rx = gso.GROReceiver(rs)
+    calls = 0
+
+    got = 0
+    seq = 0
+    bad = 0
+    t0 = time.perf_counter()
+    while seq < total:
+        burst = min(window, total - seq)
+        for _ in range(burst):
+            pkt = codec.encode(seq, payload)
+            if offload:
+                tx.add(pkt, dest)
+            else:
+                ts.sendto(pkt, dest)
+                calls += 1
+            seq += 1
+        if offload:
+            tx.flush()
+        want = got + burst
+        try:
+            while got < want:
+                if offload:
+                    pkts = [d for d, _ in rx.recv()]
+                else:
+                    pkts = [rs.recvfrom(2048)[0]]
+                    calls += 1
+                for d in pkts:
+                    # every segment still carries its own header + checksum
+                    if codec.decode(d) is None:
+                        bad += 1
+                got += len(pkts)
+        except socket.timeout:
+            got = want
+    elapsed = time.perf_counter() - t0
+    if offload:
+        calls = tx.syscalls + rx.syscalls
+    ts.close()
+    rs.close()
+    return total / elapsed, calls / total, bad
+
+
+def end_to_end(path, port, offload):
+    flag = ["--gso"] if offload else []
+    with tempfile.TemporaryDirectory() as d:
+        srv = subprocess.Popen([sys.executable, SCRIPT, "server", str(port)] + flag,
+                               cwd=d, stdout=subprocess.DEVNULL)
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, "client", "127.0.0.1", str(port), path] + flag,
+                       stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - t0
+        srv.wait(timeout=30)
+        ok = filecmp.cmp(path, os.path.join(d, "udpfile_received.jpg"), shallow=False)
+    return elapsed, ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, nargs="+", default=[10, 64])
+    ap.add_argument("--packets", type=int, default=100000)
+    ap.add_argument("--size-mb", type=int, default=20)
+    ap.add_argument("--port", type=int, default=9311)
+    args = ap.parse_args()
+
+    if not gso.available():
+        print("UDP_SEGMENT/UDP_GRO not available on this system")
+        return
+
+    print("raw loopback")
+    print(f"{'window':>7}{'mode':>8}{'pkts/s':>12}{'syscalls/pkt':>14}{'bad cs':>8}")
+    for w in args.windows:
+        base = None
+        for offload in (False, True):
+            pps, calls, bad = raw(w, args.packets, offload)
+            extra = f"  x{pps / base:.2f}" if base else ""
+            base = base or pps
+            print(f"{w:>7}{'gso' if offload else 'plain':>8}{pps:>12.0f}{calls:>14.3f}{bad:>8}{extra}")
+
+    fd, path = tempfile.mkstemp(suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        print(f"\nGbackN.py end to end, {args.size_mb} MB")
+        print(f"{'mode':>8}{'time s':>9}{'MB/s':>8}{'match':>7}")
+        for offload in (False, True):
+            elapsed, ok = end_to_end(path, args.port, offload)
+            print(f"{'gso' if offload else 'plain':>8}{elapsed:>9.2f}{args.size_mb / elapsed:>8.1f}{str(ok):>7}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Phase 4 GBNSender benchmark: read-everything vs mmap + sendmsg
+# Each variant runs in its own process against an in-process ACK thread
+# and reports time-to-first-packet, completion time and peak RSS.
+#
+#   py -3 benchmarks/bench_mmap_sender.py --size-mb 200
+#   py -3 benchmarks/bench_mmap_sender.py --size-mb 2048 --variants new
+
+import os
+import sys
+import time
+import json
+import struct
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import contextlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "Phase 4"))
+
+from rdtlib.checksum import inet_checksum
+
+
+def acker(sock, stats):
+    # cumulative ACKs in the Phase 4 "!IH" format
+    expected = 0
+    while True:
+        try:
+            pkt, addr = sock.recvfrom(2048)
+        except OSError:
+            return
+        if stats["first"] is None:
+            stats["first"] = time.perf_counter()
+        (seq,) = struct.unpack_from("!I", pkt)
+        if seq == expected:
+            expected += 1
+        ack_seq = expected - 1
+        sock.sendto(struct.pack("!IH", ack_seq, inet_checksum(struct.pack("!IH", ack_seq, 0))), addr)
+
+
+def child(variant, path):
+    import clientco
+    import resource
+
+    class OldGBNSender(clientco.GBNSender):
+        # the old constructor: whole file in memory plus a packet list
+        def __init__(self, udpfile, ip, port):
+            super().__init__(udpfile, ip, port)
+            with open(udpfile, "rb") as f:
+                file = f.read()
+            self.packets = []
+            idx = 0
+            seq = 0
+            while idx < len(file):
+                self.packets.append(clientco.make_pkt(seq, file[idx:idx + clientco.PACKET_SIZE]))
+                seq += 1
+                idx += clientco.PACKET_SIZE
+
+        def send_pkt(self, seq):
+            self.socket.sendto(self.packets[seq], self.destination)
+
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    rx.bind(("127.0.0.1", 0))
+    stats = {"first": None}
+    threading.Thread(target=acker, args=(rx, stats), daemon=True).start()
+
+    cls = OldGBNSender if variant == "old" else clientco.GBNSender
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        t0 = time.perf_counter()
+        sender = cls(path, "127.0.0.1", rx.getsockname()[1])
+        sender.send()
+        t1 = time.perf_counter()
+        sender.close()
+    rx.close()
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"ttfp": stats["first"] - t0, "time": t1 - t0, "rss_mb": rss_kb / 1024}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=100)
+    ap.add_argument("--variants", nargs="+", default=["old", "new"])
+    ap.add_argument("--child", default="")
+    ap.add_argument("--path", default="")
+    args = ap.parse_args()
+
+    if args.child:
+        child(args.child, args.path)
+        return
+
+    fd, path = tempfile.mkstemp(suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.size_mb):
+                f.write(block)
+
+        print(f"file {args.size_mb} MB")
+        print(f"{'variant':<8}{'first pkt s':>13}{'total s':>10}{'MB/s':>8}{'peak RSS MB':>13}")
+        for v in args.variants:
+            out = subprocess.run([sys.executable, __file__, "--child", v, "--path", path],
+                                 stdout=subprocess.PIPE, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{v:<8}{r['ttfp']:>13.4f}{r['time']:>10.2f}{args.size_mb / r['time']:>8.1f}{r['rss_mb']:>13.1f}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
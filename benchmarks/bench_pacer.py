@@ -0,0 +1,99 @@
+# Drops against send rate for the Phase 1B sender (rdtlib/pacer.py).
+# Phase 1B has no retransmission, so every datagram the receiver's socket
+# buffer could not hold is simply missing.  For each target rate the
+# client is run with SEND_RATE set to it against a real phase1Bserver.py
+# (short IDLE_TIMEOUT, so an incomplete file is reported right away) and
+# the achieved packets per second and lost packets are printed.  "old"
+# is the previous pacing, a 3 ms sleep every 200 packets; 0 is no pacing.
+#
+#   py -3 benchmarks/bench_pacer.py
+#   py -3 benchmarks/bench_pacer.py --rates old 0 5 20 50 --size-kb 8192 --runs 3
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PHASE1 = os.path.abspath(os.path.join(HERE, "..", "Phase1"))
+
+SERVER = ("import sys; sys.path.insert(0, {d!r}); import phase1Bserver as s; "
+          "s.SERVER_HOST = '127.0.0.1'; s.SERVER_PORT = {port}; "
+          "s.IDLE_TIMEOUT = 0.5; s.SWEEP_INTERVAL = 0.1; s.main()")
+CLIENT = ("import sys, time, socket; sys.path.insert(0, {d!r}); import phase1Bclient as c; "
+          "c.SEND_RATE = {rate}; {patch}"
+          "s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM); "
+          "s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 8 * 1024 * 1024); "
+          "t = time.perf_counter(); c.rdt_send(s, ('127.0.0.1', {port}), {src!r}); "
+          "print('SEND_TIME', time.perf_counter() - t)")
+# the sleep-every-200-packets loop this replaced
+OLD = ("import time; send = c.udt_send; n = [0]\n"
+       "def udt_send(sock, addr, pkt):\n"
+       "    send(sock, addr, pkt); n[0] += 1\n"
+       "    if n[0] % 200 == 1 and n[0] > 1: time.sleep(0.003)\n"
+       "c.udt_send = udt_send; ")
+
+
+def run(rate, src, port):
+    size = os.path.getsize(src)
+    total = (size + 1023) // 1024
+    if rate == "old":
+        code = CLIENT.format(d=PHASE1, rate=0, patch=OLD, port=port, src=src)
+    else:
+        code = CLIENT.format(d=PHASE1, rate=float(rate) * 1e6, patch="", port=port, src=src)
+    with tempfile.TemporaryDirectory() as cwd:
+        log = os.path.join(cwd, "server.log")
+        with open(log, "w") as out:
+            srv = subprocess.Popen([sys.executable, "-u", "-c", SERVER.format(d=PHASE1, port=port)],
+                                   cwd=cwd, stdout=out)
+            time.sleep(0.5)
+            cli = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+            # wait for "saved" or the eviction of an incomplete file
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                with open(log) as f:
+                    text = f.read()
+                if "saved:" in text or "evicted" in text:
+                    break
+                time.sleep(0.05)
+            srv.kill()
+            srv.wait()
+        send_time = float(re.search(r"SEND_TIME ([\d.]+)", cli.stdout).group(1))
+        m = re.search(r"after (\d+)/(\d+) packets", text)
+        got = total if "saved:" in text else int(m.group(1)) if m else 0
+        return total / send_time, total - got, total
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rates", nargs="+", default=["old", "0", "5", "10", "20", "40", "80"],
+                    help="MB/s targets, 0 = no pacing, old = sleep every 200 packets")
+    ap.add_argument("--size-kb", type=int, default=4096)
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--port", type=int, default=15061)
+    args = ap.parse_args()
+
+    fd, src = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(args.size_kb * 1024))
+    try:
+        print(f"{args.size_kb} KB, {args.runs} runs")
+        print(f"{'target MB/s':>12}{'pps':>10}{'MB/s':>8}{'lost':>8}{'lost %':>8}")
+        for rate in args.rates:
+            pps, lost = 0.0, 0
+            for _ in range(args.runs):
+                p, l, total = run(rate, src, args.port)
+                pps += p / args.runs
+                lost += l
+            lost /= args.runs
+            print(f"{rate:>12}{pps:>10.0f}{pps * 1024 / 1e6:>8.1f}{lost:>8.0f}{lost / total * 100:>7.1f}%",
+                  flush=True)
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Many phase1Bclient.py senders against one phase1Bserver.py receiver.
+# Starts the server in a temp directory, launches N client processes at
+# once (each with its own random file), waits for the saved files and
+# reports how many came out intact plus aggregate goodput.
+# Phase 1B has no retransmission, so a datagram lost on the loopback
+# leaves that file incomplete (it is evicted after IDLE_TIMEOUT).
+#
+#   py -3 benchmarks/bench_phase1b_multi.py
+#   py -3 benchmarks/bench_phase1b_multi.py --clients 1 8 32 --size-kb 512
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PHASE1 = os.path.join(HERE, "..", "Phase1")
+
+SERVER = ("import sys; sys.path.insert(0, {d!r}); import phase1Bserver as s; "
+          "s.SERVER_HOST = '127.0.0.1'; s.SERVER_PORT = {port}; s.main()")
+CLIENT = ("import sys; sys.path.insert(0, {d!r}); import phase1Bclient as c; "
+          "c.SERVER_PORT = {port}; c.main()")
+
+
+def run(n, size, port, wait):
+    with tempfile.TemporaryDirectory() as d:
+        srv_dir = os.path.join(d, "srv")
+        os.mkdir(srv_dir)
+        srcs = []
+        for i in range(n):
+            p = os.path.join(d, f"file{i}.bin")
+            with open(p, "wb") as f:
+                f.write(os.urandom(size))
+            srcs.append(p)
+
+        srv = subprocess.Popen([sys.executable, "-c", SERVER.format(d=os.path.abspath(PHASE1), port=port)],
+                               cwd=srv_dir, stdout=subprocess.DEVNULL)
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        clients = [subprocess.Popen([sys.executable, "-c", CLIENT.format(d=os.path.abspath(PHASE1), port=port)],
+                                    stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
+                   for _ in srcs]
+        for c, p in zip(clients, srcs):
+            c.stdin.write(p + "\n")
+            c.stdin.close()
+        for c in clients:
+            c.wait()
+
+        # the server saves a file as soon as its last packet is in
+        names = [os.path.basename(p) for p in srcs]
+        deadline = time.perf_counter() + wait
+        seen = 0
+        elapsed = 0.0
+        while time.perf_counter() < deadline and seen < n:
+            got = sum(os.path.exists(os.path.join(srv_dir, nm)) for nm in names)
+            if got > seen:
+                # time to the last file that did arrive
+                seen = got
+                elapsed = time.perf_counter() - t0
+            time.sleep(0.01)
+        srv.kill()
+        srv.wait()
+
+        intact = 0
+        for p, nm in zip(srcs, names):
+            out = os.path.join(srv_dir, nm)
+            if os.path.exists(out):
+                with open(p, "rb") as a, open(out, "rb") as b:
+                    intact += a.read() == b.read()
+        return elapsed, intact
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--size-kb", type=int, default=256)
+    ap.add_argument("--port", type=int, default=15051)
+    ap.add_argument("--wait", type=float, default=5.0)
+    args = ap.parse_args()
+
+    size = args.size_kb * 1024
+    print(f"{args.size_kb} KB per client")
+    print(f"{'clients':>8}{'intact':>8}{'time s':>9}{'agg MB/s':>10}")
+    for n in args.clients:
+        elapsed, intact = run(n, size, args.port, args.wait)
+        print(f"{n:>8}{intact:>5}/{n:<2}{elapsed:>9.2f}{intact * size / 1e6 / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
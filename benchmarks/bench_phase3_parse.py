@@ -0,0 +1,128 @@
+# Phase 3 parse benchmark: dict per datagram vs reused Packet record
+# Replays a stop-and-wait transfer in memory (no sockets) for every loss
+# rate of the Phase 3 sweep (0..60% step 5), with data and ACK loss at the
+# same rate, and measures parse latency and traced memory.
+#
+#   py -3 benchmarks/bench_phase3_parse.py
+#   py -3 benchmarks/bench_phase3_parse.py --size 500000 --csv parse_sweep.csv
+
+import os
+import sys
+import csv
+import time
+import random
+import struct
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import Phase3Codec, Packet
+
+TYPE_DATA = 0x01
+TYPE_ACK = 0x02
+PAYLOAD_SIZE = 1024
+
+
+# old Phase 3 clientco.py parse_pkt
+def old_parse_pkt(raw):
+    try:
+        t = raw[0]
+        seq = raw[1]
+        if t == TYPE_ACK:
+            return {"ok": True, "type": TYPE_ACK, "seq": seq}
+        elif t == TYPE_DATA:
+            length = struct.unpack("!H", raw[2:4])[0]
+            return {"ok": True, "type": TYPE_DATA, "seq": seq, "len": length, "payload": raw[4:4+length]}
+    except:
+        pass
+    return {"ok": False}
+
+
+def old_fields(p):
+    return p["ok"], p.get("seq", -1)
+
+
+def new_fields(p):
+    return p.ok, p.seq
+
+
+def replay(parse, fields, datagrams, rate, seed):
+    """
+    One stop-and-wait transfer. Returns (parse calls, parse seconds).
+    """
+    rng = random.Random(seed)
+    calls = 0
+    spent = 0.0
+    clock = time.perf_counter
+    for data, ack in datagrams:
+        while True:
+            if rng.random() < rate:
+                continue            # data lost, sender times out
+            t = clock()
+            ok, _ = fields(parse(data))
+            spent += clock() - t
+            calls += 1
+            if rng.random() < rate:
+                continue            # ACK lost
+            t = clock()
+            ok, _ = fields(parse(ack))
+            spent += clock() - t
+            calls += 1
+            break
+    return calls, spent
+
+
+def measure(parse, fields, datagrams, rate, seed):
+    tracemalloc.start()
+    replay(parse, fields, datagrams, rate, seed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # latency without tracemalloc overhead
+    calls, spent = replay(parse, fields, datagrams, rate, seed)
+    return calls, spent / calls * 1e9, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=500000, help="file size in bytes")
+    ap.add_argument("--start", type=int, default=0)
+    ap.add_argument("--end", type=int, default=60)
+    ap.add_argument("--step", type=int, default=5)
+    ap.add_argument("--csv", default="")
+    args = ap.parse_args()
+
+    codec = Phase3Codec(PAYLOAD_SIZE)
+    payload = os.urandom(args.size)
+    datagrams = []
+    seq = 0
+    for i in range(0, len(payload), PAYLOAD_SIZE):
+        datagrams.append((codec.pack(seq, payload[i:i + PAYLOAD_SIZE]), codec.ack(seq)))
+        seq ^= 1
+
+    rec = Packet()
+    new_parse = lambda raw: codec.parse(raw, rec)
+
+    sample = datagrams[0][0]
+    print(f"size of one parsed DATA packet: dict {sys.getsizeof(old_parse_pkt(sample))} B, "
+          f"Packet {sys.getsizeof(Packet())} B (reused, so 0 per datagram)")
+    print(f"{'loss%':>6}{'parses':>9}{'dict ns':>10}{'rec ns':>10}{'dict peak':>11}{'rec peak':>10}")
+
+    rows = []
+    for p in range(args.start, args.end + 1, args.step):
+        rate = p / 100.0
+        calls, old_ns, old_peak = measure(old_parse_pkt, old_fields, datagrams, rate, p)
+        _, new_ns, new_peak = measure(new_parse, new_fields, datagrams, rate, p)
+        print(f"{p:>6}{calls:>9}{old_ns:>10.0f}{new_ns:>10.0f}{old_peak:>11}{new_peak:>10}")
+        rows.append([p, calls, round(old_ns), round(new_ns), old_peak, new_peak])
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["loss", "parses", "dict_ns", "record_ns",
+                        "dict_peak_bytes", "record_peak_bytes"])
+            w.writerows(rows)
+        print(f"\nWrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# How the senders wait for their retransmission deadline (rdtlib/reactor.py).
+#
+# Timers: arms --timers timers at random delays up to 50 ms, with no
+# traffic, and prints how late each one ran (median, p99, max) and how many
+# times the loop woke up per second, for
+#
+#   poll     sock.settimeout(0.05) on every pass, expire() after the recv
+#   select   Reactor(timerfd=False): the selector timeout is the next deadline
+#   timerfd  Reactor(): a timerfd armed for the next deadline, no timeout
+#
+# Transfer (--loss): GbackN and SelectiveRe clients with TIMERFD on and off
+# through a relay that drops data packets, median completion time and
+# reactor wakeups over --runs.
+#
+#   python3 benchmarks/bench_reactor.py
+#   python3 benchmarks/bench_reactor.py --timers 500 --loss 0 5 10 --runs 3
+
+import os
+import re
+import sys
+import time
+import random
+import socket
+import argparse
+import statistics
+import tempfile
+import threading
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+EC1 = os.path.join(ROOT, "phase4extracredit1")
+sys.path.insert(0, ROOT)
+
+from rdtlib.timers import TimerWheel
+from rdtlib.reactor import Reactor, available
+from lossrelay import relay
+
+POLL = 0.05     # the old fixed socket timeout
+
+SERVER = "import sys; sys.path.insert(0, {d!r}); import {mod} as s; s.{server}({port})"
+CLIENT = "import sys; sys.path.insert(0, {d!r}); import {mod} as s; s.TIMERFD = {tfd}; s.{client}('127.0.0.1', {port}, {src!r})"
+SCRIPTS = {"GbackN": ("server_gbn", "client_gbn"), "SelectiveRe": ("server_sr", "client_sr")}
+
+
+def lateness(mode, count, seed=1):
+    # run count timers one after the other, each at a random delay
+    rng = random.Random(seed)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    late = []
+    wakeups = 0
+    t0 = time.perf_counter()
+    if mode == "poll":
+        wheel = TimerWheel()
+        sock.settimeout(POLL)
+        for _ in range(count):
+            deadline = time.monotonic_ns() + int(rng.uniform(0.001, 0.05) * 1e9)
+            wheel.arm((deadline - time.monotonic_ns()) / 1e9, lambda d=deadline: late.append(time.monotonic_ns() - d))
+            while wheel:
+                try:
+                    sock.recv(2048)
+                except socket.timeout:
+                    pass
+                wakeups += 1
+                wheel.expire()
+    else:
+        r = Reactor(timerfd=(mode == "timerfd"))
+        r.add_reader(sock, lambda: sock.recv(2048))
+        for _ in range(count):
+            deadline = time.monotonic_ns() + int(rng.uniform(0.001, 0.05) * 1e9)
+            r.call_later((deadline - time.monotonic_ns()) / 1e9, lambda d=deadline: late.append(time.monotonic_ns() - d))
+            while r.wheel:
+                r.run_once()
+        wakeups = r.wakeups
+        r.close()
+    elapsed = time.perf_counter() - t0
+    sock.close()
+    late.sort()
+    us = [x / 1e3 for x in late]
+    return statistics.median(us), us[int(len(us) * 0.99) - 1], us[-1], wakeups / elapsed
+
+
+def transfer(mod, tfd, src, loss, port):
+    server, client = SCRIPTS[mod]
+    srv_port = port + 1
+    with tempfile.TemporaryDirectory() as cwd, tempfile.TemporaryFile("w+") as out:
+        srv = subprocess.Popen([sys.executable, "-c", SERVER.format(d=EC1, mod=mod, server=server, port=srv_port)],
+                               cwd=cwd, stdout=subprocess.DEVNULL)
+        stop = threading.Event()
+        t = threading.Thread(target=relay, args=(port, srv_port, loss, stop), daemon=True)
+        t.start()
+        time.sleep(0.3)
+        try:
+            subprocess.run([sys.executable, "-c", CLIENT.format(d=EC1, mod=mod, tfd=tfd, client=client,
+                                                                port=port, src=src)],
+                           cwd=cwd, stdout=out, timeout=300)
+            srv.wait(timeout=10)
+        finally:
+            # a server still up (END lost, client failed) would hold the port
+            if srv.poll() is None:
+                srv.kill()
+                srv.wait()
+            stop.set()
+            t.join()
+        out.seek(0)
+        log = out.read()
+        elapsed = float(re.search(r"Time = ([\d.]+)", log).group(1))
+        wakeups = int(re.search(r"(\d+) wakeups", log).group(1))
+        with open(src, "rb") as a, open(os.path.join(cwd, "udpfile_received.jpg"), "rb") as b:
+            ok = a.read() == b.read()
+        return elapsed, wakeups, ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--timers", type=int, default=200)
+    ap.add_argument("--loss", type=float, nargs="*", default=[0, 5, 10], help="percent, none to skip transfers")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--size-kb", type=int, default=1024)
+    ap.add_argument("--port", type=int, default=9751)
+    args = ap.parse_args()
+
+    modes = ["poll", "select"] + (["timerfd"] if available() else [])
+    print(f"{args.timers} timers at 1-50 ms, no traffic")
+    print(f"{'wait':<9}{'median us':>11}{'p99 us':>10}{'max us':>10}{'wakeups/s':>11}")
+    for mode in modes:
+        med, p99, worst, rate = lateness(mode, args.timers)
+        print(f"{mode:<9}{med:>11.0f}{p99:>10.0f}{worst:>10.0f}{rate:>11.1f}", flush=True)
+    if not args.loss or not available():
+        return
+
+    fd, src = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(args.size_kb * 1024))
+    try:
+        print(f"\n{args.size_kb} KB, {args.runs} runs, medians")
+        print(f"{'client':<13}{'loss %':>7}{'select s':>10}{'wakeups':>9}{'timerfd s':>11}{'wakeups':>9}{'ok':>6}")
+        for mod in SCRIPTS:
+            for loss in args.loss:
+                row = f"{mod:<13}{loss:>7.0f}"
+                ok = True
+                for tfd in (False, True):
+                    times = []
+                    wakes = []
+                    for _ in range(args.runs):
+                        e, w, good = transfer(mod, tfd, src, loss / 100, args.port)
+                        times.append(e)
+                        wakes.append(w)
+                        ok &= good
+                    row += f"{statistics.median(times):>{10 if not tfd else 11}.3f}{statistics.median(wakes):>9.0f}"
+                print(row + f"{str(ok):>6}", flush=True)
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Load test for the SO_REUSEPORT sharded receiver (rdtlib/reuseport.py).
+# For each worker count, starts the launcher, then sender processes that
+# each run several rdtlib.aio transfers to the shared port.  Reports the
+# time until every output file is complete and the aggregate goodput;
+# outputs are checked against the input.  Scaling needs free cores for
+# both the workers and the senders (os.cpu_count() is printed).
+#
+#   py -3 benchmarks/bench_reuseport.py
+#   py -3 benchmarks/bench_reuseport.py --workers 1 2 4 8 --flows 32 --proto gbn
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+
+LAUNCH = ("import sys; sys.path.insert(0, {root!r}); from rdtlib import reuseport; "
+          "reuseport.launch({port}, {proto!r}, {workers}, {outdir!r}, host='127.0.0.1')")
+SEND = ("import sys, asyncio; sys.path.insert(0, {root!r}); from rdtlib import aio\n"
+        "async def main():\n"
+        "    await asyncio.gather(*[aio.send_file({src!r}, ('127.0.0.1', {port}), {proto!r}) "
+        "for _ in range({n})])\n"
+        "asyncio.run(main())")
+
+
+def run(workers, flows, senders, src, size, proto, port):
+    with tempfile.TemporaryDirectory() as outdir:
+        srv = subprocess.Popen([sys.executable, "-c", LAUNCH.format(root=ROOT, port=port, proto=proto,
+                                                                    workers=workers, outdir=outdir)],
+                               stdout=subprocess.DEVNULL)
+        time.sleep(1.0)
+        t0 = time.perf_counter()
+        per = [flows // senders + (i < flows % senders) for i in range(senders)]
+        procs = [subprocess.Popen([sys.executable, "-c", SEND.format(root=ROOT, src=src, port=port,
+                                                                     proto=proto, n=n)])
+                 for n in per if n]
+        for p in procs:
+            p.wait()
+        # wait for the receivers to have everything on disk
+        deadline = time.perf_counter() + 30
+        while time.perf_counter() < deadline:
+            names = os.listdir(outdir)
+            if len(names) == flows and all(os.path.getsize(os.path.join(outdir, n)) == size for n in names):
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - t0
+        srv.terminate()
+        srv.wait()
+        with open(src, "rb") as f:
+            ref = f.read()
+        intact = 0
+        for n in os.listdir(outdir):
+            with open(os.path.join(outdir, n), "rb") as f:
+                intact += f.read() == ref
+        return elapsed, intact
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--flows", type=int, default=16)
+    ap.add_argument("--senders", type=int, default=4)
+    ap.add_argument("--size-kb", type=int, default=1024)
+    ap.add_argument("--proto", default="sr")
+    ap.add_argument("--port", type=int, default=9501)
+    args = ap.parse_args()
+
+    size = args.size_kb * 1024
+    fd, src = tempfile.mkstemp(suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(size))
+        print(f"{os.cpu_count()} cores, {args.flows} {args.proto} flows x {args.size_kb} KB "
+              f"from {args.senders} sender processes")
+        print(f"{'workers':>8}{'time s':>9}{'agg MB/s':>10}{'intact':>9}")
+        for w in args.workers:
+            elapsed, intact = run(w, args.flows, args.senders, src, size, args.proto, args.port)
+            print(f"{w:>8}{elapsed:>9.2f}{args.flows * size / 1e6 / elapsed:>10.1f}{intact:>6}/{args.flows}")
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    main()
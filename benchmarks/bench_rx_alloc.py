@@ -0,0 +1,99 @@
+# Receive path: recvfrom() per datagram vs rdtlib.rxpool.RecvPool
+# Bursts of GBN packets are sent over loopback and received, checksummed
+# and written to os.devnull the way server_gbn does it.  Reports time per
+# packet, gen-0 GC collections and bytes allocated per received datagram
+# (tracemalloc, with every received object kept alive so nothing is reused).
+#
+#   py -3 benchmarks/bench_rx_alloc.py
+#   py -3 benchmarks/bench_rx_alloc.py --packets 200000
+
+import gc
+import os
+import sys
+import time
+import socket
+import argparse
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib.codec import GBNCodec
+from rdtlib.rxpool import RecvPool
+
+MSS = 1000
+BURST = 100
+
+
+def recv_old(sock):
+    return sock.recvfrom(4096)
+
+
+def run(total, pooled, keep):
+    rs = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rs.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    rs.bind(("127.0.0.1", 0))
+    ts = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    dest = rs.getsockname()
+    codec = GBNCodec(MSS)
+    payload = os.urandom(MSS)
+    pkts = [bytes(codec.encode(i, payload)) for i in range(BURST)]
+    rx = RecvPool(rs, 4096)
+    recv = rx.recv if pooled else (lambda: recv_old(rs))
+    out = open(os.devnull, "wb")
+
+    gcs = [0]
+
+    def count(phase, info):
+        if phase == "start" and info["generation"] == 0:
+            gcs[0] += 1
+
+    gc.callbacks.append(count)
+    kept = []
+    if keep:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+    elapsed = 0.0
+    done = 0
+    while done < total:
+        for p in pkts:
+            ts.sendto(p, dest)
+        t0 = time.perf_counter()
+        for _ in range(BURST):
+            pkt, addr = recv()
+            if keep:
+                kept.append(pkt)
+            r = codec.decode(pkt)
+            if r is not None:
+                out.write(r[1])
+        elapsed += time.perf_counter() - t0
+        done += BURST
+    per_pkt = 0.0
+    if keep:
+        # kept list itself is ~8 bytes per entry, leave it in, same for both
+        per_pkt = (tracemalloc.get_traced_memory()[0] - before) / total
+        tracemalloc.stop()
+        kept.clear()
+    gc.callbacks.remove(count)
+    out.close()
+    ts.close()
+    rs.close()
+    return elapsed / total * 1e6, gcs[0], per_pkt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packets", type=int, default=100000)
+    ap.add_argument("--alloc-packets", type=int, default=10000)
+    args = ap.parse_args()
+
+    # timing pass untraced; allocation pass separate since tracemalloc is slow
+    print(f"{'path':<10}{'us/pkt':>8}{'gen0 GCs':>10}{'alloc B/pkt':>13}")
+    for pooled in (False, True):
+        us, gcs, _ = run(args.packets, pooled, False)
+        _, _, per_pkt = run(args.alloc_packets, pooled, True)
+        print(f"{'pool' if pooled else 'recvfrom':<10}{us:>8.2f}{gcs:>10}{per_pkt:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Per-packet ACKs against SACKs for Selective Repeat (rdtlib/sack.py).
+# Runs phase4extracredit1/SelectiveRe.py at several window sizes with the
+# server's SACK switch off (a 4-byte ACK per data packet) and on (one SACK
+# per receive batch) and prints the completion time and the number of ACK
+# datagrams the server sent.  The client uses --cc fixed so the whole
+# window is in flight; --loss puts a relay in between that drops data
+# packets with that probability.
+#
+#   py -3 benchmarks/bench_sack.py
+#   py -3 benchmarks/bench_sack.py --windows 64 4096 --loss 1 --runs 3
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+from lossrelay import relay
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EC1 = os.path.abspath(os.path.join(HERE, "..", "phase4extracredit1"))
+
+SERVER = ("import sys; sys.path.insert(0, {d!r}); import SelectiveRe as s; "
+          "s.SACK = {sack}; s.WIN = {win}; s.server_sr({port})")
+CLIENT = [os.path.join(EC1, "SelectiveRe.py"), "client", "127.0.0.1", "{port}", "{src}",
+          "--win", "{win}", "--cc", "fixed"]
+
+
+def run(src, win, sack, loss, port):
+    srv_port = port + 1 if loss else port
+    with tempfile.TemporaryDirectory() as cwd, tempfile.TemporaryFile("w+") as log:
+        srv = subprocess.Popen([sys.executable, "-c", SERVER.format(d=EC1, sack=sack, win=win, port=srv_port)],
+                               cwd=cwd, stdout=log)
+        stop = threading.Event()
+        if loss:
+            t = threading.Thread(target=relay, args=(port, srv_port, loss, stop), daemon=True)
+            t.start()
+        time.sleep(0.3)
+        cli = subprocess.run([sys.executable] + [a.format(port=port, src=src, win=win) for a in CLIENT],
+                             cwd=cwd, capture_output=True, text=True)
+        srv.wait(timeout=10)
+        stop.set()
+        if loss:
+            t.join()
+        log.seek(0)
+        out = log.read()
+        elapsed = float(re.search(r"Time = ([\d.]+)", cli.stdout).group(1))
+        acks = int(re.search(r"(\d+) ACKs sent", out).group(1))
+        with open(src, "rb") as a, open(os.path.join(cwd, "udpfile_received.jpg"), "rb") as b:
+            ok = a.read() == b.read()
+        return elapsed, acks, ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, nargs="+", default=[64, 256, 1024, 4096])
+    ap.add_argument("--loss", type=float, default=0.0, help="data loss, percent")
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--size-kb", type=int, default=8192)
+    ap.add_argument("--port", type=int, default=9721)
+    args = ap.parse_args()
+
+    fd, src = tempfile.mkstemp(suffix=".bin")
+    with os.fdopen(fd, "wb") as f:
+        f.write(os.urandom(args.size_kb * 1024))
+    npkts = (args.size_kb * 1024 + 999) // 1000
+    try:
+        print(f"{args.size_kb} KB ({npkts} packets), data loss {args.loss}%, {args.runs} runs")
+        print(f"{'window':>7}{'ack s':>9}{'acks':>9}{'sack s':>9}{'sacks':>9}{'speedup':>9}{'ok':>6}")
+        for win in args.windows:
+            res = {}
+            ok = True
+            for sack in (False, True):
+                t = a = 0
+                for _ in range(args.runs):
+                    e, n, good = run(src, win, sack, args.loss / 100, args.port)
+                    t += e / args.runs
+                    a += n / args.runs
+                    ok &= good
+                res[sack] = (t, a)
+            (t0, a0), (t1, a1) = res[False], res[True]
+            print(f"{win:>7}{t0:>9.3f}{a0:>9.0f}{t1:>9.3f}{a1:>9.0f}{t0 / t1:>8.2f}x{str(ok):>6}", flush=True)
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Selective Repeat sender state: dicts and a big-int bitmap vs
+# rdtlib.scoreboard.Scoreboard.
+#
+# Replays the client_sr bookkeeping for one transfer with per-packet ACKs
+# arriving in order except for --loss percent of packets, whose ACK only
+# comes half a window later (after a resend).  "dict" is the old state:
+# sent_at/timers dicts, a resent set and the acked int shifted down as
+# base moves.  "ring" is a Scoreboard plus a list of timer slots.  Prints
+# the time per packet and the memory the state holds with a full window.
+#
+#   py -3 benchmarks/bench_scoreboard.py
+#   py -3 benchmarks/bench_scoreboard.py --windows 1024 65536 --packets 500000
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib.scoreboard import Scoreboard
+
+
+def order(n, w, loss, seed=1):
+    # ACKs as (seq, resent) in arrival order: a lost packet is resent and
+    # its ACK shows up w // 2 ACKs later
+    rng = random.Random(seed)
+    late = {}
+    out = []
+    for s in range(n):
+        if rng.random() < loss:
+            late.setdefault(s + w // 2, []).append((s, True))
+        else:
+            out.append((s, False))
+        out.extend(late.pop(s, ()))
+    for v in late.values():
+        out.extend(v)
+    return out
+
+
+def run_dict(acks, w):
+    base = next_seq = 0
+    acked = 0
+    timers = {}
+    sent_at = {}
+    resent = set()
+    n = len(acks)
+    for ack, late in acks:
+        while next_seq < min(base + w, n):
+            sent_at[next_seq] = time.monotonic()
+            timers[next_seq] = object()
+            next_seq += 1
+        if late:
+            resent.add(ack)     # the timeout resend
+            timers[ack] = object()
+        mask = 1 << (ack - base) if ack >= base else 0
+        new = mask & ~acked & ((1 << (next_seq - base)) - 1)
+        if not new:
+            continue
+        acked |= new
+        timers.pop(ack)
+        sent_at.pop(ack)
+        resent.discard(ack)
+        if acked & 1:
+            run = (~acked & (acked + 1)).bit_length() - 1
+            acked >>= run
+            base += run
+    return (sent_at, timers, resent, acked)
+
+
+def run_ring(acks, w):
+    base = next_seq = 0
+    board = Scoreboard(w)
+    timers = [None] * board.size
+    n = len(acks)
+    for ack, late in acks:
+        while next_seq < min(base + w, n):
+            board.sent(next_seq, time.monotonic())
+            timers[board.slot(next_seq)] = object()
+            next_seq += 1
+        if late:
+            board.sent(ack, time.monotonic())
+            timers[board.slot(ack)] = object()
+        if not (base <= ack < next_seq and board.ack(ack)):
+            continue
+        timers[board.slot(ack)] = None
+        board.sample(ack)
+        if board.acked(base):
+            base = board.advance(base, next_seq)
+    return (board, timers)
+
+
+def state_bytes(fn, w):
+    # memory held with a full window in flight: only the last seq acked
+    tracemalloc.start()
+    state = fn([(w - 1, False)] * w, w)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del state
+    return size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, nargs="+", default=[64, 1024, 16384, 65536])
+    ap.add_argument("--packets", type=int, default=300000)
+    ap.add_argument("--loss", type=float, default=1.0, help="percent")
+    args = ap.parse_args()
+
+    print(f"{args.packets} packets, {args.loss}% late ACKs")
+    print(f"{'window':>7}{'dict ns/pkt':>13}{'ring ns/pkt':>13}{'speedup':>9}{'dict KB':>10}{'ring KB':>10}")
+    for w in args.windows:
+        acks = order(args.packets, w, args.loss / 100)
+        res = []
+        for fn in (run_dict, run_ring):
+            t0 = time.perf_counter()
+            fn(acks, w)
+            res.append((time.perf_counter() - t0) / args.packets * 1e9)
+        mem = [state_bytes(fn, w) / 1024 for fn in (run_dict, run_ring)]
+        print(f"{w:>7}{res[0]:>13.0f}{res[1]:>13.0f}{res[0] / res[1]:>8.2f}x{mem[0]:>10.0f}{mem[1]:>10.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
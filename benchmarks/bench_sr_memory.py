@@ -0,0 +1,90 @@
+# Selective Repeat client memory check
+# Runs client_sr from phase4extracredit1/SelectiveRe.py against an
+# in-process ACK thread under tracemalloc, for growing file sizes.
+# Peak traced memory must stay flat (O(window)), not grow with the file:
+# the run fails if the largest file peaks more than GROWTH times above
+# the smallest.
+#
+#   py -3 benchmarks/bench_sr_memory.py
+#   py -3 benchmarks/bench_sr_memory.py --sizes-mb 1 64 1024
+
+import os
+import sys
+import time
+import struct
+import socket
+import argparse
+import tempfile
+import threading
+import contextlib
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "phase4extracredit1"))
+
+import SelectiveRe
+
+GROWTH = 1.25       # allowed peak ratio, largest file / smallest file
+
+
+def acker(sock):
+    # ACK every good packet with its own seq, like server_sr
+    while True:
+        try:
+            pkt, addr = sock.recvfrom(4096)
+        except OSError:
+            return
+        if pkt == b"END":
+            return
+        p = SelectiveRe.parse_pkt(pkt)
+        if p is not None:
+            sock.sendto(struct.pack("!I", p[0]), addr)
+
+
+def run(path):
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(("127.0.0.1", 0))
+    t = threading.Thread(target=acker, args=(rx,), daemon=True)
+    t.start()
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        SelectiveRe.client_sr("127.0.0.1", rx.getsockname()[1], path)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    t.join(timeout=1.0)
+    rx.close()
+    return peak, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 16, 128])
+    args = ap.parse_args()
+
+    print(f"window {SelectiveRe.WIN}, mss {SelectiveRe.MSS}")
+    print(f"{'file MB':>8}{'packets':>10}{'peak KB':>10}{'time s':>9}")
+    peaks = []
+    for mb in sorted(args.sizes_mb):
+        fd, path = tempfile.mkstemp(suffix=".bin")
+        try:
+            # sparse file: contents don't matter for memory use
+            os.ftruncate(fd, mb * 1024 * 1024)
+            os.close(fd)
+            peak, elapsed = run(path)
+            peaks.append(peak)
+            pkts = (mb * 1024 * 1024 + SelectiveRe.MSS - 1) // SelectiveRe.MSS
+            print(f"{mb:>8}{pkts:>10}{peak / 1024:>10.1f}{elapsed:>9.1f}")
+        finally:
+            os.remove(path)
+    assert peaks[-1] <= peaks[0] * GROWTH, \
+        f"peak grew with the file: {peaks[0] / 1024:.1f} KB -> {peaks[-1] / 1024:.1f} KB"
+    print("peak memory flat: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Striped transfer (rdtlib/stripe.py) against the number of stripes.
+# Starts the striped server in a temp directory, sends one random file
+# with 1, 2, 4 ... stripes and reports the client's wall time, aggregate
+# goodput and whether the server's end-to-end CRC check passed.  Stripes
+# only pay off with free cores on both ends (os.cpu_count() is printed).
+#
+#   py -3 benchmarks/bench_stripe.py
+#   py -3 benchmarks/bench_stripe.py --stripes 1 2 4 8 --size-mb 64 --proto gbn
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+sys.path.insert(0, ROOT)
+
+from rdtlib import stripe
+
+SERVER = ("import sys; sys.path.insert(0, {root!r}); from rdtlib import stripe; "
+          "st = stripe.receive_striped('out.bin', {port}, {proto!r}, host='127.0.0.1'); "
+          "sys.exit(0 if all(s['ok'] for s in st) else 1)")
+
+
+def run(src, size, n, proto, port):
+    with tempfile.TemporaryDirectory() as d:
+        srv = subprocess.Popen([sys.executable, "-c", SERVER.format(root=ROOT, port=port, proto=proto)],
+                               cwd=d, stdout=subprocess.DEVNULL)
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        stats = stripe.send_striped(src, "127.0.0.1", port, n, proto)
+        elapsed = time.perf_counter() - t0
+        ok = srv.wait(timeout=30) == 0
+        same = ok and open(src, "rb").read() == open(os.path.join(d, "out.bin"), "rb").read()
+        slowest = max(st["bytes"] / st["time"] for st in stats) / 1e6
+        return len(stats), elapsed, slowest, same
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stripes", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--size-mb", type=int, default=16)
+    ap.add_argument("--proto", default="sr")
+    ap.add_argument("--port", type=int, default=9601)
+    args = ap.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    fd, src = tempfile.mkstemp(suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(os.urandom(size))
+        rows = []
+        for n in args.stripes:
+            rows.append(run(src, size, n, args.proto, args.port))
+        print(f"\n{os.cpu_count()} cores, {args.size_mb} MB over {args.proto}")
+        print(f"{'stripes':>8}{'time s':>9}{'agg MB/s':>10}{'best stripe MB/s':>18}{'crc':>6}")
+        for n, elapsed, best, same in rows:
+            print(f"{n:>8}{elapsed:>9.2f}{size / 1e6 / elapsed:>10.1f}{best:>18.1f}{'OK' if same else 'BAD':>6}")
+    finally:
+        os.remove(src)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Retransmission timer cost and accuracy: window scan vs rdtlib.timers.
+#
+# cost: one sender loop pass with W packets in flight.  "scan" is the old
+# client_sr check (now - sent_time[s] > TO for every seq in the window),
+# "wheel" is one ACK's worth of work on the TimerWheel (cancel the acked
+# packet's timer, arm one for the packet that enters the window, expire,
+# then next_deadline() for the wait).
+#
+# lateness: how long after its deadline a timeout is noticed when the
+# loop polls with a 50 ms socket timeout versus waiting for
+# wheel.next_timeout().
+#
+#   py -3 benchmarks/bench_timers.py
+
+import os
+import sys
+import time
+import random
+import socket
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rdtlib.timers import TimerWheel
+
+TO = 0.2
+
+
+def scan_cost(w, rounds):
+    now = time.time()
+    sent_time = {s: now - random.random() * TO for s in range(w)}
+    acked = set()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        now = time.time()
+        for s in range(0, w):
+            if s in acked:
+                continue
+            if s not in sent_time or now - sent_time[s] > TO:
+                pass
+    return (time.perf_counter() - t0) / rounds
+
+
+def noop():
+    pass
+
+
+def wheel_cost(w, rounds):
+    wheel = TimerWheel()
+    timers = [wheel.arm(TO * random.random(), noop) for _ in range(w)]
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        timers[i % w].cancel()
+        timers[i % w] = wheel.arm(TO, noop)
+        wheel.expire()
+        wheel.next_deadline()
+    return (time.perf_counter() - t0) / rounds
+
+
+def lateness(use_wheel, samples=20):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    late = []
+    for _ in range(samples):
+        delay = random.uniform(0.01, 0.1)
+        deadline = time.monotonic() + delay
+        fired = []
+        wheel = TimerWheel()
+        wheel.arm(delay, lambda: fired.append(time.monotonic()))
+        while not fired:
+            sock.settimeout(wheel.next_timeout(TO) if use_wheel else 0.05)
+            try:
+                sock.recvfrom(16)
+            except socket.timeout:
+                pass
+            wheel.expire()
+        late.append(fired[0] - deadline)
+    sock.close()
+    late.sort()
+    return late[len(late) // 2], late[-1]
+
+
+def main():
+    print(f"{'window':>8}{'scan us/pass':>14}{'wheel us/ack':>14}")
+    for w in (10, 100, 1000, 10000):
+        rounds = max(20, 200000 // w)
+        print(f"{w:>8}{scan_cost(w, rounds) * 1e6:>14.1f}{wheel_cost(w, 20000) * 1e6:>14.2f}")
+    print()
+    print(f"{'wait':<22}{'median late ms':>15}{'max late ms':>13}")
+    for name, flag in (("poll 50 ms", False), ("wheel.next_timeout()", True)):
+        med, worst = lateness(flag)
+        print(f"{name:<22}{med * 1e3:>15.2f}{worst * 1e3:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
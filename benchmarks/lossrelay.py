@@ -0,0 +1,40 @@
+# Lossy UDP relay shared by the transfer benchmarks.
+#
+# Sits between a client and a server on loopback and drops client ->
+# server datagrams with probability loss; END always gets through and
+# everything the server sends goes back to the last client address.
+#
+#   stop = threading.Event()
+#   t = threading.Thread(target=relay, args=(port, port + 1, 0.05, stop), daemon=True)
+#   t.start()
+#   ... client to port, server on port + 1 ...
+#   stop.set()
+#   t.join()
+
+import random
+import select
+import socket
+
+
+def relay(listen, target, loss, stop):
+    # client -> server datagrams are dropped with probability loss
+    a = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    a.bind(("127.0.0.1", listen))
+    b = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    b.connect(("127.0.0.1", target))
+    client = None
+    while not stop.is_set():
+        r, _, _ = select.select([a, b], [], [], 0.1)
+        if a in r:
+            data, client = a.recvfrom(65535)
+            if data == b"END" or random.random() >= loss:
+                b.send(data)
+        if b in r:
+            try:
+                data = b.recv(65535)
+            except ConnectionRefusedError:
+                continue
+            if client is not None:
+                a.sendto(data, client)
+    a.close()
+    b.close()
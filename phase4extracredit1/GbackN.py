@@ -4,40 +4,46 @@ import struct
 import time
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import GBNCodec
+from rdtlib.batchio import BatchSender, BatchReceiver
+from rdtlib import gso
+from rdtlib.diskwriter import CoalescingWriter
+from rdtlib.reactor import Reactor
+from rdtlib.rto import RTOEstimator
+from rdtlib import cc as congestion
+from rdtlib.ackpolicy import AckPolicy
+from rdtlib.scoreboard import Scoreboard, wire, unwrap
+
 MSS = 1000  # bytes per packet
-WIN = 10    # window size
-TO = 0.2    # timeout
+WIN = 10    # window size for --cc fixed
+CC = "fixed"  # congestion control: fixed, reno or cubic (change with --cc)
+MAX_WIN = 1000  # cwnd cap, the GBN server has no window of its own
+TO = 0.2    # timeout (first RTO when ADAPTIVE_RTO is on)
+ADAPTIVE_RTO = True  # RFC 6298 RTO from measured RTTs, False keeps TO fixed
+DUP_ACKS = 3  # duplicate ACKs that trigger a fast retransmit (0 = off)
+BATCH_IO = True  # sendmmsg/recvmmsg bursts on Linux, per-packet calls elsewhere
+TIMERFD = True  # client: retransmit deadline on a Linux timerfd, select timeout elsewhere
+FLUSH_SIZE = 1024 * 1024  # receiver writes to disk in blocks this big
+FLUSH_INTERVAL = 0.05     # or after this many seconds idle
+ACK_EVERY = 0     # server: in-order packets per ACK (1 = every packet, 0 = no limit)
+ACK_DELAY = 0.0   # server: seconds an ACK may wait for more (0 = until the socket is drained)
 
-# header
-HDR_FMT = "!I H H"
-HDR_SIZE = struct.calcsize(HDR_FMT)
+# header "!I H H" seq, length, checksum (see rdtlib/codec.py)
+codec = GBNCodec(MSS)
 
 
-def checksum(b: bytes) -> int:
-    return sum(b) & 0xFFFF
+def make_pkt(seq: int, data: bytes) -> memoryview:
+    # built in the codec's buffer, send it before the next make_pkt
+    return codec.encode(seq, data)
 
 
-def make_pkt(seq: int, data: bytes) -> bytes:
-    length = len(data)
-    header = struct.pack(HDR_FMT, seq, length, 0)
-    cs = checksum(header + data)
-    header = struct.pack(HDR_FMT, seq, length, cs)
-    return header + data
+def parse_pkt(pkt: bytes):
+    # (seq, payload view) or None on bad checksum
+    return codec.decode(pkt)
 
 
-def parse_pkt(pkt: bytes):
-    if len(pkt) < HDR_SIZE:
-        return None
-    header = pkt[:HDR_SIZE]
-    seq, length, cs = struct.unpack(HDR_FMT, header)
-    data = pkt[HDR_SIZE:HDR_SIZE + length]
-    header0 = struct.pack(HDR_FMT, seq, length, 0)
-    if checksum(header0 + data) != cs:
-        return None
-    return seq, data
-
-
-def client_gbn(ip: str, port: int, fname: str):
+def client_gbn(ip: str, port: int, fname: str, use_gso: bool = False, trace: str = None):
     # read file
     with open(fname, "rb") as f:
         data = f.read()
@@ -55,122 +61,232 @@ def client_gbn(ip: str, port: int, fname: str):
     print(f"[GBN CLIENT] total packets {n}")
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(0.05)
     addr = (ip, port)
+    if use_gso and gso.available():
+        # the window goes out as one buffer, the kernel splits it per packet
+        tx = gso.GSOSender(sock)
+        print("[GBN CLIENT] UDP GSO on")
+    else:
+        tx = BatchSender(sock, enabled=BATCH_IO)
+    rx = BatchReceiver(sock, enabled=BATCH_IO)
 
     base = 0          # first un-acked packet
     next_seq = 0      # next packet to send
-    timer_start = None
+    # ACKs and the retransmission timer wait in one place
+    reactor = Reactor(timerfd=TIMERFD)
+    timer = None      # GBN timer of the oldest un-acked packet
+    rto = RTOEstimator(TO, adaptive=ADAPTIVE_RTO)
+    max_cwnd = WIN if CC == "fixed" else MAX_WIN
+    board = Scoreboard(max_cwnd)  # first send time per un-acked seq
+    resent_below = 0  # next_seq before the last go-back, late ACKs reach this far
+    dup_acks = 0      # ACKs in a row for base - 1
+    cwnd = congestion.make(CC, max_cwnd=max_cwnd)
+    recover = 0       # one window cut per loss episode: not again below this
+
+    def start_timer():
+        nonlocal timer
+        if timer is not None:
+            timer.cancel()
+        timer = reactor.call_later(rto.rto, on_timeout)
+
+    def resend_window():
+        nonlocal resent_below, next_seq
+        # go back to base, but only as far as the (now smaller) cwnd;
+        # the rest is sent again as the window opens
+        resent_below = max(resent_below, next_seq)
+        next_seq = min(next_seq, base + cwnd.window())
+        for s in range(base, next_seq):
+            seq_id, d = chunks[s]
+            tx.add(make_pkt(seq_id, d), addr)
+            board.sent(seq_id, time.monotonic())
+            print(f"[GBN CLIENT] Resent packet {seq_id}")
+        start_timer()
+
+    def on_timeout():
+        nonlocal recover
+        rto.backoff()
+        cwnd.on_timeout()
+        recover = next_seq
+        print("[GBN CLIENT] Timeout, resend window")
+        resend_window()
+
+    def on_acks():
+        nonlocal base, next_seq, timer, dup_acks, recover
+        # every ACK already queued
+        for pkt, _ in rx.recv():
+            if len(pkt) != 4:
+                continue
+            (ack_seq,) = struct.unpack("!I", pkt)
+            ack_seq = unwrap(ack_seq, base)
+            print(f"[GBN CLIENT] Got ACK {ack_seq}")
+            # move base; a late ACK may cover packets past a rewound next_seq
+            if base <= ack_seq < max(next_seq, resent_below):
+                rto.progress()
+                sent = board.sample(ack_seq)
+                if sent is not None:
+                    rto.sample(time.monotonic() - sent)
+                board.release(base, ack_seq + 1)
+                cwnd.on_ack(ack_seq + 1 - base)
+                base = ack_seq + 1
+                next_seq = max(next_seq, base)
+                dup_acks = 0
+                if base == next_seq:
+                    # a late ACK past a rewound next_seq finds it stopped
+                    if timer is not None:
+                        timer.cancel()
+                    timer = None
+                else:
+                    start_timer()
+            elif ack_seq + 1 == base and base < next_seq:
+                # the server re-ACKs base - 1 for every packet after a
+                # hole: base is lost, no need to wait for the timer
+                dup_acks += 1
+                if dup_acks == DUP_ACKS:
+                    print(f"[GBN CLIENT] {dup_acks} duplicate ACKs, fast retransmit")
+                    if base >= recover:
+                        cwnd.on_loss()
+                        recover = next_seq
+                    resend_window()
+
+    reactor.add_reader(sock, on_acks)
 
     start_time = time.time()  # start time
 
     while base < n:
         # send packets in window
-        while next_seq < base + WIN and next_seq < n:
+        while next_seq < base + cwnd.window() and next_seq < n:
             seq_id, d = chunks[next_seq]
-            pkt = make_pkt(seq_id, d)
-            sock.sendto(pkt, addr)
+            tx.add(make_pkt(seq_id, d), addr)
+            board.sent(seq_id, time.monotonic())
             print(f"[GBN CLIENT] Sent packet {seq_id}")
             if base == next_seq:
-                timer_start = time.time()
+                start_timer()
             next_seq += 1
+        tx.flush()
 
-        # wait for ACK or timeout
-        try:
-            pkt, _ = sock.recvfrom(1024)
-            if len(pkt) == 4:
-                (ack_seq,) = struct.unpack("!I", pkt)
-                print(f"[GBN CLIENT] Got ACK {ack_seq}")
-                # move base
-                if ack_seq + 1 > base:
-                    base = ack_seq + 1
-                    if base == next_seq:
-                        timer_start = None
-                    else:
-                        timer_start = time.time()
-        except socket.timeout:
-            # check timeout
-            if timer_start is not None and (time.time() - timer_start > TO):
-                print("[GBN CLIENT] Timeout, resend window")
-                # resend all from base
-                for s in range(base, next_seq):
-                    seq_id, d = chunks[s]
-                    pkt = make_pkt(seq_id, d)
-                    sock.sendto(pkt, addr)
-                    print(f"[GBN CLIENT] Resent packet {seq_id}")
-                timer_start = time.time()
+        # sleep until ACKs come in or the timer is due, then handle all of it
+        reactor.run_once()
 
     # send END
     sock.sendto(b"END", addr)
     end_time = time.time()
     duration = end_time - start_time
     print(f"[GBN CLIENT] Done. Time = {duration:.3f} seconds")
-
+    print(f"[GBN CLIENT] {rto.summary()}")
+    print(f"[GBN CLIENT] {cwnd.summary()}")
+    print(f"[GBN CLIENT] {reactor.summary()}")
+    if trace:
+        cwnd.save_trace(trace)
+        print(f"[GBN CLIENT] cwnd trace -> {trace}")
+
+    reactor.close()
     sock.close()
 
 
-def server_gbn(port: int):
+def server_gbn(port: int, use_gro: bool = False):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind(("", port))
     print(f"[GBN SERVER] Listening on port {port}, writing to udpfile_received.jpg")
 
     expected = 0   # next seq we want
     client = None
-    f = open("udpfile_received.jpg", "wb")
-
-    while True:
-        pkt, addr = sock.recvfrom(4096)
-        if pkt == b"END":
-            print("[GBN SERVER] END received, closing.")
-            break
-
-        if client is None:
-            client = addr
-
-        p = parse_pkt(pkt)
-        if p is None:
-            # bad packet, send ACK for last good packet
-            ack_seq = expected - 1
-            if ack_seq < 0:
-                ack_seq = 0
-            ack = struct.pack("!I", ack_seq)
-            sock.sendto(ack, client)
-            continue
-
-        seq, data = p
-
-        if seq == expected:
-            # correct packet
-            f.write(data)
-            print(f"[GBN SERVER] Got packet {seq}")
-            expected += 1
-        else:
-            # wrong seq, ignore data
-            print(f"[GBN SERVER] Out of order {seq}, expected {expected}")
-
-        # always ACK last in-order packet
-        ack_seq = expected - 1
-        if ack_seq < 0:
-            ack_seq = 0
-        ack = struct.pack("!I", ack_seq)
-        sock.sendto(ack, client)
+    # disk writes happen on a background thread, the ACK doesn't wait
+    f = CoalescingWriter("udpfile_received.jpg", FLUSH_SIZE, FLUSH_INTERVAL)
+    if use_gro and gso.available():
+        # coalesced runs of packets come in one recvmsg, split per packet
+        rx = gso.GROReceiver(sock)
+        print("[GBN SERVER] UDP GRO on")
+    else:
+        rx = BatchReceiver(sock, enabled=BATCH_IO)
+    tx = BatchSender(sock, enabled=BATCH_IO)
+    acks = AckPolicy(ACK_EVERY, ACK_DELAY)
+    done = False
+
+    def ack():
+        # cumulative ACK of the last in-order packet; before packet 0 there
+        # is nothing to ACK (an ACK 0 would tell the client 0 arrived)
+        if expected > 0:
+            tx.add(struct.pack("!I", wire(expected - 1)), client)
+            acks.sent()
+
+    while not done:
+        # wait for data, but no longer than a delayed ACK may wait
+        sock.settimeout(acks.wait())
+        try:
+            batch = rx.recv()
+        except socket.timeout:
+            batch = ()
+        # every datagram already queued, ACKs go back in one burst
+        for pkt, addr in batch:
+            if pkt == b"END":
+                print("[GBN SERVER] END received, closing.")
+                done = True
+                break
+
+            if client is None:
+                client = addr
+
+            p = parse_pkt(pkt)
+            if p is None:
+                # bad packet, ACK the last good packet right away
+                if acks.data(False):
+                    ack()
+                continue
+
+            seq, data = p
+            in_order = seq == wire(expected)   # 32 bits on the wire
+
+            if in_order:
+                # correct packet
+                f.write(data)
+                print(f"[GBN SERVER] Got packet {seq}")
+                expected += 1
+            else:
+                # wrong seq, ignore data
+                print(f"[GBN SERVER] Out of order {seq}, expected {expected}")
+
+            # in order: ACK per the policy; a gap is ACKed at once so the
+            # client sees the duplicate ACKs
+            if acks.data(in_order):
+                ack()
+        # the batch was everything queued
+        if acks.drained():
+            ack()
+        tx.flush()
 
     f.close()
     sock.close()
-    print("[GBN SERVER] Done.")
+    print(f"[GBN SERVER] Done. {acks.summary()}")
 
 
 def main():
     if len(sys.argv) < 3:
         print("Usage:")
-        print("  server: py -3 GbackN.py server <port>")
-        print("  client: py -3 GbackN.py client <server_ip> <port> <filename>")
+        print("  server: py -3 GbackN.py server <port> [--gro]")
+        print("  client: py -3 GbackN.py client <server_ip> <port> <filename> [--gso] "
+              "[--cc fixed|reno|cubic] [--cwnd-trace FILE]")
         sys.exit(1)
 
+    # congestion control and where to save its cwnd over time
+    global CC
+    if "--cc" in sys.argv:
+        i = sys.argv.index("--cc")
+        CC = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+    trace = None
+    if "--cwnd-trace" in sys.argv:
+        i = sys.argv.index("--cwnd-trace")
+        trace = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+
+    # opt-in segmentation offload (Linux only, ignored elsewhere)
+    offload = "--gso" in sys.argv or "--gro" in sys.argv
+    sys.argv = [a for a in sys.argv if a not in ("--gso", "--gro")]
+
     mode = sys.argv[1]
     if mode == "server":
         port = int(sys.argv[2])
-        server_gbn(port)
+        server_gbn(port, offload)
     elif mode == "client":
         if len(sys.argv) < 5:
             print("client: py -3 GbackN.py client <server_ip> <port> <filename>")
@@ -181,7 +297,7 @@ def main():
         if not os.path.exists(fname):
             print("file not found:", fname)
             sys.exit(1)
-        client_gbn(ip, port, fname)
+        client_gbn(ip, port, fname, offload, trace)
     else:
         print("mode must be server or client")
         sys.exit(1)
@@ -4,111 +4,166 @@ import struct
 import time
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import GBNCodec
+from rdtlib.chunker import WindowReader
+from rdtlib.batchio import BatchSender, BatchReceiver
+from rdtlib.offsetfile import OffsetWriter
+from rdtlib.reactor import Reactor
+from rdtlib.rto import RTOEstimator
+from rdtlib import cc as congestion
+from rdtlib.sack import pack_sack, unpack_sack, acked_mask
+from rdtlib.scoreboard import Scoreboard, wire, unwrap
+
 
 MSS = 1000          # bytes
 
-WIN = 10            # window size
+WIN = 10            # window size (change with --win), also the cwnd cap
 
-TO = 0.2         # timeout
+CC = "fixed"        # congestion control: fixed, reno or cubic (change with --cc)
 
-# packet header
-HDR_FMT = "!I H H"
-HDR_SIZE = struct.calcsize(HDR_FMT)
+TO = 0.2         # timeout (first RTO when ADAPTIVE_RTO is on)
 
+ADAPTIVE_RTO = True  # RFC 6298 RTO from measured RTTs, False keeps TO fixed
 
-def checksum(b: bytes) -> int:
+BATCH_IO = True  # sendmmsg/recvmmsg bursts on Linux, per-packet calls elsewhere
+TIMERFD = True  # client: retransmit deadlines on a Linux timerfd, select timeout elsewhere
 
-    return sum(b) & 0xFFFF
+SACK = True  # server: one SACK per receive batch, False = a 4-byte ACK per packet
 
+# header "!I H H" seq, length, checksum (see rdtlib/codec.py)
+codec = GBNCodec(MSS)
 
-def make_pkt(seq: int, data: bytes) -> bytes:
 
-    length = len(data)
-    header = struct.pack(HDR_FMT, seq, length, 0)
-    cs = checksum(header + data)
-    header = struct.pack(HDR_FMT, seq, length, cs)
-    return header + data
+def make_pkt(seq: int, data: bytes) -> memoryview:
+    # built in the codec's buffer, send it before the next make_pkt
+    return codec.encode(seq, data)
 
 
 def parse_pkt(pkt: bytes):
-
-    if len(pkt) < HDR_SIZE:
-        return None
-    header = pkt[:HDR_SIZE]
-    seq, length, cs = struct.unpack(HDR_FMT, header)
-    data = pkt[HDR_SIZE:HDR_SIZE + length]
-    header0 = struct.pack(HDR_FMT, seq, length, 0)
-    if checksum(header0 + data) != cs:
-        return None
-    return seq, data
+    # (seq, payload view) or None on bad checksum
+    return codec.decode(pkt)
 
 
-def client_sr(ip: str, port: int, fname: str):
+def client_sr(ip: str, port: int, fname: str, trace: str = None):
 
-    # read full file
-    with open(fname, "rb") as f:
-        data = f.read()
+    # stream the file, only a window of chunks is kept in memory
+    reader = WindowReader(fname, MSS)
 
     # start timer
     start_time = time.time()
 
-    # split file into chunks
-    chunks = []
-    seq = 0
-    i = 0
-    while i < len(data):
-        chunks.append((seq, data[i:i + MSS]))
-        seq += 1
-        i += MSS
-
-    n = len(chunks)
+    n = reader.n
     print(f"[SR CLIENT] total packets {n}")
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(0.05)
     addr = (ip, port)
+    tx = BatchSender(sock, enabled=BATCH_IO)
+    rx = BatchReceiver(sock, enabled=BATCH_IO)
 
     base = 0                 # first unacked packet index
-    acked = [False] * n      # which packets are done
-    sent_time = {}           # last send time per seq
+    next_seq = 0             # next packet never sent
+    # acked bits, first send times and resent flags for the window
+    board = Scoreboard(WIN)
+    timers = [None] * board.size   # retransmission timer per slot
+    # SACKs and the retransmission timers wait in one place
+    reactor = Reactor(timerfd=TIMERFD)
+    rto = RTOEstimator(TO, adaptive=ADAPTIVE_RTO)
+    # the server only buffers WIN packets past its base, cwnd stays below
+    cwnd = congestion.make(CC, max_cwnd=WIN)
+    recover = 0              # one window cut per loss episode: not again below this
+
+    def send(s):
+        tx.add(make_pkt(s, reader.get(s)), addr)
+        board.sent(s, time.monotonic())
+        timers[board.slot(s)] = reactor.call_later(rto.rto, resend, s)
+        print(f"[SR CLIENT] Sent {s}")
+
+    def resend(s):
+        nonlocal recover
+        # timeout: just this one again; back off once per stalled base
+        # rather than once for every packet of a lost burst
+        if s == base:
+            rto.backoff()
+        # ACKs of later packets still flow, so this is a loss, not a dead
+        # path: halve the window once for everything sent before the cut
+        if s >= recover:
+            cwnd.on_loss()
+            recover = next_seq
+        send(s)
+
+    def on_acks():
+        nonlocal base
+        # SACKs (or 4-byte ACKs of one seq), every one already queued
+        for pkt, _ in rx.recv():
+            if len(pkt) == 4:
+                (ack_seq,) = struct.unpack("!I", pkt)
+                ack_seq = unwrap(ack_seq, base)
+                # one seq, no need to look at the rest of the window
+                inside = base <= ack_seq < next_seq
+                new = 1 << (ack_seq - base) if inside and not board.acked(ack_seq) else 0
+            else:
+                s = unpack_sack(pkt)
+                if s is None:
+                    continue
+                mask = acked_mask(base, *s)
+                # only what this SACK adds, inside what was sent
+                span = min(mask.bit_length(), next_seq - base)
+                new = mask & ~board.mask(base, span) & ((1 << span) - 1)
+            if not new:
+                continue
+            now = time.monotonic()
+            while new:
+                low = new & -new
+                new ^= low
+                ack_seq = base + low.bit_length() - 1
+                board.ack(ack_seq)
+                i = board.slot(ack_seq)
+                timers[i].cancel()
+                timers[i] = None
+                sent = board.sample(ack_seq)
+                if sent is not None:
+                    rto.sample(now - sent)
+                print(f"[SR CLIENT] Got ACK {ack_seq}")
+            # move base past the acked run at the bottom, free what is behind it
+            if board.acked(base):
+                rto.progress()
+                old = base
+                base = board.advance(base, next_seq)
+                cwnd.on_ack(base - old)
+                reader.drop(base)
+
+    reactor.add_reader(sock, on_acks)
 
     while base < n:
-        now = time.time()
+        reader.fill(base + cwnd.window())
 
-        # send or resend packets in window
-        for s in range(base, min(base + WIN, n)):
-            if acked[s]:
-                continue
-            if s not in sent_time or now - sent_time[s] > TO:
-                seq_id, d = chunks[s]
-                pkt = make_pkt(seq_id, d)
-                sock.sendto(pkt, addr)
-                sent_time[s] = now
-                print(f"[SR CLIENT] Sent {s}")
-
-        # receive ACKs 4 bytes seq number
-        try:
-            pkt, _ = sock.recvfrom(1024)
-            if len(pkt) == 4:
-                (ack_seq,) = struct.unpack("!I", pkt)
-                if 0 <= ack_seq < n and not acked[ack_seq]:
-                    acked[ack_seq] = True
-                    print(f"[SR CLIENT] Got ACK {ack_seq}")
-                    # move base to next not-acked
-                    while base < n and acked[base]:
-                        base += 1
-        except socket.timeout:
-            # no ACK, loop again and maybe resend
-            pass
+        # send new packets in window
+        while next_seq < min(base + cwnd.window(), n):
+            send(next_seq)
+            next_seq += 1
+        tx.flush()
+
+        # sleep until SACKs come in or a timer is due, then handle all of it
+        reactor.run_once()
+
+    reader.close()
 
     # tell server we are done
     sock.sendto(b"END", addr)
+    reactor.close()
     sock.close()
 
     # stop timer and print total time
     end_time = time.time()
     total = end_time - start_time
     print(f"[SR CLIENT] Done. Time = {total:.3f} seconds")
+    print(f"[SR CLIENT] {rto.summary()}")
+    print(f"[SR CLIENT] {cwnd.summary()}")
+    print(f"[SR CLIENT] {reactor.summary()}")
+    if trace:
+        cwnd.save_trace(trace)
+        print(f"[SR CLIENT] cwnd trace -> {trace}")
 
 
 def server_sr(port: int):
@@ -117,61 +172,95 @@ def server_sr(port: int):
     sock.bind(("", port))
     print(f"[SR SERVER] Listening on port {port}, writing to udpfile_received.jpg")
 
+    # big windows mean big bursts, give the kernel room to queue them
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+
     base = 0            # next seq we want in order
-    buf = {}            # buffer for out-of-order data
     client = None
-    f = open("udpfile_received.jpg", "wb")
-
-    while True:
-        pkt, addr = sock.recvfrom(4096)
-
-        # end of file
-        if pkt == b"END":
-            print("[SR SERVER] END received, closing.")
-            break
-
-        if client is None:
-            client = addr
-
-        result = parse_pkt(pkt)
-        if result is None:
-            # bad packet, ignore
-            continue
-
-        seq, data = result
-
-        # check if seq is inside window
-        if base <= seq < base + WIN:
-            if seq not in buf:
-                buf[seq] = data
-                print(f"[SR SERVER] Got packet {seq}")
-
-            # ACK back the seq (4 bytes)
-            ack = struct.pack("!I", seq)
-            sock.sendto(ack, client)
-
-            # write all in-order data
-            while base in buf:
-                f.write(buf[base])
-                del buf[base]
-                base += 1
-        else:
-            # packet outside window still ACK so sender can stop resending
-            ack = struct.pack("!I", seq)
-            sock.sendto(ack, addr)
-
-    f.close()
+    acks = 0            # ACK datagrams sent
+    # packets go straight to seq * MSS in the file, no reorder buffer
+    out = OffsetWriter("udpfile_received.jpg", MSS, window=WIN)
+    rx = BatchReceiver(sock, enabled=BATCH_IO)
+    tx = BatchSender(sock, enabled=BATCH_IO)
+    done = False
+
+    while not done:
+        # every datagram already queued, ACKs go back in one burst
+        sack_due = False
+        for pkt, addr in rx.recv():
+
+            # end of file
+            if pkt == b"END":
+                print("[SR SERVER] END received, closing.")
+                done = True
+                break
+
+            if client is None:
+                client = addr
+
+            result = parse_pkt(pkt)
+            if result is None:
+                # bad packet, ignore
+                continue
+
+            seq, data = result
+            # 32 bits on the wire, the one nearest base is meant
+            seq = unwrap(seq, base)
+
+            # check if seq is inside window
+            if base <= seq < base + WIN:
+                # written in place right away, even if earlier ones are missing
+                if out.write(seq, data):
+                    print(f"[SR SERVER] Got packet {seq}")
+                    if seq == base:
+                        base = out.advance(base)
+
+            # packets below the window are ACKed too, so the sender can
+            # stop resending them
+            if SACK:
+                sack_due = True
+            elif seq < base + WIN:
+                # ACK back the seq (4 bytes)
+                tx.add(struct.pack("!I", wire(seq)), addr)
+                acks += 1
+
+        # one SACK for the whole batch: base plus a bitmap of what is in above it
+        if sack_due:
+            tx.add(pack_sack(base, out.bitmap(base + 1, WIN - 1)), client)
+            acks += 1
+        tx.flush()
+
+    out.close()
     sock.close()
-    print("[SR SERVER] Done.")
+    print(f"[SR SERVER] Done. {acks} ACKs sent")
 
 
 def main():
     if len(sys.argv) < 3:
         print("Usage:")
-        print("  server: py -3 SelectiveRe.py server <port>")
-        print("  client: py -3 SelectiveRe.py client <server_ip> <port> <filename>")
+        print("  server: py -3 SelectiveRe.py server <port> [--win N]")
+        print("  client: py -3 SelectiveRe.py client <server_ip> <port> <filename> [--win N] "
+              "[--cc fixed|reno|cubic] [--cwnd-trace FILE]")
         sys.exit(1)
 
+    # window size, both ends should use the same one
+    global WIN, CC
+    if "--win" in sys.argv:
+        i = sys.argv.index("--win")
+        WIN = int(sys.argv[i + 1])
+        del sys.argv[i:i + 2]
+
+    # congestion control and where to save its cwnd over time
+    if "--cc" in sys.argv:
+        i = sys.argv.index("--cc")
+        CC = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+    trace = None
+    if "--cwnd-trace" in sys.argv:
+        i = sys.argv.index("--cwnd-trace")
+        trace = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+
     mode = sys.argv[1]
 
     if mode == "server":
@@ -188,7 +277,7 @@ def main():
         if not os.path.exists(fname):
             print("file not found:", fname)
             sys.exit(1)
-        client_sr(ip, port, fname)
+        client_sr(ip, port, fname, trace)
 
     else:
         print("mode must be server or client")
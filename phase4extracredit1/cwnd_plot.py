@@ -0,0 +1,37 @@
+import os
+import sys
+import csv
+import matplotlib.pyplot as plt
+
+# cwnd over time from the --cwnd-trace files of the clients, for example
+#   py -3 cwnd_plot.py gbn_reno.csv gbn_cubic.csv
+if len(sys.argv) < 2:
+    print("Usage: py -3 cwnd_plot.py <trace.csv> [trace.csv ...]")
+    sys.exit(1)
+
+plt.figure()
+
+for name in sys.argv[1:]:
+    t = []
+    cwnd = []
+
+    # read CSV file
+    with open(name, "r") as f:
+        reader = csv.reader(f)
+        next(reader)
+
+        for row in reader:
+            t.append(float(row[0]))
+            cwnd.append(float(row[1]))
+
+    # cwnd only changes at the recorded points
+    plt.step(t, cwnd, where="post", label=os.path.splitext(os.path.basename(name))[0])
+
+plt.xlabel("Time (s)")
+plt.ylabel("cwnd (packets)")
+plt.title("Congestion Window")
+plt.legend()
+plt.grid(True)
+plt.savefig("cwnd_plot.png")
+
+plt.show()
@@ -4,38 +4,27 @@ import struct
 import time
 import os
 
-MSS = 1000  # bytes per packet
-
-# header
-HDR_FMT = "!I H H"
-HDR_SIZE = struct.calcsize(HDR_FMT)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import GBNCodec
+from rdtlib.rxpool import RecvPool
+from rdtlib.rto import RTOEstimator
 
+MSS = 1000  # bytes per packet
+TO = 0.5    # timeout (first RTO when ADAPTIVE_RTO is on)
+ADAPTIVE_RTO = True  # RFC 6298 RTO from measured RTTs, False keeps TO fixed
 
-def checksum(b: bytes) -> int:
-    # small checksum
-    return sum(b) & 0xFFFF
+# header "!I H H" seq, length, checksum (see rdtlib/codec.py)
+codec = GBNCodec(MSS)
 
 
-def make_pkt(seq: int, data: bytes) -> bytes:
-    length = len(data)
-    header = struct.pack(HDR_FMT, seq, length, 0)
-    cs = checksum(header + data)
-    header = struct.pack(HDR_FMT, seq, length, cs)
-    return header + data
+def make_pkt(seq: int, data: bytes) -> memoryview:
+    # built in the codec's buffer, send it before the next make_pkt
+    return codec.encode(seq, data)
 
 
 def parse_pkt(pkt: bytes):
-    # check size
-    if len(pkt) < HDR_SIZE:
-        return None
-    header = pkt[:HDR_SIZE]
-    seq, length, cs = struct.unpack(HDR_FMT, header)
-    data = pkt[HDR_SIZE:HDR_SIZE + length]
-    # recompute checksum
-    header0 = struct.pack(HDR_FMT, seq, length, 0)
-    if checksum(header0 + data) != cs:
-        return None
-    return seq, data
+    # (seq, payload view) or None on bad checksum
+    return codec.decode(pkt)
 
 
 def client_sw(ip: str, port: int, fname: str):
@@ -56,8 +45,8 @@ def client_sw(ip: str, port: int, fname: str):
     print(f"[SW CLIENT] total packets {n}")
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(0.5)
     addr = (ip, port)
+    rto = RTOEstimator(TO, adaptive=ADAPTIVE_RTO)
 
     start_time = time.time()  # start time
 
@@ -66,25 +55,37 @@ def client_sw(ip: str, port: int, fname: str):
         pkt = make_pkt(seq_id, d)
 
         # send until we get ACK
+        first_try = True
         while True:
             sock.sendto(pkt, addr)
+            sent = time.monotonic()
             print(f"[SW CLIENT] Sent packet {seq_id}")
+            sock.settimeout(rto.rto)
             try:
                 ack_pkt, _ = sock.recvfrom(1024)
                 if len(ack_pkt) == 4:
                     (ack_seq,) = struct.unpack("!I", ack_pkt)
                     print(f"[SW CLIENT] Got ACK {ack_seq}")
                     if ack_seq == seq_id:
+                        # Karn: no RTT sample from a resent packet
+                        if first_try:
+                            rto.sample(time.monotonic() - sent)
+                        else:
+                            rto.progress()
                         break  # go to next packet
             except socket.timeout:
                 # no ACK, resend
                 print(f"[SW CLIENT] Timeout on {seq_id}, resend")
+                rto.backoff()
+            # a stale ACK sends it again too: no RTT sample after that (Karn)
+            first_try = False
 
     # send END
     sock.sendto(b"END", addr)
     end_time = time.time()
     duration = end_time - start_time
     print(f"[SW CLIENT] Done. Time = {duration:.3f} seconds")
+    print(f"[SW CLIENT] {rto.summary()}")
 
     sock.close()
 
@@ -96,10 +97,11 @@ def server_sw(port: int):
 
     expected = 0
     client = None
+    rx = RecvPool(sock, 4096)  # datagrams land in one preallocated buffer
     f = open("udpfile_received.jpg", "wb")
 
     while True:
-        pkt, addr = sock.recvfrom(4096)
+        pkt, addr = rx.recv()
         if pkt == b"END":
             print("[SW SERVER] END received, closing.")
             break
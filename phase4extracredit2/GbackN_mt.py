@@ -5,33 +5,33 @@ import time
 import os
 import threading
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from rdtlib.codec import GBNCodec
+from rdtlib.rxpool import RecvPool
+from rdtlib.diskwriter import CoalescingWriter
+from rdtlib.timers import TimerWheel
+from rdtlib.rto import RTOEstimator
+from rdtlib.pacer import TokenBucket
+from rdtlib.ackpolicy import AckPolicy
+from rdtlib.scoreboard import Scoreboard, wire, unwrap
+
 MSS = 1000      # bytes per packet
 WIN = 10        # window size
-TO  = 0.2       # timeout seconds
-
-HDR_FMT = "!I H H"
-HDR_SIZE = struct.calcsize(HDR_FMT)
-
-def checksum(b: bytes) -> int:
-    return sum(b) & 0xFFFF
-
-def make_pkt(seq: int, data: bytes) -> bytes:
-    length = len(data)
-    header = struct.pack(HDR_FMT, seq, length, 0)
-    cs = checksum(header + data)
-    header = struct.pack(HDR_FMT, seq, length, cs)
-    return header + data
+TO  = 0.2       # timeout seconds (first RTO when ADAPTIVE_RTO is on)
+ADAPTIVE_RTO = True  # RFC 6298 RTO from measured RTTs, False keeps TO fixed
+PACE_RATE = 50 * 1000 * 1000  # new packets go out at this many bytes/s (0 = unpaced)
+PACE_BURST = 16 * 1024        # bytes that may go back to back
+FLUSH_SIZE = 1024 * 1024  # server writes to disk in blocks this big
+FLUSH_INTERVAL = 0.05     # or after this many seconds idle
+ACK_EVERY = 0     # server: in-order packets per ACK (1 = every packet, 0 = no limit)
+ACK_DELAY = 0.0   # server: seconds an ACK may wait for more (0 = until the socket is drained)
+
+# header "!I H H" seq, length, checksum (see rdtlib/codec.py)
+codec = GBNCodec(MSS)
 
 def parse_pkt(pkt: bytes):
-    if len(pkt) < HDR_SIZE:
-        return None
-    header = pkt[:HDR_SIZE]
-    seq, length, cs = struct.unpack(HDR_FMT, header)
-    data = pkt[HDR_SIZE:HDR_SIZE+length]
-    header0 = struct.pack(HDR_FMT, seq, length, 0)
-    if checksum(header0 + data) != cs:
-        return None
-    return seq, data
+    # (seq, payload view) or None on bad checksum
+    return codec.decode(pkt)
 
 # GBN SERVER
 
@@ -42,43 +42,68 @@ def server_gbn(port: int):
 
     exp_seq = 0
     client = None
-    f = open("udpfile_received_mt.jpg", "wb")
-
-    while True:
-        pkt, addr = sock.recvfrom(4096)
-        if pkt == b"END":
-            print("[GBN MT SERVER] END received, closing.")
-            break
-
-        if client is None:
-            client = addr
-
-        p = parse_pkt(pkt)
-        if p is None:
-            # bad packet, send dup ack for last good
-            ack = struct.pack("!I", exp_seq - 1)
-            sock.sendto(ack, client)
-            continue
+    rx = RecvPool(sock, 4096)  # datagrams land in one preallocated buffer
+    # disk writes happen on a background thread, the ACK doesn't wait
+    f = CoalescingWriter("udpfile_received_mt.jpg", FLUSH_SIZE, FLUSH_INTERVAL)
+    # one cumulative ACK per drained socket, gaps ACKed at once
+    acks = AckPolicy(ACK_EVERY, ACK_DELAY)
+    done = False
 
-        seq, data = p
+    def send_ack():
+        # ack for last in order, nothing to ACK before packet 0
+        if exp_seq > 0:
+            sock.sendto(struct.pack("!I", wire(exp_seq - 1)), client)
+            acks.sent()
+
+    while not done:
+        # block, but only until a delayed ACK is due
+        if not rx.poll(acks.wait()):
+            send_ack()
+            continue
+        item = rx.recv()
+        while item is not None:
+            pkt, addr = item
+            if pkt == b"END":
+                print("[GBN MT SERVER] END received, closing.")
+                done = True
+                break
 
-        if seq == exp_seq:
-            # in order
-            f.write(data)
-            print(f"[GBN MT SERVER] Got packet {seq}")
-            ack = struct.pack("!I", seq)
-            sock.sendto(ack, client)
-            exp_seq += 1
-        else:
-            # out of order, send ack for last in order
-            ack = struct.pack("!I", exp_seq - 1)
-            sock.sendto(ack, client)
+            if client is None:
+                client = addr
+
+            p = parse_pkt(pkt)
+            if p is None:
+                # bad packet, send dup ack for last good
+                if acks.data(False):
+                    send_ack()
+            else:
+                seq, data = p
+                in_order = seq == wire(exp_seq)   # 32 bits on the wire
+                if in_order:
+                    f.write(data)
+                    print(f"[GBN MT SERVER] Got packet {seq}")
+                    exp_seq += 1
+                # out of order: dup ack right away
+                if acks.data(in_order):
+                    send_ack()
+            item = rx.try_recv()
+        # socket drained
+        if acks.drained():
+            send_ack()
 
     f.close()
     sock.close()
-    print("[GBN MT SERVER] Done.")
+    print(f"[GBN MT SERVER] Done. {acks.summary()}")
 
 #  GBN CLIENT MULTI THREAD
+#
+# Three threads and one lock, nobody polls: the sender waits on `room`
+# until an ACK opens the window, the timer thread waits on `tick` exactly
+# until the oldest deadline (or until a new timer is armed), the receiver
+# blocks in recvfrom and the main thread joins it.  The lock only guards
+# the window state; encoding, sendto and the prints happen outside it, so
+# every thread that sends has its own codec (the shared one reuses its
+# buffer).
 
 def client_gbn_mt(ip: str, port: int, fname: str):
     # read file
@@ -98,73 +123,116 @@ def client_gbn_mt(ip: str, port: int, fname: str):
     print(f"[GBN MT CLIENT] total packets {n}")
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(0.05)
     addr = (ip, port)
 
-    # shared state
+    # shared state, all under lock
     lock = threading.Lock()
+    room = threading.Condition(lock)    # sender: the window has space
+    tick = threading.Condition(lock)    # timer thread: a deadline changed
     base = 0
     next_seq = 0
-    send_times = {}
-    done = False
-    stop_event = threading.Event()
+    wheel = TimerWheel()
+    timer = None                # timer of the oldest unacked packet
+    resend = None               # (lo, hi) the timer thread sends again
+    finished = False
+    rto = RTOEstimator(TO, adaptive=ADAPTIVE_RTO)
+    board = Scoreboard(WIN)     # first send time per unacked seq, resent flags (Karn)
+    # sender thread only; sleeps, never spins, so the GIL stays free
+    pacer = TokenBucket(PACE_RATE, PACE_BURST, spin=0)
+
+    # with lock held: (re)start the GBN timer
+    def start_timer():
+        nonlocal timer
+        if timer is not None:
+            timer.cancel()
+        timer = wheel.arm(rto.rto, on_timeout)
+        tick.notify()
+
+    # timer thread, lock held: pick the window to resend, sent after unlock
+    def on_timeout():
+        nonlocal resend
+        rto.backoff()
+        resend = (base, next_seq)
+        now = time.monotonic()
+        for s in range(*resend):
+            board.sent(s, now)
+        start_timer()
 
     start_time = time.time()
 
     # sender thread
     def sender():
         nonlocal next_seq
-        while not stop_event.is_set():
+        enc = GBNCodec(MSS)
+        while True:
+            # tokens first: base only grows, so once the window has room
+            # it keeps it while the pacer waits
+            pacer.pace(MSS + enc.HDR_SIZE)
             with lock:
-                # window not full and still packets left
-                while next_seq < n and next_seq < base + WIN:
-                    seq_id, d = chunks[next_seq]
-                    pkt = make_pkt(seq_id, d)
-                    sock.sendto(pkt, addr)
-                    send_times[seq_id] = time.time()
-                    print(f"[GBN MT CLIENT] Sent packet {seq_id}")
-                    next_seq += 1
-            time.sleep(0.001)
-
-    # receiver thread (acks)
+                while not finished and not (next_seq < n and next_seq < base + WIN):
+                    room.wait()
+                if finished:
+                    return
+                seq_id, d = chunks[next_seq]
+                next_seq += 1
+                board.sent(seq_id, time.monotonic())
+                if timer is None:
+                    start_timer()
+            sock.sendto(enc.encode(seq_id, d), addr)
+            print(f"[GBN MT CLIENT] Sent packet {seq_id}")
+
+    # receiver thread (acks), blocks in recvfrom
     def receiver():
-        nonlocal base
-        while not stop_event.is_set():
-            try:
-                pkt, _ = sock.recvfrom(1024)
-            except socket.timeout:
+        nonlocal base, timer, finished
+        while True:
+            pkt, _ = sock.recvfrom(1024)
+            if len(pkt) != 4:
                 continue
-            if len(pkt) == 4:
-                (ack_seq,) = struct.unpack("!I", pkt)
-                with lock:
-                    if ack_seq + 1 > base:
-                        base = ack_seq + 1
-                        print(f"[GBN MT CLIENT] Got ACK {ack_seq}")
-                        # if all done, stop event
-                        if base >= n:
-                            break
-        # flag stop when exit
-        stop_event.set()
-
-    # timer thread
-    def timer_thread():
-        while not stop_event.is_set():
-            time.sleep(0.01)
+            (ack_seq,) = struct.unpack("!I", pkt)
             with lock:
+                ack_seq = unwrap(ack_seq, base)
+                if not base <= ack_seq < next_seq:
+                    continue
+                rto.progress()
+                sent = board.sample(ack_seq)
+                if sent is not None:
+                    rto.sample(time.monotonic() - sent)
+                board.release(base, ack_seq + 1)
+                base = ack_seq + 1
+                room.notify()
+                if base < next_seq:
+                    start_timer()
+                else:
+                    timer.cancel()
+                    timer = None
                 if base >= n:
-                    break
-                now = time.time()
-                # check oldest unacked
-                if base in send_times and now - send_times[base] > TO:
-                    print(f"[GBN MT CLIENT] Timeout at {base}, resend window")
-                    # resend all in window
-                    for s in range(base, min(base + WIN, n)):
-                        seq_id, d = chunks[s]
-                        pkt = make_pkt(seq_id, d)
-                        sock.sendto(pkt, addr)
-                        send_times[seq_id] = time.time()
-                        print(f"[GBN MT CLIENT] Resent packet {seq_id}")
-        stop_event.set()
+                    # all done, wake everyone up to leave
+                    finished = True
+                    room.notify_all()
+                    tick.notify_all()
+            print(f"[GBN MT CLIENT] Got ACK {ack_seq}")
+            if finished:
+                return
+
+    # timer thread, sleeps until the next deadline
+    def timer_thread():
+        nonlocal resend
+        enc = GBNCodec(MSS)
+        while True:
+            with lock:
+                while not finished and resend is None:
+                    wheel.expire()
+                    if resend is None:
+                        tick.wait(wheel.next_timeout())
+                if finished:
+                    return
+                lo, hi = resend
+                resend = None
+            print(f"[GBN MT CLIENT] Timeout at {lo}, resend window")
+            for s in range(lo, hi):
+                seq_id, d = chunks[s]
+                sock.sendto(enc.encode(seq_id, d), addr)
+                print(f"[GBN MT CLIENT] Resent packet {seq_id}")
 
     t_send = threading.Thread(target=sender, daemon=True)
     t_recv = threading.Thread(target=receiver, daemon=True)
@@ -174,15 +242,16 @@ def client_gbn_mt(ip: str, port: int, fname: str):
     t_recv.start()
     t_timer.start()
 
-    # wait until all acks
-    while True:
+    # the receiver returns once everything is acked
+    if n:
+        t_recv.join()
+    else:
         with lock:
-            if base >= n:
-                break
-        time.sleep(0.01)
-
-    stop_event.set()
-    time.sleep(0.05)
+            finished = True
+            room.notify_all()
+            tick.notify_all()
+    t_send.join()
+    t_timer.join()
 
     # send END
     sock.sendto(b"END", addr)
@@ -190,6 +259,8 @@ def client_gbn_mt(ip: str, port: int, fname: str):
 
     total_time = time.time() - start_time
     print(f"[GBN MT CLIENT] Done. Time = {total_time:.3f} seconds")
+    print(f"[GBN MT CLIENT] {rto.summary()}")
+    print(f"[GBN MT CLIENT] {pacer.summary()}")
 
 #  MAIN
 
@@ -0,0 +1,3 @@
+# Shared helpers for the RDT phases.
+# Each phase folder still runs on its own; scripts put the repo root on
+# sys.path and import the pieces they need from here.
@@ -0,0 +1,74 @@
+# When a GBN receiver sends its cumulative ACK.
+#
+# The receivers answered every data packet with an ACK, even with more
+# datagrams already queued behind it, so a bulk transfer cost one sendto
+# on the receiver and one recvfrom on the sender per packet.  A cumulative
+# ACK for the last packet says everything the earlier ones would have.
+#
+#   every=1             one ACK per packet (the old behaviour)
+#   every=0, delay=0    drain the socket, then one ACK for all of it
+#   every=N, delay=T    ACK after N in-order packets or T seconds,
+#                       whichever comes first
+#
+# A packet out of order (a gap: something before it was lost) or a bad
+# one is always ACKed at once, so the sender still sees its duplicate
+# ACKs for fast retransmit.
+#
+#   acks = AckPolicy(ACK_EVERY, ACK_DELAY)
+#   if acks.data(seq == expected): send_ack()   # acks.sent() inside
+#   ... socket drained:
+#   if acks.drained(): send_ack()
+#   sock.settimeout(acks.wait())                # None while nothing is due
+
+import time
+
+MIN_WAIT = 1e-6     # wait() floor, settimeout(0) would mean non-blocking
+
+
+class AckPolicy:
+    def __init__(self, every: int = 0, delay: float = 0.0):
+        self.every = every      # in-order packets per ACK, 0 = no limit
+        self.delay = delay      # seconds an ACK may wait, 0 = until drained
+        self.pending = 0        # in-order packets not ACKed yet
+        self.first = 0.0        # when the oldest of them came in
+        self.acks = 0           # ACKs sent
+        self.packets = 0        # data packets seen
+
+    def data(self, in_order: bool) -> bool:
+        """
+        A data packet was handled. True if an ACK must go now.
+        """
+        self.packets += 1
+        if not in_order:
+            return True
+        self.pending += 1
+        if self.pending == 1:
+            self.first = time.monotonic()
+        return self.every > 0 and self.pending >= self.every
+
+    def drained(self) -> bool:
+        """
+        Nothing more is queued. True if the pending ACK must go now.
+        """
+        if not self.pending:
+            return False
+        return self.delay <= 0 or time.monotonic() - self.first >= self.delay
+
+    def wait(self):
+        """
+        Seconds the receiver may block before the pending ACK is due,
+        None if no ACK is pending.
+        """
+        if not self.pending:
+            return None
+        return max(MIN_WAIT, self.first + self.delay - time.monotonic())
+
+    def sent(self):
+        self.pending = 0
+        self.acks += 1
+
+    def summary(self) -> str:
+        mode = ("every packet" if self.every == 1 else
+                "on drain" if self.delay <= 0 and self.every == 0 else
+                f"every {self.every or 'inf'} packets or {self.delay * 1e6:.0f} us")
+        return f"ACK {mode}: {self.acks} ACKs for {self.packets} packets"
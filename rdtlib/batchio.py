@@ -0,0 +1,294 @@
+# Batched datagram I/O (Linux sendmmsg / recvmmsg through ctypes).
+#
+# A window burst goes out in one sendmmsg call and everything already
+# queued on the socket (ACKs on the sender, data on the receiver) comes in
+# with one recvmmsg call.  On other systems, or if libc does not have the
+# calls, the classes fall back to one sendto / recvfrom_into per packet.
+#
+#   tx = BatchSender(sock)
+#   tx.add(pkt, addr)        # copied into a fixed send arena
+#   tx.add_parts([hdr, view], addr)   # hdr copied, view sent in place
+#   tx.flush()               # one syscall for everything added
+#
+#   rx = BatchReceiver(sock)
+#   for data, addr in rx.recv():   # waits up to sock.gettimeout()
+#       ...                        # data is only valid until next recv()
+#
+# IPv4 only, like the rest of the project.
+
+import os
+import sys
+import errno
+import select
+import socket
+import ctypes
+
+from .rxpool import RecvPool
+
+MSG_DONTWAIT = 0x40
+
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _libc.sendmmsg
+        _libc.recvmmsg
+    except (OSError, AttributeError):
+        _libc = None
+
+# PyObject_GetBuffer gives the address of a read-only buffer (an mmap
+# view) that ctypes' from_buffer refuses, so add_parts can send from it
+_pythonapi = getattr(ctypes, "pythonapi", None)
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p),
+                ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(iovec)),
+                ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p),
+                ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", msghdr), ("msg_len", ctypes.c_uint)]
+
+
+class Py_buffer(ctypes.Structure):
+    _fields_ = [("buf", ctypes.c_void_p),
+                ("obj", ctypes.c_void_p),
+                ("len", ctypes.c_ssize_t),
+                ("itemsize", ctypes.c_ssize_t),
+                ("readonly", ctypes.c_int),
+                ("ndim", ctypes.c_int),
+                ("format", ctypes.c_char_p),
+                ("shape", ctypes.c_void_p),
+                ("strides", ctypes.c_void_p),
+                ("suboffsets", ctypes.c_void_p),
+                ("internal", ctypes.c_void_p)]
+
+
+class sockaddr_in(ctypes.Structure):
+    # port and addr are kept in network byte order
+    _fields_ = [("sin_family", ctypes.c_ushort),
+                ("sin_port", ctypes.c_uint16),
+                ("sin_addr", ctypes.c_uint32),
+                ("sin_zero", ctypes.c_uint8 * 8)]
+
+
+if _libc is not None:
+    _sendmmsg = _libc.sendmmsg
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+    _recvmmsg = _libc.recvmmsg
+    _recvmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    _recvmmsg.restype = ctypes.c_int
+if _pythonapi is not None:
+    _get_buffer = _pythonapi.PyObject_GetBuffer
+    _get_buffer.argtypes = [ctypes.py_object, ctypes.c_void_p, ctypes.c_int]
+    _get_buffer.restype = ctypes.c_int
+    _release_buffer = _pythonapi.PyBuffer_Release
+    _release_buffer.argtypes = [ctypes.c_void_p]
+    _release_buffer.restype = None
+
+
+def available() -> bool:
+    """
+    True if sendmmsg/recvmmsg can be used on this system.
+    """
+    return _libc is not None
+
+
+def _check(ret):
+    # -1 from libc: return the errno, raise on anything but retry cases
+    err = ctypes.get_errno()
+    if err in (errno.EINTR, errno.EAGAIN, errno.EWOULDBLOCK):
+        return err
+    raise OSError(err, os.strerror(err))
+
+
+class _Arena:
+    # n slots of slot bytes, one sockaddr + mmsghdr per slot and two
+    # iovecs: iov[2i] is slot i, iov[2i + 1] a buffer sent in place
+    def __init__(self, n, slot):
+        self.n = n
+        self.slot = slot
+        self.buf = bytearray(n * slot)
+        self.view = memoryview(self.buf)
+        self.cbuf = (ctypes.c_char * len(self.buf)).from_buffer(self.buf)
+        self.iov = (iovec * (2 * n))()
+        self.names = (sockaddr_in * n)()
+        self.msgs = (mmsghdr * n)()
+        base = ctypes.addressof(self.cbuf)
+        for i in range(n):
+            self.iov[2 * i].iov_base = base + i * slot
+            self.iov[2 * i].iov_len = slot
+            h = self.msgs[i].msg_hdr
+            h.msg_name = ctypes.addressof(self.names[i])
+            h.msg_namelen = ctypes.sizeof(sockaddr_in)
+            h.msg_iov = ctypes.pointer(self.iov[2 * i])
+            h.msg_iovlen = 1
+        self.msgs_addr = ctypes.addressof(self.msgs)
+
+
+class BatchSender:
+    def __init__(self, sock, max_batch: int = 64, slot: int = 2048, enabled: bool = True):
+        self.sock = sock
+        self.fast = enabled and available()
+        self.count = 0
+        self.syscalls = 0
+        if self.fast:
+            self.arena = _Arena(max_batch, slot)
+            self.slot_addr = [None] * max_batch
+            # buffers add_parts sends in place, held until flush()
+            self.pins = (Py_buffer * max_batch)()
+            self.pin_addr = [ctypes.addressof(p) for p in self.pins]
+            self.pinned = []
+
+    def add(self, pkt, addr):
+        """
+        Queue one datagram. pkt is copied, so a reused codec buffer
+        can be passed straight in. Flushes by itself when the batch is full.
+        """
+        if not self.fast:
+            self.sock.sendto(pkt, addr)
+            self.syscalls += 1
+            return
+        a = self.arena
+        n = len(pkt)
+        off = self.count * a.slot
+        a.view[off:off + n] = pkt
+        self._queue(n, addr)
+
+    def _queue(self, n, addr):
+        # finish the slot at self.count: length, destination, maybe flush
+        a = self.arena
+        i = self.count
+        a.iov[2 * i].iov_len = n
+        if self.slot_addr[i] != addr:
+            name = a.names[i]
+            name.sin_family = socket.AF_INET
+            name.sin_port = socket.htons(addr[1])
+            name.sin_addr = int.from_bytes(socket.inet_aton(socket.gethostbyname(addr[0])), sys.byteorder)
+            self.slot_addr[i] = addr
+        self.count += 1
+        if self.count == a.n:
+            self.flush()
+
+    def add_parts(self, parts, addr):
+        """
+        Queue one datagram made of several buffers (e.g. header and a
+        view into an mmap). The leading parts are copied into one slot,
+        the last one is sent from where it is: it must not change or be
+        released until the next flush().
+        """
+        if not self.fast:
+            if hasattr(self.sock, "sendmsg"):
+                self.sock.sendmsg(parts, [], 0, addr)
+            else:
+                self.sock.sendto(b"".join(parts), addr)
+            self.syscalls += 1
+            return
+        a = self.arena
+        i = self.count
+        off = i * a.slot
+        n = 0
+        *head, body = parts
+        in_place = _pythonapi is not None and len(body) > 0
+        if not in_place:
+            head = parts
+        for p in head:
+            ln = len(p)
+            a.view[off + n:off + n + ln] = p
+            n += ln
+        if in_place:
+            # second iovec straight at the caller's memory, no copy
+            pin = self.pins[i]
+            _get_buffer(body, self.pin_addr[i], 0)
+            self.pinned.append(i)
+            a.iov[2 * i + 1].iov_base = pin.buf
+            a.iov[2 * i + 1].iov_len = pin.len
+            a.msgs[i].msg_hdr.msg_iovlen = 2
+        self._queue(n, addr)
+
+    def flush(self):
+        """
+        Send everything queued with as few sendmmsg calls as possible.
+        """
+        if not self.fast:
+            return
+        a = self.arena
+        fd = self.sock.fileno()
+        size = ctypes.sizeof(mmsghdr)
+        sent = 0
+        try:
+            while sent < self.count:
+                r = _sendmmsg(fd, a.msgs_addr + sent * size, self.count - sent, 0)
+                self.syscalls += 1
+                if r < 0:
+                    if _check(r) != errno.EINTR:
+                        # send buffer full, wait until the socket drains
+                        select.select([], [self.sock], [])
+                    continue
+                sent += r
+        finally:
+            # sent or failed, the batch is gone: let the buffers go
+            self.count = 0
+            for i in self.pinned:
+                _release_buffer(self.pin_addr[i])
+                a.msgs[i].msg_hdr.msg_iovlen = 1
+            self.pinned.clear()
+
+
+class BatchReceiver:
+    def __init__(self, sock, max_batch: int = 64, slot: int = 2048, enabled: bool = True):
+        self.sock = sock
+        self.slot = slot
+        self.fast = enabled and available()
+        self.syscalls = 0
+        self.addrs = {}     # raw sockaddr -> (ip, port), so we don't rebuild tuples
+        if self.fast:
+            self.arena = _Arena(max_batch, slot)
+        else:
+            # one preallocated buffer for the recvfrom_into fallback
+            self.rx = RecvPool(sock, slot)
+
+    def recv(self):
+        """
+        Wait up to the socket timeout for data, then return every queued
+        datagram as a list of (data, addr). Raises socket.timeout.
+        data views are reused by the next recv() call.
+        """
+        if not self.fast:
+            self.syscalls += 1
+            return [self.rx.recv()]
+        a = self.arena
+        fd = self.sock.fileno()
+        while True:
+            ready, _, _ = select.select([self.sock], [], [], self.sock.gettimeout())
+            if not ready:
+                raise socket.timeout("timed out")
+            r = _recvmmsg(fd, a.msgs_addr, a.n, MSG_DONTWAIT, None)
+            self.syscalls += 1
+            if r >= 0:
+                break
+            _check(r)
+        out = []
+        namelen = ctypes.sizeof(sockaddr_in)
+        for i in range(r):
+            m = a.msgs[i]
+            name = a.names[i]
+            key = (name.sin_addr, name.sin_port)
+            addr = self.addrs.get(key)
+            if addr is None:
+                ip = socket.inet_ntoa(name.sin_addr.to_bytes(4, sys.byteorder))
+                addr = self.addrs[key] = (ip, socket.ntohs(name.sin_port))
+            off = i * a.slot
+            out.append((a.view[off:off + m.msg_len], addr))
+            m.msg_hdr.msg_namelen = namelen
+        return out
@@ -0,0 +1,199 @@
+# Congestion control for the GBN / SR senders.
+#
+# The senders used a fixed window (WIN = 10), too small to fill a fast
+# path and too big for a lossy one.  Here the window is a congestion
+# window (cwnd, in packets) that starts small, doubles every RTT in slow
+# start, then grows by about one packet per RTT (Reno) or along a cubic
+# curve around the last loss point (CUBIC), and is cut back on loss.
+#
+#   cc = make(CC, max_cwnd=WIN)
+#   while next_seq < base + cc.window(): ...   # send
+#   cc.on_ack(newly_acked)                      # the window moved
+#   cc.on_loss()                                # fast retransmit / SR timer
+#   cc.on_timeout()                             # GBN timer, back to 1 packet
+#   cc.save_trace("gbn_reno.csv")               # time, cwnd, ssthresh
+#
+# max_cwnd is the hard cap: the receive window for SR (packets past it
+# are not buffered), a sanity limit for GBN.  "fixed" keeps the old
+# behaviour, a window of max_cwnd all the time.  Not thread safe.
+
+import abc
+import csv
+import time
+
+INIT_CWND = 10      # RFC 6928 initial window, the old fixed WIN
+MIN_CWND = 2        # cwnd after a loss never goes below this
+MAX_CWND = 1000     # default cap
+
+CUBIC_C = 0.4       # RFC 9438 constants
+CUBIC_BETA = 0.7
+
+
+class CongestionControl(abc.ABC):
+    name = "?"
+
+    def __init__(self, init_cwnd: float = INIT_CWND, max_cwnd: float = MAX_CWND):
+        self.max_cwnd = max_cwnd
+        self.cwnd = min(init_cwnd, max_cwnd)
+        self.ssthresh = max_cwnd    # no slow start limit until the first loss
+        self.losses = 0
+        self.timeouts = 0
+        self.t0 = time.monotonic()
+        self.trace = []             # (seconds since start, cwnd, ssthresh)
+        self._record()
+
+    def window(self) -> int:
+        """
+        Packets the sender may have in flight now.
+        """
+        return max(1, int(self.cwnd))
+
+    def on_ack(self, acked: int):
+        """
+        acked new packets were cumulatively acknowledged.
+        """
+        before = int(self.cwnd)
+        if self.cwnd < self.ssthresh:
+            # slow start, +1 per acked packet; the rest goes to avoidance
+            grow = min(acked, self.ssthresh - self.cwnd)
+            self.cwnd += grow
+            acked -= grow
+        if acked > 0:
+            self._avoid(acked)
+        self.cwnd = min(self.cwnd, self.max_cwnd)
+        if int(self.cwnd) != before:
+            self._record()
+
+    def on_loss(self):
+        """
+        Loss seen while ACKs still flow: multiplicative decrease.
+        """
+        self.losses += 1
+        self._decrease()
+        self._record()
+
+    def on_timeout(self):
+        """
+        Retransmission timer expired: decrease, then slow start from 1.
+        """
+        self.timeouts += 1
+        self._decrease()
+        self.cwnd = 1
+        self._record()
+
+    @abc.abstractmethod
+    def _avoid(self, acked):
+        """
+        Congestion avoidance: grow cwnd for acked packets past ssthresh.
+        """
+
+    @abc.abstractmethod
+    def _decrease(self):
+        """
+        Set ssthresh and cut cwnd after a loss.
+        """
+
+    def _record(self):
+        self.trace.append((time.monotonic() - self.t0, self.cwnd, self.ssthresh))
+
+    def save_trace(self, path: str):
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["time", "cwnd", "ssthresh"])
+            for t, cwnd, ssthresh in self.trace:
+                w.writerow([f"{t:.6f}", f"{cwnd:.2f}", f"{ssthresh:.2f}"])
+
+    def summary(self) -> str:
+        peak = max(c for _, c, _ in self.trace)
+        return (f"cc {self.name}, cwnd {self.cwnd:.1f} (peak {peak:.1f}), "
+                f"ssthresh {self.ssthresh:.1f}, {self.losses} losses, {self.timeouts} timeouts")
+
+
+class Reno(CongestionControl):
+    name = "reno"
+
+    def _avoid(self, acked):
+        # +1 packet per window of ACKs
+        self.cwnd += acked / self.cwnd
+
+    def _decrease(self):
+        self.ssthresh = max(self.cwnd / 2, MIN_CWND)
+        self.cwnd = self.ssthresh
+
+
+class Cubic(CongestionControl):
+    name = "cubic"
+
+    def __init__(self, init_cwnd: float = INIT_CWND, max_cwnd: float = MAX_CWND):
+        self.w_max = 0.0        # cwnd at the last loss
+        self.epoch = None       # start of this avoidance period
+        self.k = 0.0            # seconds from epoch back up to w_max
+        self.origin = 0.0       # plateau of the curve
+        self.w_est = 0.0        # what Reno would have by now
+        super().__init__(init_cwnd, max_cwnd)
+
+    def _avoid(self, acked):
+        now = time.monotonic()
+        if self.epoch is None:
+            self.epoch = now
+            if self.cwnd < self.w_max:
+                self.k = ((self.w_max - self.cwnd) / CUBIC_C) ** (1 / 3)
+                self.origin = self.w_max
+            else:
+                self.k = 0.0
+                self.origin = self.cwnd
+            self.w_est = self.cwnd
+        t = now - self.epoch
+        target = self.origin + CUBIC_C * (t - self.k) ** 3
+        # never slower than Reno would be on the same path
+        self.w_est += 3 * (1 - CUBIC_BETA) / (1 + CUBIC_BETA) * acked / self.cwnd
+        target = max(target, self.w_est)
+        target = min(target, 1.5 * self.cwnd)
+        if target > self.cwnd:
+            self.cwnd += (target - self.cwnd) / self.cwnd * acked
+
+    def _decrease(self):
+        if self.cwnd < self.w_max:
+            # fast convergence: still below the last peak, give up more
+            self.w_max = self.cwnd * (1 + CUBIC_BETA) / 2
+        else:
+            self.w_max = self.cwnd
+        self.ssthresh = max(self.cwnd * CUBIC_BETA, MIN_CWND)
+        self.cwnd = self.ssthresh
+        self.epoch = None
+
+
+class Fixed(CongestionControl):
+    name = "fixed"
+
+    def __init__(self, init_cwnd: float = INIT_CWND, max_cwnd: float = MAX_CWND):
+        super().__init__(max_cwnd, max_cwnd)
+
+    def on_ack(self, acked):
+        pass
+
+    def on_loss(self):
+        self.losses += 1
+
+    def on_timeout(self):
+        self.timeouts += 1
+
+    def _avoid(self, acked):
+        pass
+
+    def _decrease(self):
+        pass
+
+
+ALGORITHMS = {"reno": Reno, "cubic": Cubic, "fixed": Fixed}
+
+
+def make(name: str, init_cwnd: float = INIT_CWND, max_cwnd: float = MAX_CWND) -> CongestionControl:
+    """
+    Congestion control by name: reno, cubic or fixed.
+    """
+    try:
+        cls = ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"unknown congestion control {name!r}, use one of {', '.join(ALGORITHMS)}")
+    return cls(init_cwnd, max_cwnd)
@@ -0,0 +1,51 @@
+# Bounded read-ahead of file chunks for windowed senders.
+#
+# The senders used to read the whole file and split it into a list of
+# chunks before the first packet.  WindowReader keeps only the chunks
+# between base and the end of the window in memory: fill() reads ahead
+# from a buffered file, drop() frees chunks once they are acked.
+#
+# offset/length restrict it to a byte range of the file (one stripe of a
+# striped transfer); seq 0 is then the chunk at offset.
+
+import os
+
+
+class WindowReader:
+    def __init__(self, fname: str, mss: int, offset: int = 0, length: int = None):
+        self.mss = mss
+        self.f = open(fname, "rb")
+        self.size = max(os.fstat(self.f.fileno()).st_size - offset, 0)
+        if length is not None:
+            self.size = min(self.size, length)
+        self.f.seek(offset)
+        self.n = (self.size + mss - 1) // mss   # total packets
+        self.chunks = {}    # seq -> bytes, only for the current window
+        self.next_read = 0  # next seq to read from the file
+        self.low = 0        # lowest seq still held
+
+    def fill(self, upto: int):
+        """
+        Read chunks up to (not including) seq upto, capped at n.
+        Chunks are read in order, so this is a plain sequential read.
+        """
+        upto = min(upto, self.n)
+        while self.next_read < upto:
+            left = self.size - self.next_read * self.mss
+            self.chunks[self.next_read] = self.f.read(min(self.mss, left))
+            self.next_read += 1
+
+    def get(self, seq: int) -> bytes:
+        return self.chunks[seq]
+
+    def drop(self, upto: int):
+        """
+        Free every chunk below seq upto.
+        """
+        while self.low < upto:
+            self.chunks.pop(self.low, None)
+            self.low += 1
+
+    def close(self):
+        self.chunks.clear()
+        self.f.close()
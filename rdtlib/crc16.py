@@ -0,0 +1,92 @@
+# CRC16 for the Phase 2 CRC extra-credit path.
+#
+# Same CRC the old compute_crc16() loop gave: MSB-first, no reflection,
+# no final xor, poly 0x8005, init 0 by default.
+#
+# The bit loop is replaced by lookup tables:
+#   - one 256-entry table, one lookup per byte
+#   - slicing-by-8: 8 tables, one step per 8 bytes, used for big chunks
+# update(crc, chunk) lets callers feed the data in pieces (e.g. header then
+# payload) without joining them first.
+
+POLY = 0x8005
+
+# chunks shorter than this are not worth the slicing-by-8 setup
+SLICE_MIN = 16
+
+_tables = {}
+
+
+def _bitwise(data, poly=POLY, crc=0):
+    # reference bit-by-bit version, only used to build the tables
+    for byte in data:
+        crc ^= (byte << 8)
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ poly) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+    return crc
+
+
+def make_tables(poly=POLY):
+    """
+    Build (and cache) the 8 slicing tables for poly.
+    tables[0] is the normal 256-entry byte table, tables[k][b] is the
+    CRC of byte b followed by k zero bytes.
+    """
+    if poly in _tables:
+        return _tables[poly]
+    t0 = [_bitwise(bytes([b]), poly) for b in range(256)]
+    tables = [t0]
+    for _ in range(7):
+        prev = tables[-1]
+        tables.append([((v << 8) & 0xFFFF) ^ t0[v >> 8] for v in prev])
+    _tables[poly] = tables
+    return tables
+
+
+TABLE = make_tables(POLY)[0]
+
+
+def update_bytewise(crc: int, chunk, poly=POLY) -> int:
+    """
+    Feed chunk into crc one byte at a time using the 256-entry table.
+    """
+    t = make_tables(poly)[0]
+    for b in chunk:
+        crc = ((crc << 8) & 0xFFFF) ^ t[(crc >> 8) ^ b]
+    return crc
+
+
+def update_slice8(crc: int, chunk, poly=POLY) -> int:
+    """
+    Feed chunk into crc 8 bytes per step (slicing-by-8).
+    Leftover bytes at the end go through the byte table.
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7 = make_tables(poly)
+    n = len(chunk) & ~7
+    it = iter(chunk[:n])
+    for b0, b1, b2, b3, b4, b5, b6, b7 in zip(it, it, it, it, it, it, it, it):
+        crc = (t7[b0 ^ (crc >> 8)] ^ t6[b1 ^ (crc & 0xFF)] ^ t5[b2] ^ t4[b3]
+               ^ t3[b4] ^ t2[b5] ^ t1[b6] ^ t0[b7])
+    for b in chunk[n:]:
+        crc = ((crc << 8) & 0xFFFF) ^ t0[(crc >> 8) ^ b]
+    return crc
+
+
+def update(crc: int, chunk, poly=POLY) -> int:
+    """
+    Feed chunk into a running crc and return the new crc.
+    update(update(0, a), b) == crc16(a + b)
+    """
+    if len(chunk) >= SLICE_MIN:
+        return update_slice8(crc, chunk, poly)
+    return update_bytewise(crc, chunk, poly)
+
+
+def crc16(data, poly=POLY, init_val=0x0000) -> int:
+    """
+    CRC16 of data, bit for bit the same as the old compute_crc16().
+    """
+    return update(init_val, data, poly)
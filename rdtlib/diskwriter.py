@@ -0,0 +1,150 @@
+# Background, write-coalescing file writer for the in-order receivers.
+#
+# The GBN receivers used to f.write() every 1000-byte payload before
+# sending the ACK, so a slow disk showed up directly as ACK delay.
+# CoalescingWriter copies payloads into a large block and returns at once;
+# full blocks (or a partial one older than flush_interval) go to a
+# background thread that writes whatever has queued up with one os.writev.
+#
+#   out = CoalescingWriter("udpfile_received.jpg")
+#   out.write(payload)     # copy into the current block, never touches disk
+#   out.close()            # flush everything and wait for the thread
+#
+# At most max_pending blocks wait for the disk; past that write() blocks,
+# so a disk that can't keep up slows the receiver instead of eating memory.
+
+import os
+import time
+import queue
+import threading
+
+FLUSH_SIZE = 1024 * 1024     # bytes per block
+FLUSH_INTERVAL = 0.05        # seconds a partial block may wait
+MAX_PENDING = 64             # blocks queued for the disk thread
+IOV_MAX = 1024               # buffers per writev call
+
+
+class CoalescingWriter:
+    def __init__(self, fname: str, flush_size: int = FLUSH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        self.fd = os.open(fname, flags, 0o644)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        # guards cur / used / cur_start; blocks are queued with it held so
+        # the disk thread's idle flush can't overtake an earlier block
+        self.lock = threading.Lock()
+        self.cur = memoryview(bytearray(flush_size))
+        self.used = 0                   # bytes filled in cur
+        self.cur_start = 0.0
+        self.free = []                  # written blocks for reuse (append/pop only)
+        self.q = queue.Queue(max_pending)
+        self.error = None
+        self.bytes_written = 0
+        self.writes = 0                 # writev calls
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, data):
+        """
+        Append data (copied, views into reused buffers are fine).
+        """
+        if self.error is not None:
+            raise self.error
+        n = len(data)
+        with self.lock:
+            if self.used + n > self.flush_size:
+                # doesn't fit: the full block goes first
+                self.q.put(self._take())
+                if n > self.flush_size:
+                    self.q.put(bytes(data))
+                    return
+            if not self.used:
+                self.cur_start = time.monotonic()
+            self.cur[self.used:self.used + n] = data
+            self.used += n
+
+    def _take(self):
+        # swap the filled part of cur for an empty block; call with the lock held
+        block = self.cur[:self.used]
+        self.cur = self.free.pop() if self.free else memoryview(bytearray(self.flush_size))
+        self.used = 0
+        return block
+
+    def _run(self):
+        while True:
+            try:
+                block = self.q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # idle: push out a partial block that has waited long enough;
+                # don't wait for the lock, write() may hold it on a full queue
+                if not self.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if not self.used or time.monotonic() - self.cur_start < self.flush_interval:
+                        continue
+                    block = self._take()
+                finally:
+                    self.lock.release()
+            if block is None:
+                return
+            blocks = [block]
+            stop = False
+            # everything else already queued goes out in the same call
+            while len(blocks) < IOV_MAX:
+                try:
+                    b = self.q.get_nowait()
+                except queue.Empty:
+                    break
+                if b is None:
+                    stop = True
+                    break
+                blocks.append(b)
+            try:
+                self._writev(blocks)
+            except OSError as e:
+                self.error = e
+            # give the whole blocks back for reuse
+            self.free.extend(memoryview(b.obj) for b in blocks
+                             if isinstance(b, memoryview) and len(b.obj) == self.flush_size)
+            if stop:
+                return
+
+    def _writev(self, blocks):
+        views = [b for b in blocks if len(b)]
+        while views:
+            n = _writev(self.fd, views)
+            self.writes += 1
+            self.bytes_written += n
+            # short write: drop what went out and retry the rest
+            while views and n >= len(views[0]):
+                n -= len(views.pop(0))
+            if n:
+                views[0] = views[0][n:]
+
+    def flush(self):
+        """
+        Hand the current partial block to the disk thread.
+        """
+        with self.lock:
+            if self.used:
+                self.q.put(self._take())
+
+    def close(self):
+        self.flush()
+        self.q.put(None)
+        self.thread.join()
+        os.close(self.fd)
+        if self.error is not None:
+            raise self.error
+
+
+if hasattr(os, "writev"):
+    _writev = os.writev
+else:
+    def _writev(fd, views):
+        # Windows: no writev, one write per block
+        n = 0
+        for v in views:
+            n += os.write(fd, v)
+        return n
@@ -0,0 +1,122 @@
+# UDP segmentation offload (Linux UDP_SEGMENT / UDP_GRO).
+#
+# The sender glues a run of equal-size packets into one buffer and hands it
+# to the kernel with a UDP_SEGMENT cmsg; the kernel cuts it back into the
+# original datagrams (each keeps its own header and checksum, the protocol
+# does not change).  A receiver with UDP_GRO on gets such runs back as one
+# buffer plus the segment size and splits it with memoryview slices.
+# A receiver without GRO, or the other end of a real link, just sees
+# ordinary datagrams.
+#
+#   tx = GSOSender(sock)         # same add/flush interface as BatchSender
+#   rx = GROReceiver(sock)       # same recv() interface as BatchReceiver
+#
+# Rules from the kernel: every segment but the last has the same size and
+# at most MAX_SEGS segments / 64 KB go in one send.
+
+import sys
+import struct
+import socket
+
+SOL_UDP = getattr(socket, "SOL_UDP", 17)
+UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103)
+UDP_GRO = getattr(socket, "UDP_GRO", 104)
+MAX_SEGS = 64
+MAX_SEND = 65507     # largest UDP payload over IPv4
+SEG = struct.Struct("=H")
+GRO_SIZE = struct.Struct("=i")
+
+_available = None
+
+
+def available() -> bool:
+    """
+    True if this kernel takes UDP_SEGMENT and UDP_GRO.
+    """
+    global _available
+    if _available is None:
+        _available = False
+        if sys.platform.startswith("linux"):
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                s.setsockopt(SOL_UDP, UDP_SEGMENT, 1000)
+                s.setsockopt(SOL_UDP, UDP_GRO, 1)
+                _available = True
+            except OSError:
+                pass
+            finally:
+                s.close()
+    return _available
+
+
+class GSOSender:
+    def __init__(self, sock):
+        self.sock = sock
+        self.buf = bytearray(MAX_SEND)
+        self.view = memoryview(self.buf)
+        self.used = 0       # bytes queued in buf
+        self.seg = 0        # segment size of the current run
+        self.nsegs = 0
+        self.short = False  # last segment was shorter, the run is closed
+        self.addr = None
+        self.syscalls = 0
+
+    def add(self, pkt, addr):
+        """
+        Queue one datagram. It joins the current run if it has the run's
+        size (or is shorter, which then ends the run), otherwise the run is
+        sent first. pkt is copied, a reused codec buffer is fine.
+        """
+        n = len(pkt)
+        if self.nsegs and (n > self.seg or addr != self.addr or self.short
+                           or self.nsegs == MAX_SEGS or self.used + n > MAX_SEND):
+            self.flush()
+        if self.nsegs == 0:
+            self.seg = n
+            self.addr = addr
+            self.short = False
+        elif n < self.seg:
+            self.short = True
+        self.view[self.used:self.used + n] = pkt
+        self.used += n
+        self.nsegs += 1
+
+    def flush(self):
+        """
+        Send the queued run as one super-datagram.
+        """
+        if self.nsegs == 0:
+            return
+        data = self.view[:self.used]
+        if self.nsegs == 1:
+            self.sock.sendto(data, self.addr)
+        else:
+            self.sock.sendmsg([data], [(SOL_UDP, UDP_SEGMENT, SEG.pack(self.seg))], 0, self.addr)
+        self.syscalls += 1
+        self.used = 0
+        self.nsegs = 0
+
+
+class GROReceiver:
+    def __init__(self, sock):
+        self.sock = sock
+        sock.setsockopt(SOL_UDP, UDP_GRO, 1)
+        self.buf = bytearray(65536)
+        self.view = memoryview(self.buf)
+        self.anc = socket.CMSG_SPACE(GRO_SIZE.size)
+        self.syscalls = 0
+
+    def recv(self):
+        """
+        Wait up to the socket timeout, return the datagrams of one
+        (possibly coalesced) receive as a list of (data, addr).
+        Raises socket.timeout. data views are reused by the next recv().
+        """
+        n, anc, _, addr = self.sock.recvmsg_into([self.buf], self.anc)
+        self.syscalls += 1
+        seg = n
+        for level, kind, val in anc:
+            if level == SOL_UDP and kind == UDP_GRO:
+                seg = GRO_SIZE.unpack_from(val)[0]
+        v = self.view
+        return [(v[off:min(off + seg, n)], addr) for off in range(0, n, seg)] if n else [(v[:0], addr)]
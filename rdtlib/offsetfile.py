@@ -0,0 +1,106 @@
+# Output file addressed by sequence number.
+#
+# Packet seq always carries bytes [seq * mss, seq * mss + len) of the file,
+# so a receiver doesn't need a reorder buffer: each accepted packet is
+# written in place with os.pwrite as soon as it arrives and one bit per
+# packet records that it is there.  The bits live in a Scoreboard ring
+# (rdtlib/scoreboard.py) as big as the receive window, freed as base
+# moves, so they don't grow with the file.  The file is grown ahead of
+# the writes in big steps (posix_fallocate where available) and cut back
+# to the real size on close().
+#
+#   out = OffsetWriter("udpfile_received.jpg", MSS, window=WIN)
+#   if out.write(seq, data):       # False for a duplicate
+#       base = out.advance(base)   # first seq not received yet
+#   bits = out.bitmap(base + 1, n) # what is in above base, for a SACK
+#   out.close()
+#
+# With offset and length it writes one known slice of a shared file (a
+# stripe): seq 0 lands at offset, the file is not truncated on open or
+# cut back on close, and the slice is reserved up front.
+
+import os
+
+from .scoreboard import Scoreboard
+
+PREALLOC_STEP = 8 * 1024 * 1024   # grow the file this much at a time
+WINDOW = 4096                     # default receive window, in packets
+
+
+class OffsetWriter:
+    def __init__(self, fname: str, mss: int, offset: int = 0, length: int = None,
+                 window: int = WINDOW):
+        self.mss = mss
+        self.offset = offset
+        self.shared = length is not None
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if not self.shared:
+            flags |= os.O_TRUNC
+        self.fd = os.open(fname, flags, 0o644)
+        self.board = Scoreboard(window)
+        self.low = 0        # every seq below this is written
+        self.allocated = offset  # file size reserved so far
+        self.end = offset   # highest byte written, the final size
+        self.count = 0      # packets written
+        if self.shared:
+            self._reserve(offset + length)
+
+    def write(self, seq: int, data) -> bool:
+        """
+        Write data at seq * mss unless that packet is already in.
+        Returns True if it was new.
+        """
+        if seq < self.low:
+            return False
+        if seq >= self.low + self.board.size:
+            raise ValueError(f"seq {seq} is past the window ({self.low} + {self.board.size})")
+        if not self.board.ack(seq):
+            return False
+        off = self.offset + seq * self.mss
+        end = off + len(data)
+        if end > self.allocated:
+            self._reserve(end)
+        _pwrite(self.fd, data, off)
+        if end > self.end:
+            self.end = end
+        self.count += 1
+        return True
+
+    def advance(self, base: int) -> int:
+        """
+        First seq at or after base that has not been written.
+        """
+        self.low = self.board.advance(max(base, self.low), self.low + self.board.size)
+        return self.low
+
+    def bitmap(self, start: int, count: int) -> int:
+        """
+        Which of seqs start .. start + count - 1 are written, as an int
+        with bit i for seq start + i.
+        """
+        return self.board.mask(start, count)
+
+    def _reserve(self, upto: int):
+        size = upto if self.shared else max(upto, self.allocated + PREALLOC_STEP)
+        try:
+            os.posix_fallocate(self.fd, self.allocated, size - self.allocated)
+        except (AttributeError, OSError):
+            # no fallocate (Windows, some filesystems): sparse extend, but
+            # never shrink a file other stripes are writing into
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+        self.allocated = size
+
+    def close(self):
+        if not self.shared:
+            os.ftruncate(self.fd, self.end)
+        os.close(self.fd)
+
+
+if hasattr(os, "pwrite"):
+    _pwrite = os.pwrite
+else:
+    def _pwrite(fd, data, off):
+        # Windows has no pwrite, seek + write does the same for one writer
+        os.lseek(fd, off, os.SEEK_SET)
+        return os.write(fd, data)
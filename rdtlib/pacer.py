@@ -0,0 +1,86 @@
+# Token-bucket pacing for the senders.
+#
+# The senders slowed themselves down with fixed sleeps (3 ms every 200
+# packets, a few ms per packet, 1 ms per loop pass).  None of them aims
+# at a rate, so on a fast machine they still overflow the receiver's
+# socket buffer and on a slow one they waste time.  A token bucket does:
+# tokens come in at rate per second up to burst, each send takes its
+# cost (bytes, or 1 per packet), and a send without enough tokens waits
+# exactly until they are there.
+#
+#   pacer = TokenBucket(20e6, 64 * 1024)   # 20 MB/s, 64 KB back to back
+#   for pkt in pkts:
+#       pacer.pace(len(pkt))
+#       sock.sendto(pkt, addr)
+#
+# Times are time.perf_counter_ns().  time.sleep() overshoots by tens of
+# microseconds (a whole ms on older Windows), so the last SPIN seconds of
+# a wait are spun instead.  A thread that shares the GIL with others
+# passes spin=0 and only sleeps: an oversleep is made up by the next
+# sends, up to burst.  rate 0 means no pacing.  Not thread safe.
+
+import time
+
+SPIN = 0.0002       # seconds of a wait that are busy-waited, not slept
+BURST_TIME = 0.002  # default burst: this many seconds of rate
+
+
+def sleep_until(deadline: int, spin: float = SPIN):
+    """
+    Block until time.perf_counter_ns() reaches deadline, busy-waiting
+    only the last spin seconds.
+    """
+    spin = int(spin * 1e9)
+    while True:
+        left = deadline - time.perf_counter_ns()
+        if left <= 0:
+            return
+        if left > spin:
+            time.sleep((left - spin) / 1e9)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None, spin: float = SPIN):
+        self.rate = rate            # tokens per second, 0 = unlimited
+        self.spin = spin            # seconds of a wait busy-waited, 0 = sleep only
+        if burst is None:
+            burst = rate * BURST_TIME
+        self.burst = max(burst, 1)
+        self.tokens = self.burst    # start full
+        self.last = time.perf_counter_ns()
+        # stats
+        self.sent = 0
+        self.waits = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate / 1e9)
+        self.last = now
+
+    def pace(self, cost: float = 1) -> float:
+        """
+        Wait until cost tokens are there and spend them.
+        Returns the seconds waited.
+        """
+        self.sent += 1
+        if not self.rate:
+            return 0.0
+        now = time.perf_counter_ns()
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        wait = int((cost - self.tokens) * 1e9 / self.rate)
+        sleep_until(now + wait, self.spin)
+        # exactly cost tokens came in by the deadline
+        self.tokens = 0.0
+        self.last = now + wait
+        self.waits += 1
+        self.waited += wait / 1e9
+        return wait / 1e9
+
+    def summary(self) -> str:
+        if not self.rate:
+            return f"pacing off, {self.sent} sends"
+        return (f"paced at {self.rate:.0f}/s (burst {self.burst:.0f}), {self.sent} sends, "
+                f"{self.waits} waits, {self.waited:.3f} s waited")
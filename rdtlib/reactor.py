@@ -0,0 +1,183 @@
+# Single-threaded event loop for the senders: sockets and timers together.
+#
+# client_gbn, client_sr and the Phase 4 GBNSender each built the same loop
+# by hand: sock.settimeout(wheel.next_timeout()), a recv that raised
+# socket.timeout, then wheel.expire().  The Reactor is that loop once.  A
+# selectors selector (epoll on Linux) waits on every registered socket and
+# on the next timer deadline at the same time, and one wakeup runs the
+# callback of every ready socket and every timer that is due.
+#
+# On Linux the deadline is a timerfd registered in the selector next to the
+# sockets and armed, as an absolute CLOCK_MONOTONIC time, for the earliest
+# timer in the wheel.  The wait itself has no timeout then, so it is not
+# rounded up to epoll's millisecond resolution, and a sender with nothing
+# to do makes no wakeups at all.  Elsewhere (or with timerfd=False) the
+# selector gets wheel.next_timeout() as its timeout instead.
+#
+#   r = Reactor()
+#   r.add_reader(sock, on_acks)          # on_acks() when sock is readable
+#   t = r.call_later(rto, resend, seq)   # a TimerWheel timer
+#   t.cancel()
+#   while base < n:
+#       ... fill the window, tx.flush()
+#       r.run_once()                     # wait, then run everything ready
+#   r.close()
+#
+# Not thread safe, like the wheel it runs.
+
+import os
+import sys
+import errno
+import ctypes
+import selectors
+
+from .timers import TimerWheel
+
+CLOCK_MONOTONIC = 1     # the clock time.monotonic_ns() reads on Linux
+TFD_TIMER_ABSTIME = 1
+
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _libc.timerfd_create
+        _libc.timerfd_settime
+    except (OSError, AttributeError):
+        _libc = None
+
+
+class timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", timespec), ("it_value", timespec)]
+
+
+if _libc is not None:
+    _timerfd_create = _libc.timerfd_create
+    _timerfd_create.argtypes = [ctypes.c_int, ctypes.c_int]
+    _timerfd_create.restype = ctypes.c_int
+    _timerfd_settime = _libc.timerfd_settime
+    _timerfd_settime.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p]
+    _timerfd_settime.restype = ctypes.c_int
+
+
+def available() -> bool:
+    """
+    True if timerfd can be used on this system.
+    """
+    return _libc is not None
+
+
+class TimerFD:
+    # one-shot timerfd for an absolute monotonic deadline
+    def __init__(self):
+        fd = _timerfd_create(CLOCK_MONOTONIC, os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+        self.spec = itimerspec()
+        self.spec_addr = ctypes.addressof(self.spec)
+        self.deadline = None    # what it is armed for, None = disarmed
+        self.syscalls = 0
+
+    def fileno(self):
+        return self.fd
+
+    def arm(self, deadline):
+        """
+        Fire at deadline (monotonic ns), or never if None. A deadline
+        already past fires at once. No syscall if nothing changed.
+        """
+        if deadline == self.deadline:
+            return
+        # all zero disarms, so a deadline of 0 ns is moved to 1
+        sec, nsec = divmod(max(deadline, 1), 1000000000) if deadline is not None else (0, 0)
+        self.spec.it_value.tv_sec = sec
+        self.spec.it_value.tv_nsec = nsec
+        if _timerfd_settime(self.fd, TFD_TIMER_ABSTIME, self.spec_addr, None) < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.syscalls += 1
+        self.deadline = deadline
+
+    def clear(self):
+        """
+        Read the expiry count so the fd is not readable any more.
+        """
+        self.deadline = None
+        try:
+            os.read(self.fd, 8)
+        except OSError as e:
+            # re-armed before we got here, nothing to read
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Reactor:
+    def __init__(self, timerfd: bool = True):
+        self.sel = selectors.DefaultSelector()
+        self.wheel = TimerWheel()
+        self.tfd = TimerFD() if timerfd and available() else None
+        if self.tfd is not None:
+            # data None marks the timer, sockets carry their callback
+            self.sel.register(self.tfd, selectors.EVENT_READ, None)
+        self.wakeups = 0    # returns from the selector
+        self.events = 0     # socket callbacks and timers run
+
+    def add_reader(self, sock, callback):
+        """
+        Call callback() whenever sock has data queued.
+        """
+        self.sel.register(sock, selectors.EVENT_READ, callback)
+
+    def remove_reader(self, sock):
+        self.sel.unregister(sock)
+
+    def call_later(self, delay: float, callback, *args):
+        """
+        Call callback(*args) once delay seconds have passed. Returns the
+        wheel's Timer, cancel() it to take it back.
+        """
+        return self.wheel.arm(delay, callback, *args)
+
+    def run_once(self, timeout: float = None) -> int:
+        """
+        Wait until a socket is readable, a timer is due or timeout seconds
+        (None: no limit) have passed, then run every ready socket callback
+        and every due timer. Returns how many ran.
+        """
+        if self.tfd is not None:
+            self.tfd.arm(self.wheel.next_deadline())
+            wait = timeout
+        else:
+            wait = self.wheel.next_timeout(timeout)
+            if timeout is not None and wait is not None:
+                wait = min(wait, timeout)
+        ready = self.sel.select(wait)
+        self.wakeups += 1
+        n = 0
+        for key, _ in ready:
+            if key.data is None:
+                self.tfd.clear()
+            else:
+                key.data()
+                n += 1
+        # after the sockets: an ACK just handled may have cancelled a timer
+        n += self.wheel.expire()
+        self.events += n
+        return n
+
+    def summary(self) -> str:
+        clock = "timerfd" if self.tfd is not None else "select timeout"
+        return f"Reactor ({clock}): {self.wakeups} wakeups, {self.events} events"
+
+    def close(self):
+        self.sel.close()
+        if self.tfd is not None:
+            self.tfd.close()
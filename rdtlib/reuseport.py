@@ -0,0 +1,170 @@
+# Sharded receiver: N worker processes on one UDP port (SO_REUSEPORT).
+#
+# One Python loop tops out at one core.  With SO_REUSEPORT every worker
+# binds its own socket to the same port and the kernel hashes each flow
+# (client address and port) to one of them, so flows are spread over
+# cores without any coordination.  Inside a worker, one socket carries
+# many flows: packets are handed to the rdtlib.aio GBN/SR receiver of their
+# source address, which does exactly what a single-flow receiver does.
+#
+#   launch(9000, "sr", workers=4)     # blocks; Ctrl-C to stop
+#
+# Each flow is written to udpfile_received_<ip>_<port>.jpg in outdir.
+
+import os
+import sys
+import time
+import signal
+import socket
+import asyncio
+import multiprocessing
+
+from . import aio
+
+FINISHED_TTL = 30.0     # ignore stragglers from a finished flow this long
+
+
+class _FlowTransport:
+    # what an aio receiver sees as its transport: the shared socket, and
+    # close() just detaches the flow
+    def __init__(self, demux, addr):
+        self.demux = demux
+        self.addr = addr
+
+    def sendto(self, data, addr=None):
+        self.demux.transport.sendto(data, addr or self.addr)
+
+    def get_extra_info(self, name, default=None):
+        return self.demux.transport.get_extra_info(name, default)
+
+    def close(self):
+        self.demux.forget(self.addr)
+
+
+class _Demux(asyncio.DatagramProtocol):
+    def __init__(self, proto, outdir, window, max_flows, done):
+        self.proto = proto
+        self.outdir = outdir
+        self.window = window
+        self.max_flows = max_flows  # stop after this many flows (0 = never)
+        self.done = done
+        self.flows = {}             # addr -> aio receiver
+        self.finished = {}          # addr -> time it finished
+        self.completed = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        rx = self.flows.get(addr)
+        if rx is None:
+            # only a data packet starts a flow; a late END or a
+            # retransmission after the flow is done must not reopen the file
+            if data == aio.END or addr in self.finished or len(data) < 8:
+                return
+            rx = self._open(addr)
+        rx.datagram_received(data, addr)
+
+    def _open(self, addr):
+        name = f"udpfile_received_{addr[0]}_{addr[1]}.jpg"
+        path = os.path.join(self.outdir, name)
+        if self.proto == "gbn":
+            rx = aio._GBNReceiver(path)
+        else:
+            rx = aio._SRReceiver(path, self.window)
+        rx.connection_made(_FlowTransport(self, addr))
+        rx.done.add_done_callback(lambda f, a=addr: self._report(a, f))
+        self.flows[addr] = rx
+        return rx
+
+    def forget(self, addr):
+        self.flows.pop(addr, None)
+        now = time.monotonic()
+        self.finished[addr] = now
+        for a in [a for a, t in self.finished.items() if now - t > FINISHED_TTL]:
+            del self.finished[a]
+
+    def _report(self, addr, fut):
+        if fut.exception() is None:
+            st = fut.result()
+            print(f"[WORKER {os.getpid()}] {addr[0]}:{addr[1]} done, "
+                  f"{st['bytes']} bytes in {st['time']:.3f} s", flush=True)
+        self.completed += 1
+        if self.max_flows and self.completed >= self.max_flows and not self.done.done():
+            self.done.set_result(None)
+
+    def error_received(self, exc):
+        pass
+
+
+def make_socket(port: int, host: str = "0.0.0.0") -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    sock.bind((host, port))
+    return sock
+
+
+async def _serve(port, proto, outdir, window, max_flows, host):
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    sock = make_socket(port, host)
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _Demux(proto, outdir, window, max_flows, done), sock=sock)
+    try:
+        await done
+    finally:
+        transport.close()
+
+
+def worker(port: int, proto: str, outdir: str = ".", window: int = aio.WINDOW,
+           max_flows: int = 0, host: str = "0.0.0.0"):
+    """
+    One receiver process: serve flows on port until max_flows have
+    finished (0 = forever).
+    """
+    asyncio.run(_serve(port, proto, outdir, window, max_flows, host))
+
+
+def launch(port: int, proto: str, workers: int = 0, outdir: str = ".",
+           window: int = aio.WINDOW, max_flows: int = 0, host: str = "0.0.0.0"):
+    """
+    Start workers (default: one per core) on the same port and wait for
+    them. Without SO_REUSEPORT (Windows) a single worker runs in this
+    process. max_flows is per worker.
+    """
+    if proto not in ("gbn", "sr"):
+        raise ValueError("proto must be gbn or sr")
+    if not hasattr(socket, "SO_REUSEPORT"):
+        print("SO_REUSEPORT not available, running one worker")
+        worker(port, proto, outdir, window, max_flows, host)
+        return
+    workers = workers or os.cpu_count() or 1
+    procs = [multiprocessing.Process(target=worker, args=(port, proto, outdir, window, max_flows, host))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    print(f"[LAUNCHER] {workers} {proto} workers on port {port}", flush=True)
+    # a kill of the launcher takes the workers with it, otherwise they
+    # would keep the port
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: py -3 -m rdtlib.reuseport <gbn|sr> <port> [workers]")
+        sys.exit(1)
+    launch(int(sys.argv[2]), sys.argv[1], int(sys.argv[3]) if len(sys.argv) > 3 else 0)
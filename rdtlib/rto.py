@@ -0,0 +1,98 @@
+# Adaptive retransmission timeout (RFC 6298).
+#
+# The senders used a constant timeout, 0.2 s in Phase 4, while an RTT over
+# loopback is well under a millisecond, so every loss stalled the window
+# for hundreds of RTTs.  RTOEstimator keeps the smoothed RTT (SRTT) and its
+# variation (RTTVAR) from ACK timings and derives RTO = SRTT + 4 * RTTVAR,
+# clamped to [min_rto, max_rto].
+#
+#   rto = RTOEstimator(TO)            # TO is only the first guess now
+#   rto.sample(now - sent_at[seq])    # ACK of a packet sent once (Karn)
+#   rto.backoff()                     # a timer expired: double the RTO
+#   rto.progress()                    # an ACK moved the window
+#   timer = wheel.arm(rto.rto, ...)
+#   print(rto.summary())
+#
+# Karn's rule is the caller's part: no sample from a packet that was
+# retransmitted, since its ACK may belong to either copy.  A new sample
+# undoes the backoff, and so does any ACK that moves the window: under
+# heavy loss nearly every window has a resent packet, so waiting for a
+# clean sample would leave the RTO stuck at max_rto.  With adaptive=False
+# the RTO stays at initial (the old behaviour) but RTTs are still measured
+# for the summary.
+
+ALPHA = 1 / 8       # SRTT gain
+BETA = 1 / 4        # RTTVAR gain
+K = 4
+GRANULARITY = 0.001 # timer tick (rdtlib/timers.py), seconds
+MIN_RTO = 0.01      # RFC 6298 says 1 s, far too long for a LAN or loopback
+MAX_RTO = 2.0
+
+
+class RTOEstimator:
+    def __init__(self, initial: float = 1.0, min_rto: float = MIN_RTO,
+                 max_rto: float = MAX_RTO, adaptive: bool = True):
+        self.rto = initial
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.adaptive = adaptive
+        self.srtt = None
+        self.rttvar = None
+        self.base_rto = initial     # rto before any backoff
+        # per-transfer stats
+        self.samples = 0
+        self.total = 0.0
+        self.min_rtt = None
+        self.max_rtt = 0.0
+        self.backoffs = 0
+
+    def sample(self, rtt: float):
+        """
+        One RTT measurement, seconds.
+        """
+        self.samples += 1
+        self.total += rtt
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        if rtt > self.max_rtt:
+            self.max_rtt = rtt
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += ALPHA * (rtt - self.srtt)
+        if self.adaptive:
+            rto = self.srtt + max(GRANULARITY, K * self.rttvar)
+            self.rto = self.base_rto = min(max(rto, self.min_rto), self.max_rto)
+
+    def backoff(self):
+        """
+        The retransmission timer expired: RTO doubles up to max_rto.
+        """
+        self.backoffs += 1
+        if self.adaptive:
+            self.rto = min(self.rto * 2, self.max_rto)
+
+    def progress(self):
+        """
+        New data was acked: go back from a backed-off RTO to the estimate.
+        """
+        self.rto = self.base_rto
+
+    def stats(self) -> dict:
+        return {"samples": self.samples,
+                "min_rtt": self.min_rtt or 0.0,
+                "avg_rtt": self.total / self.samples if self.samples else 0.0,
+                "max_rtt": self.max_rtt,
+                "srtt": self.srtt or 0.0,
+                "rttvar": self.rttvar or 0.0,
+                "rto": self.base_rto,
+                "backoffs": self.backoffs}
+
+    def summary(self) -> str:
+        st = self.stats()
+        ms = {k: v * 1e3 for k, v in st.items() if k not in ("samples", "backoffs")}
+        return (f"RTT samples {st['samples']}, min/avg/max {ms['min_rtt']:.2f}/"
+                f"{ms['avg_rtt']:.2f}/{ms['max_rtt']:.2f} ms, srtt {ms['srtt']:.2f} ms, "
+                f"rttvar {ms['rttvar']:.2f} ms, RTO {ms['rto']:.1f} ms, backoffs {st['backoffs']}")
@@ -0,0 +1,58 @@
+# Preallocated receive buffers.
+#
+# sock.recvfrom(n) makes a new bytes object for every datagram, and the
+# receivers then slice or bytearray() it again.  Here the datagram lands
+# in a buffer that already exists (recvfrom_into) and the caller gets a
+# memoryview of it, so parse, checksum and f.write() all run on the same
+# memory.
+#
+#   rx = RecvPool(sock)
+#   pkt, addr = rx.recv()      # view, valid until the next recv()
+#   more = rx.try_recv()       # same, or None if the socket is drained
+
+import select
+import socket
+
+
+class RecvPool:
+    def __init__(self, sock, size: int = 2048):
+        self.sock = sock
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.syscalls = 0
+
+    def recv(self):
+        """
+        One datagram as (memoryview, addr). Honors the socket timeout.
+        The view is overwritten by the next recv().
+        """
+        n, addr = self.sock.recvfrom_into(self.buf)
+        self.syscalls += 1
+        return self.view[:n], addr
+
+    def try_recv(self):
+        """
+        Like recv() on a blocking socket, but None right away if nothing
+        is queued.
+        """
+        self.syscalls += 1
+        if _DONTWAIT:
+            try:
+                n, addr = self.sock.recvfrom_into(self.buf, 0, _DONTWAIT)
+            except BlockingIOError:
+                return None
+        else:
+            if not select.select([self.sock], [], [], 0)[0]:
+                return None
+            n, addr = self.sock.recvfrom_into(self.buf)
+        return self.view[:n], addr
+
+    def poll(self, timeout) -> bool:
+        """
+        Wait up to timeout seconds (None = forever) for a datagram.
+        """
+        return bool(select.select([self.sock], [], [], timeout)[0])
+
+
+# no MSG_DONTWAIT on Windows, select() there instead
+_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0)
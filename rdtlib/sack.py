@@ -0,0 +1,51 @@
+# Selective acknowledgements for Selective Repeat.
+#
+# The SR receiver used to answer every data packet with its own 4-byte ACK
+# ("!I" seq), so the sender needed one recvfrom and one scoreboard update
+# per packet.  A SACK says everything the receiver has in one datagram:
+#
+#   "!I H"  cum, nbits     cum = first missing seq, all below it are in
+#   bitmap  nbits bits     bit i (LSB first) = seq cum + 1 + i is in
+#
+# The bitmap stops at the highest packet received, so a SACK with no hole
+# is 6 bytes.  A plain 4-byte ACK is still told apart by its length.
+# cum goes out mod 2^32 like the data seqs; acked_mask() unwraps it
+# against the sender's base.
+#
+#   tx.add(pack_sack(base, out.bitmap(base + 1, WIN - 1)), client)
+#   cum, bits = unpack_sack(pkt)
+#   new = acked_mask(base, cum, bits) & ~board.mask(base, n)  # bit i = seq base + i
+
+import struct
+
+from .scoreboard import wire, unwrap
+
+SACK = struct.Struct("!IH")   # cumulative ack, bitmap bits
+
+
+def pack_sack(cum: int, bits: int) -> bytes:
+    n = bits.bit_length()
+    return SACK.pack(wire(cum), n) + bits.to_bytes((n + 7) // 8, "little")
+
+
+def unpack_sack(data):
+    """
+    (cum, bitmap as an int) or None if data is not a SACK.
+    """
+    if len(data) < SACK.size:
+        return None
+    cum, n = SACK.unpack_from(data)
+    if len(data) != SACK.size + (n + 7) // 8:
+        return None
+    return cum, int.from_bytes(data[SACK.size:], "little")
+
+
+def acked_mask(base: int, cum: int, bits: int) -> int:
+    """
+    Seqs a SACK acknowledges at or above base, as a mask with bit i for
+    seq base + i. cum is the 32-bit value from the wire.
+    """
+    cum = unwrap(cum, base)
+    low = (1 << (cum - base)) - 1 if cum > base else 0
+    shift = cum + 1 - base
+    return low | (bits << shift if shift >= 0 else bits >> -shift)
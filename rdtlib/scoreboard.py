@@ -0,0 +1,154 @@
+# Per-packet window state in fixed rings, and sequence numbers that wrap.
+#
+# The senders kept what they know about each packet in dicts and sets
+# keyed by absolute seq (sent_at, resent, timers) and SR kept its acked
+# scoreboard as one big int shifted down as base moved.  A Scoreboard
+# holds the same state for up to `size` packets in arrays allocated once
+# and indexed by seq & (size - 1): a bytearray of flags, one acked bit
+# per slot and an array('d') of first send times.  Every operation is
+# O(1) per packet and nothing is allocated while the transfer runs, for
+# windows up to 64K packets and more.
+#
+# Seqs stay plain ints in the programs; only the wire carries the low 32
+# bits.  unwrap() turns a 32-bit seq or ACK back into the absolute seq
+# nearest a reference (base, expected) with serial number arithmetic
+# (RFC 1982), so a transfer can run past 2^32 packets as long as the
+# window stays below 2^31.
+#
+#   sb = Scoreboard(WIN)
+#   sb.sent(seq, now)                   # first send time, a resend marks it
+#   t = sb.sample(seq)                  # send time, None if resent (Karn)
+#   if sb.ack(seq): ...                 # True the first time
+#   base = sb.advance(base, next_seq)   # past the acked run, slots freed
+#   sb.release(base, ack + 1)           # cumulative ACK: free those slots
+#   new = mask & ~sb.mask(base, next_seq - base)   # bit i = seq base + i
+#
+#   hdr.pack(wire(seq), ...)            # 32 bits on the wire
+#   ack = unwrap(ack, base)             # back to an absolute seq
+
+from array import array
+
+SEQ_BITS = 32               # "!I" on the wire
+SEQ_MASK = (1 << SEQ_BITS) - 1
+SEQ_HALF = 1 << (SEQ_BITS - 1)
+
+SENT = 1                    # flag: sent at least once, time recorded
+RESENT = 2                  # flag: sent again, no RTT sample
+
+
+def wire(seq: int) -> int:
+    """
+    seq as it goes in the 32-bit header field.
+    """
+    return seq & SEQ_MASK
+
+
+def seq_diff(a: int, b: int) -> int:
+    """
+    b - a in serial number arithmetic: negative if b is before a.
+    """
+    return ((b - a + SEQ_HALF) & SEQ_MASK) - SEQ_HALF
+
+
+def unwrap(seq: int, ref: int) -> int:
+    """
+    The absolute seq closest to ref whose low 32 bits are seq.
+    """
+    return ref + seq_diff(ref, seq)
+
+
+class Scoreboard:
+    def __init__(self, window: int = 1024):
+        size = 8
+        while size < window:
+            size <<= 1
+        self.size = size            # slots, a power of two >= window
+        self.wrap = size - 1
+        self.flags = bytearray(size)
+        self.bits = bytearray(size // 8)
+        self.times = array("d", bytes(8 * size))
+
+    def slot(self, seq: int) -> int:
+        """
+        Index of seq's slot, for callers with their own ring (timers).
+        """
+        return seq & self.wrap
+
+    def sent(self, seq: int, now: float) -> bool:
+        """
+        seq went out at now. True the first time, after that the slot
+        is marked resent and keeps the first time.
+        """
+        i = seq & self.wrap
+        if self.flags[i]:
+            self.flags[i] |= RESENT
+            return False
+        self.flags[i] = SENT
+        self.times[i] = now
+        return True
+
+    def sample(self, seq: int):
+        """
+        First send time of seq, or None if it was resent (Karn) or
+        never sent.
+        """
+        i = seq & self.wrap
+        return self.times[i] if self.flags[i] == SENT else None
+
+    def ack(self, seq: int) -> bool:
+        """
+        Mark seq acked. True if it was not already.
+        """
+        i = seq & self.wrap
+        b = 1 << (i & 7)
+        if self.bits[i >> 3] & b:
+            return False
+        self.bits[i >> 3] |= b
+        return True
+
+    def acked(self, seq: int) -> bool:
+        i = seq & self.wrap
+        return (self.bits[i >> 3] >> (i & 7)) & 1 == 1
+
+    def mask(self, start: int, count: int) -> int:
+        """
+        Acked bits of seqs start .. start + count - 1 as an int with
+        bit i for seq start + i. count is at most size.
+        """
+        if count <= 0:
+            return 0
+        i = start & self.wrap
+        if i + count > self.size:
+            # runs past the end of the ring, the rest is at slot 0
+            low = self.size - i
+            return self.mask(start, low) | (self.mask(start + low, count - low) << low)
+        chunk = self.bits[i >> 3:(i + count + 7) >> 3]
+        return (int.from_bytes(chunk, "little") >> (i & 7)) & ((1 << count) - 1)
+
+    def advance(self, base: int, limit: int) -> int:
+        """
+        First seq at or after base (and below limit) that is not acked.
+        The slots passed over are freed.
+        """
+        bits = self.bits
+        wrap = self.wrap
+        while base < limit:
+            i = base & wrap
+            b = 1 << (i & 7)
+            if not bits[i >> 3] & b:
+                break
+            bits[i >> 3] &= ~b
+            self.flags[i] = 0
+            base += 1
+        return base
+
+    def release(self, start: int, end: int):
+        """
+        Free the slots of seqs start .. end - 1 (a cumulative ACK).
+        """
+        bits = self.bits
+        wrap = self.wrap
+        for seq in range(start, end):
+            i = seq & wrap
+            self.flags[i] = 0
+            bits[i >> 3] &= ~(1 << (i & 7))
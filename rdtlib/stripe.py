@@ -0,0 +1,252 @@
+# Striped transfer: one file over N parallel GBN/SR flows.
+#
+# A single flow is capped by one Python process's packet rate and by its
+# window.  Here the file is cut into N byte ranges (stripes, on MSS
+# boundaries) and every stripe is an ordinary rdtlib.aio transfer on its
+# own port, run in its own process on both ends.  The receiver writes each
+# stripe in place at its offset, so there is nothing to reassemble.
+#
+# Before the data, the client sends a PLAN on the base port: file size,
+# stripe count, stripe size and a CRC32 of every stripe.  The server
+# starts one receiver process per stripe on port+1 .. port+N and echoes
+# the PLAN once all of them are listening.  At the end every receiver
+# reads its range back and checks the CRC, so the whole file is checked
+# end to end, not just packet by packet.
+#
+#   py -3 -m rdtlib.stripe server sr 6000
+#   py -3 -m rdtlib.stripe client sr 127.0.0.1 6000 udpfile.jpg 4
+
+import os
+import sys
+import time
+import zlib
+import queue
+import struct
+import socket
+import asyncio
+import multiprocessing
+
+from . import aio
+
+MAGIC = b"STRP"
+PLAN = struct.Struct("!4sQHQ")  # magic, file size, stripes, stripe size
+CRC = struct.Struct("!I")
+PLAN_TIMEOUT = 0.5      # resend the PLAN this often
+PLAN_TRIES = 40         # give up after this many
+CRC_PIECE = 1024 * 1024
+
+
+def layout(size: int, stripes: int, mss: int):
+    """
+    (stripe size, [(offset, length), ...]) for size bytes in at most
+    stripes ranges, each a whole number of packets.
+    """
+    npkts = (size + mss - 1) // mss
+    stripes = max(1, min(stripes, npkts))
+    per = (npkts + stripes - 1) // stripes * mss
+    return per, ranges(size, stripes, per)
+
+
+def ranges(size: int, stripes: int, per: int):
+    return [(i * per, max(0, min(per, size - i * per))) for i in range(stripes)]
+
+
+def crc_range(path: str, offset: int, length: int) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            piece = f.read(min(CRC_PIECE, length))
+            if not piece:
+                break
+            crc = zlib.crc32(piece, crc)
+            length -= len(piece)
+    return crc
+
+
+def _crc_job(args):
+    return crc_range(*args)
+
+
+def pack_plan(size, per, crcs) -> bytes:
+    return PLAN.pack(MAGIC, size, len(crcs), per) + b"".join(CRC.pack(c) for c in crcs)
+
+
+def parse_plan(data):
+    # (size, stripe size, crcs) or None
+    if len(data) < PLAN.size or data[:4] != MAGIC:
+        return None
+    _, size, n, per = PLAN.unpack_from(data)
+    if len(data) != PLAN.size + n * CRC.size:
+        return None
+    crcs = [CRC.unpack_from(data, PLAN.size + i * CRC.size)[0] for i in range(n)]
+    return size, per, crcs
+
+
+# client
+
+def _send_stripe(args):
+    path, addr, proto, window, offset, length = args
+    return asyncio.run(aio.send_file(path, addr, proto, window, offset=offset, length=length))
+
+
+def send_striped(path: str, ip: str, port: int, stripes: int = 4, proto: str = "sr",
+                 window: int = aio.WINDOW) -> list:
+    """
+    Send path to a striped server at ip:port using up to stripes flows.
+    Returns the per-stripe stats from rdtlib.aio.send_file.
+    """
+    if proto not in ("gbn", "sr"):
+        raise ValueError("proto must be gbn or sr")
+    size = os.path.getsize(path)
+    per, parts = layout(size, stripes, aio.MSS[proto])
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(len(parts)) as pool:
+        crcs = pool.map(_crc_job, [(path, off, n) for off, n in parts])
+        plan = pack_plan(size, per, crcs)
+
+        ctl = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        ctl.settimeout(PLAN_TIMEOUT)
+        try:
+            for _ in range(PLAN_TRIES):
+                ctl.sendto(plan, (ip, port))
+                try:
+                    data, _ = ctl.recvfrom(len(plan) + 1)
+                except (socket.timeout, ConnectionResetError):
+                    continue
+                if data == plan:
+                    break
+            else:
+                raise TimeoutError("no answer to the stripe plan")
+        finally:
+            ctl.close()
+        print(f"[CLIENT] {size} bytes in {len(parts)} stripes of {per} bytes")
+
+        stats = pool.map(_send_stripe, [(path, (ip, port + 1 + i), proto, window, off, n)
+                                        for i, (off, n) in enumerate(parts)])
+    elapsed = time.perf_counter() - t0
+    for i, st in enumerate(stats):
+        print(f"[CLIENT] stripe {i}: {st['bytes']} bytes in {st['time']:.3f} s, "
+              f"{st['bytes'] / st['time'] / 1e6:.1f} MB/s, {st['retransmissions']} retransmissions")
+    print(f"[CLIENT] total {size} bytes in {elapsed:.3f} s, {size / elapsed / 1e6:.1f} MB/s")
+    return stats
+
+
+# server
+
+def _recv_stripe(i, path, host, port, proto, window, offset, length, crc, ready, results):
+    async def run():
+        rx = await aio.open_receiver(path, (host, port), proto, window, offset, length)
+        ready.put(i)
+        return await rx.wait()
+
+    st = asyncio.run(run())
+    st["ok"] = crc_range(path, offset, length) == crc
+    results.put((i, st))
+
+
+def receive_striped(path: str, port: int, proto: str = "sr", window: int = aio.WINDOW,
+                    host: str = "0.0.0.0") -> list:
+    """
+    Wait for one striped transfer on port (data on port+1 .. port+N) and
+    write it to path. Returns the per-stripe stats, each with "ok" set if
+    its CRC matched.
+    """
+    if proto not in ("gbn", "sr"):
+        raise ValueError("proto must be gbn or sr")
+    ctl = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ctl.bind((host, port))
+    print(f"[SERVER] waiting for a stripe plan on port {port}")
+    while True:
+        data, client = ctl.recvfrom(65535)
+        p = parse_plan(data)
+        if p is not None:
+            break
+    size, per, crcs = p
+    plan = data
+    parts = ranges(size, len(crcs), per)
+    print(f"[SERVER] {size} bytes in {len(parts)} stripes from {client[0]}:{client[1]}")
+
+    # the stripes write into their own ranges of one file of the final size
+    with open(path, "wb") as f:
+        f.truncate(size)
+
+    ready = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_recv_stripe,
+                                     args=(i, path, host, port + 1 + i, proto, window,
+                                           off, n, crcs[i], ready, results))
+             for i, (off, n) in enumerate(parts)]
+    for pr in procs:
+        pr.start()
+    try:
+        for _ in procs:
+            # a stripe that cannot bind its port never reports in
+            ready.get(timeout=PLAN_TIMEOUT * PLAN_TRIES)
+    except queue.Empty:
+        # the others would wait for their data forever
+        ctl.close()
+        for pr in procs:
+            pr.terminate()
+            pr.join()
+        raise RuntimeError(f"stripe receivers on ports {port + 1}-{port + len(procs)} did not all start")
+    t0 = time.perf_counter()
+    ctl.sendto(plan, client)
+
+    # keep answering a repeated PLAN (our echo got lost) until all are done
+    ctl.settimeout(0.05)
+    stats = [None] * len(parts)
+    left = len(parts)
+    try:
+        while left:
+            try:
+                i, st = results.get_nowait()
+                stats[i] = st
+                left -= 1
+                continue
+            except queue.Empty:
+                pass
+            if not any(pr.is_alive() for pr in procs) and results.empty():
+                raise RuntimeError("stripe receiver died")
+            try:
+                data, addr = ctl.recvfrom(65535)
+                if data == plan:
+                    ctl.sendto(plan, addr)
+            except (socket.timeout, ConnectionResetError):
+                pass
+    finally:
+        ctl.close()
+        for pr in procs:
+            pr.join()
+    elapsed = time.perf_counter() - t0
+
+    for i, st in enumerate(stats):
+        print(f"[SERVER] stripe {i}: {st['bytes']} bytes in {st['time']:.3f} s, "
+              f"{st['bytes'] / st['time'] / 1e6:.1f} MB/s, crc {'OK' if st['ok'] else 'MISMATCH'}")
+    ok = all(st["ok"] for st in stats)
+    print(f"[SERVER] total {size} bytes in {elapsed:.3f} s, {size / elapsed / 1e6:.1f} MB/s, "
+          f"file {'OK' if ok else 'CORRUPT'} -> {path}")
+    return stats
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage:")
+        print("  py -3 -m rdtlib.stripe server <gbn|sr> <port>")
+        print("  py -3 -m rdtlib.stripe client <gbn|sr> <ip> <port> <file> [stripes]")
+        sys.exit(1)
+    mode, proto = sys.argv[1], sys.argv[2]
+    if mode == "server":
+        receive_striped("udpfile_received.jpg", int(sys.argv[3]), proto)
+    elif mode == "client":
+        if len(sys.argv) < 6:
+            print("Usage: py -3 -m rdtlib.stripe client <gbn|sr> <ip> <port> <file> [stripes]")
+            sys.exit(1)
+        stripes = int(sys.argv[6]) if len(sys.argv) > 6 else os.cpu_count() or 1
+        send_striped(sys.argv[5], sys.argv[3], int(sys.argv[4]), stripes, proto)
+    else:
+        print("Mode must be server or client")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Retransmission timers on a hashed timing wheel.
+#
+# The senders used to find expired packets by scanning every send time in
+# the window on each loop pass, or by polling on a short socket timeout,
+# so the cost grew with the window and a timeout fired up to one poll
+# interval late.  Here every timer sits in the wheel slot of its deadline
+# tick: arm() and cancel() are a dict insert / delete, expire() only looks
+# at the slots of the ticks that have passed, and next_timeout() tells the
+# caller how long it may block (socket timeout, Event.wait) so the timer
+# fires on its deadline.  The deadlines also go on a heap, so finding the
+# earliest one does not walk the slots: cancelled and fired timers are
+# dropped from it when they reach the top, or all at once when they
+# outnumber the live ones.
+#
+#   wheel = TimerWheel()
+#   t = wheel.arm(TO, resend, seq)   # resend(seq) once TO has passed
+#   t.cancel()                       # the ACK came in
+#   sock.settimeout(wheel.next_timeout(TO))
+#   ... recv ...
+#   wheel.expire()                   # run everything that is due
+#
+# Times are time.monotonic_ns().  Not thread safe: callers that share a
+# wheel between threads hold their own lock around it.
+
+import time
+import heapq
+import itertools
+
+TICK = 0.001        # wheel resolution, seconds
+SLOTS = 4096        # one turn covers SLOTS * TICK seconds
+MIN_WAIT = 1e-6     # next_timeout() floor, settimeout(0) would mean non-blocking
+STALE = 64          # dead heap entries allowed on top of two per live timer
+
+
+class Timer:
+    __slots__ = ("wheel", "deadline", "tick", "callback", "args")
+
+    def __init__(self, wheel, deadline, tick, callback, args):
+        self.wheel = wheel
+        self.deadline = deadline    # monotonic ns
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+
+    def cancel(self):
+        self.wheel.cancel(self)
+
+
+class TimerWheel:
+    def __init__(self, tick: float = TICK, slots: int = SLOTS):
+        self.tick_ns = int(tick * 1e9)
+        self.n = slots
+        self.slots = [{} for _ in range(slots)]     # timer -> None, kept in arm order
+        self.cursor = time.monotonic_ns() // self.tick_ns   # first tick not fully expired
+        self.count = 0
+        self.heap = []      # (deadline, arm order, timer), live or not
+        self.order = itertools.count()
+
+    def __len__(self):
+        return self.count
+
+    def arm(self, delay: float, callback, *args) -> Timer:
+        """
+        Call callback(*args) from expire() once delay seconds have passed.
+        """
+        deadline = time.monotonic_ns() + int(delay * 1e9)
+        tick = max(deadline // self.tick_ns, self.cursor)
+        t = Timer(self, deadline, tick, callback, args)
+        self.slots[tick % self.n][t] = None
+        self.count += 1
+        heapq.heappush(self.heap, (deadline, next(self.order), t))
+        if len(self.heap) > 2 * self.count + STALE:
+            self._compact()
+        return t
+
+    def cancel(self, t: Timer):
+        """
+        Forget t; cancelling a timer that already fired does nothing.
+        """
+        i = t.tick % self.n
+        slot = self.slots[i]
+        if slot.pop(t, 0) is None:
+            self.count -= 1
+            if not slot:
+                # an emptied dict keeps its table, a new one has none
+                self.slots[i] = {}
+
+    def expire(self, now: int = None) -> int:
+        """
+        Run every timer whose deadline has passed, oldest tick first.
+        Callbacks may arm new timers. Returns how many fired.
+        """
+        if now is None:
+            now = time.monotonic_ns()
+        end = now // self.tick_ns
+        fired = 0
+        tick = self.cursor
+        # after a long pause every slot is visited once, not every tick
+        last = min(end, tick + self.n - 1)
+        while tick <= last:
+            slot = self.slots[tick % self.n]
+            if slot:
+                due = [t for t in slot if t.deadline <= now]
+                for t in due:
+                    del slot[t]
+                if not slot:
+                    self.slots[tick % self.n] = {}
+                self.count -= len(due)
+                for t in due:
+                    t.callback(*t.args)
+                fired += len(due)
+            tick += 1
+        # the current tick may still hold timers due later in it
+        self.cursor = end
+        return fired
+
+    def next_timeout(self, default: float = None) -> float:
+        """
+        Seconds until the earliest deadline (default if nothing is armed).
+        """
+        deadline = self.next_deadline()
+        if deadline is None:
+            return default
+        return max((deadline - time.monotonic_ns()) / 1e9, MIN_WAIT)
+
+    def next_deadline(self) -> int:
+        """
+        The earliest deadline in monotonic ns, None if nothing is armed.
+        """
+        heap = self.heap
+        while heap:
+            deadline, _, t = heap[0]
+            if self._live(t):
+                return deadline
+            heapq.heappop(heap)     # cancelled or fired
+        return None
+
+    def _live(self, t):
+        return t in self.slots[t.tick % self.n]
+
+    def _compact(self):
+        self.heap = [e for e in self.heap if self._live(e[2])]
+        heapq.heapify(self.heap)